@@ -17,6 +17,9 @@ class Image:
     # Decreasing the height and width for crops while checking it don't get small by 1/(min_image_to_crop_factor) of image height/width
     min_image_to_crop_factor = 4
     crop_height_reduction_factor_in_each_iteration = 0.05
+    # Max number of images queued or processed per worker process while processing
+    # a directory with multiple processes, bounds memory used by pending images
+    max_in_flight_images_per_process = 2
 
 
 # # Configurations for Scoring crops for crop extractor
@@ -33,6 +36,13 @@ class CropScorer:
     face_bias = 0.01  # bias color value for face(+- error value)
     face_weight = 3.4  # default weight value for face parameter
     rects_weight = 1  # default weight value for crop rectangles
+    # Crop search mode, "exhaustive" scores all crop windows on sliding window step grid
+    # "coarse_to_fine" first scores crop windows on a grid coarse_step_multiplier times coarser
+    # than step grid, keeps coarse_to_fine_top_n best windows for each crop size and then
+    # scores only step grid windows around them
+    search_mode = "exhaustive"
+    coarse_step_multiplier = 4
+    coarse_to_fine_top_n = 8
 
 
 # # Configurations for Text detection class
@@ -83,18 +93,47 @@ class Video:
     DEBUG = False
     min_video_duration = 5.0
 
-    # consume % of memory during video keyframe extraction
-    # 80% of available memory will be consumed
-    memory_consumption_threshold = 0.80
-
-    # assumed numbers of frames within which 1 candidate frames which might be available
-    # seconds to reach threshold if all frames are collected, but not all are candidate frames
-    # currently we assume 1 in 5 frame for that
-    assumed_no_of_frames_per_candidate_frame = 5
-
     # if video duration greater than this number video will be treated as a large video
+    # and will be split into videos of this duration
     video_split_threshold_in_minutes = 20
 
+    # If True video is split into clips on disk using ffmpeg and each clip is processed
+    # by a worker process during keyframe extraction. If False each worker process opens
+    # the input video and processes its own frame range, no clips are written to disk
+    split_video_with_ffmpeg = True
+
+    # Return candidate frames from frame extraction worker processes through shared memory
+    # instead of pickling them, falls back to pickling if shared memory is not available
+    use_shared_memory = True
+
+    # Maximum number of chunks pending in the pool per worker process while extracting keyframes
+    # for a directory of videos. Chunks of several videos are processed together, so short
+    # videos keep all worker processes busy, chunks of next videos are submitted only while
+    # fewer chunks are pending, which bounds the candidate frames held in memory
+    max_pending_chunks_per_process = 2
+
+    # If not None, indexes of candidate frames of videos, their features and selected keyframes are
+    # cached in this directory and reused when keyframes of the same video are extracted again, also
+    # for a different number of keyframes, frames are read again from the video by their index. Videos
+    # are processed in frame ranges (see split_video_with_ffmpeg) while cache is used, so frame indexes
+    # are frame indexes of the video. Least recently used entries are removed when size of cache grows
+    # above keyframe_cache_max_size_in_mb
+    keyframe_cache_dir = None
+    keyframe_cache_max_size_in_mb = 1024
+
+    # Number of videos whose metadata read by helper_functions.probe_video is memoized, videos
+    # are validated and probed several times during keyframe extraction and compression
+    video_probe_cache_size = 4096
+
+    # Number of videos whose frame timestamps read by helper_functions.get_frame_timestamps are
+    # memoized, frame timestamps are used for seeking to frame ranges of the video
+    frame_timestamps_cache_size = 64
+
+    # Duration of frame ranges processed by Video.extract_video_keyframes_iterator, preliminary
+    # keyframes are yielded for each frame range as soon as it is processed. Frame ranges are
+    # submitted to the pool as earlier frame ranges are consumed, see max_pending_chunks_per_process
+    keyframes_iterator_chunk_duration_in_sec = 60
+
     # https://trac.ffmpeg.org/wiki/Encode/H.264
 
     # Keep this between 20 to 30 value
@@ -398,6 +437,22 @@ class ImageSelector:
     min_entropy_value = 1.0
     max_entropy_value = 10.0
     entropy_step = 0.5
+    # Engine for computing Contrast/Entropy score of images, "skimage" computes local entropy of full
+    # resolution image using skimage rank entropy filter with disk(5) footprint. "fast" computes local
+    # entropy of image downscaled to fast_entropy_image_width using box filtered gray level counts in a
+    # square window of fast_entropy_window_size, scores are slightly different but rank images alike
+    entropy_engine = "skimage"
+    fast_entropy_image_width = 256
+    fast_entropy_window_size = 9
+    # Engine for clustering histograms of images, "kmeans" uses sklearn KMeans, "minibatch_kmeans"
+    # uses sklearn MiniBatchKMeans with batches of minibatch_kmeans_batch_size histograms and
+    # "kcenter" uses deterministic greedy farthest point selection of cluster centers, last two
+    # are faster for thousands of images and large number of keyframes
+    clustering_engine = "kmeans"
+    minibatch_kmeans_batch_size = 1024
+    # Pass images to worker processes through shared memory instead of pickling them,
+    # falls back to pickling if shared memory is not available
+    use_shared_memory = True
 
 
 class FrameExtractor:
@@ -405,7 +460,67 @@ class FrameExtractor:
     USE_LOCAL_MAXIMA = True
     # Lenght of sliding window taking difference
     len_window = 20
-    # Chunk size of Images to be processed at a time in memory
+    # Number of frames after which frame differences are restarted for local maxima detection,
+    # frames are not held in memory for the whole chunk. Chunks start at every max_frames_in_chunk th
+    # processed frame of the video, so frame ranges give same candidate frames as the whole video
     max_frames_in_chunk = 500
+    # Process every frame_sampling_step th frame of the video for frame differences, frames in
+    # between are grabbed but not retrieved or converted. 1 processes all the frames of the video
+    frame_sampling_step = 1
+    # If not None, frames are sampled to process approximately analysis_fps frames per second
+    # of the video for frame differences, overrides frame_sampling_step
+    analysis_fps = None
+    # If not None, frames wider than analysis_frame_width are downscaled to this width for
+    # computing frame differences, candidate frames are always returned in full resolution
+    analysis_frame_width = None
     # Type of smoothening window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman' flat window will produce a moving average smoothing.
     window_type = "hanning"
+    # If True frame difference signal of each video is saved as <video file name>.frame_diff.npy while
+    # extracting keyframes, candidate frames can then be detected again with different len_window or
+    # window_type without computing frame differences again, see FrameExtractor.get_candidate_frame_indexes_from_signal.
+    # Signal is saved only if config.Video.split_video_with_ffmpeg is False, frame indexes of clips
+    # written by ffmpeg don't match frame indexes of the video
+    save_frame_difference_signal = False
+    # Directory for frame difference signal files, if None they are saved next to the video
+    frame_difference_signal_dir = None
+
+    # Frames before a frame range of a video file are not decoded, video is seeked to this duration
+    # before the first frame which is read and frames in between are grabbed. Position after seeking
+    # is checked with timestamps of frames read from the video without decoding it
+    seek_margin_in_sec = 1.0
+
+    # Decoder used for reading frames of video files, "opencv" decodes with cv2.VideoCapture and
+    # "ffmpeg" runs the bundled ffmpeg binary which drops frames which are not processed (see
+    # frame_sampling_step and analysis_fps) before converting them to BGR and writes raw frames
+    # to a pipe. Frames are same for both decoders, timestamps of frames of ffmpeg decoder are
+    # computed from frame rate of the video
+    decoder_backend = "opencv"
+    # Number of decoding threads of ffmpeg decoder, if None ffmpeg chooses it. Each worker
+    # process runs its own decoder, so keep it low if there are many worker processes
+    ffmpeg_decoder_threads = None
+    # If not None ffmpeg decoder scales frames to this width keeping aspect ratio, candidate
+    # frames are then returned in this size
+    ffmpeg_frame_width = None
+
+    # If True only key frames (I-frames) of video files are decoded with ffmpeg for finding candidate
+    # frames, which makes frame extraction of long videos much faster. Frame differences are computed
+    # between consecutive key frames and smoothed with a window of keyframe_scan_len_window key frames.
+    # Key frames of a frame range are found from timestamps of key frames read without decoding the
+    # video, frame ranges are extended by keyframe_scan_len_window key frames on both sides, and frame
+    # differences are restarted every max_frames_in_chunk key frames from start of the video. If
+    # timestamps can not be read, video is assumed to have constant frame rate. Frame difference signal
+    # is not recorded in this mode
+    keyframes_only_scan = False
+    keyframe_scan_len_window = 5
+    # If not None, all frames of this duration in seconds after each candidate key frame are decoded
+    # and candidate frames are detected in them same as without keyframes_only_scan
+    keyframe_scan_refine_window_in_sec = None
+
+    # Scene cut detection, a processed frame starts a new scene (shot) if mean absolute difference of
+    # its LUV values from previous processed frame is at least scene_cut_threshold (0-255 scale) and at
+    # least scene_cut_ratio times mean difference of scene_cut_window_len previous processed frames,
+    # so fast motion in a scene is not detected as a cut. Scenes are at least min_scene_len_in_sec long
+    scene_cut_threshold = 8.0
+    scene_cut_ratio = 3.0
+    scene_cut_window_len = 10
+    min_scene_len_in_sec = 0.5
@@ -7,7 +7,8 @@
 import cv2
 import numpy as np
 import sys
-from Katna.crop_rect import CropRect
+from scipy.signal import fftconvolve
+from Katna.crop_rect import CropRect, CropCandidates
 import math
 import time
 import Katna.config as config
@@ -34,6 +35,9 @@ class CropExtractor(object):
         self.face_bias = config.CropScorer.face_bias
         self.face_weight = config.CropScorer.face_weight
         self.rects_weight = config.CropScorer.rects_weight
+        self.search_mode = config.CropScorer.search_mode
+        self.coarse_step_multiplier = config.CropScorer.coarse_step_multiplier
+        self.coarse_to_fine_top_n = config.CropScorer.coarse_to_fine_top_n
         self.extracted_feature_maps = []
 
     def _get_all_possible_crops(
@@ -46,7 +50,7 @@ class CropExtractor(object):
         scale_step=0.1,
         step=8,
     ):
-        """Internal function for getting list of all possible Crop_rect for input image.
+        """Internal function for getting all possible crop rectangles for input image.
 
         :param object: base class inheritance
         :type object: class:`Object`
@@ -65,16 +69,14 @@ class CropExtractor(object):
         :param step: step
         :type step: int, default=8
         :return: all_possible_crops_rect
-        :rtype: list of CropRect
+        :rtype: CropCandidates
         """
         # This function takes a sliding window approach for getting all possible crop
         # with given crop specification.
         image_width, image_height = image.shape[1], image.shape[0]
-        # print("Width,height", image_width, image_height)
-        # get all possible crops using sliding window
 
-        # Variable to collect all possible crops
-        all_possible_crops_rects = []
+        # Variables to collect all possible crops column wise
+        xs, ys, ws, hs = [], [], [], []
 
         # Start sliding window from from range 0 to max_scale
         for scale in (
@@ -85,18 +87,23 @@ class CropExtractor(object):
                 -int(scale_step * 100),
             )
         ):
-            for y in range(0, image_height, step):
-                if not (y + crop_height * scale) <= image_height:
-                    break
-                for x in range(0, image_width, step):
-                    if not (x + crop_width * scale) <= image_width:
-                        break
-                    all_possible_crops_rects.append(
-                        CropRect(
-                            x, y, crop_width * scale, crop_height * scale
-                        )
-                    )
-        if not all_possible_crops_rects:
+            scaled_crop_width, scaled_crop_height = crop_width * scale, crop_height * scale
+            # Window origins for which window stays inside the image
+            y_positions = np.arange(0, image_height, step)
+            y_positions = y_positions[y_positions + scaled_crop_height <= image_height]
+            x_positions = np.arange(0, image_width, step)
+            x_positions = x_positions[x_positions + scaled_crop_width <= image_width]
+
+            y_grid, x_grid = np.meshgrid(y_positions, x_positions, indexing="ij")
+            xs.append(x_grid.ravel())
+            ys.append(y_grid.ravel())
+            ws.append(np.full(x_grid.size, scaled_crop_width))
+            hs.append(np.full(x_grid.size, scaled_crop_height))
+
+        all_possible_crops_rects = CropCandidates(
+            np.concatenate(xs), np.concatenate(ys), np.concatenate(ws), np.concatenate(hs)
+        )
+        if len(all_possible_crops_rects) == 0:
             raise ValueError(locals())
         return all_possible_crops_rects
 
@@ -163,76 +170,200 @@ class CropExtractor(object):
         # should return wxh/hxw
         return importance_map
 
-    def _score(self, feature_maps_image, crop_rect):
-        """Internal function to get score for given crop rectangle - it calculates the importance of each pixel inside image
-        for given crop_rect and calculates the score by combining all the image features with importance
+    def _get_importance_kernel(self, crop_width, crop_height):
+        """Internal function to get importance values (rule of thirds and edge distance) of pixels inside a
+        crop rectangle of given size. Importance inside a crop rectangle only depends on pixel position relative
+        to crop origin, so same kernel is shared by all crop rectangles of same size.
+
+        :param crop_width: crop width
+        :type crop_width: float
+        :param crop_height: crop height
+        :type crop_height: float
+        :return: importance kernel of size int(crop_height) x int(crop_width)
+        :rtype: numpy array
+        """
+        kernel = np.zeros((int(crop_height), int(crop_width)))
+        return self._importance(CropRect(0, 0, crop_width, crop_height), kernel)
+
+    def _get_weighted_feature_map(self, feature_maps_image):
+        """Internal function to combine detail, face and saliency feature maps into single weighted feature map,
+        score of a crop rectangle is sum of this map multiplied by importance map of crop rectangle.
+        Rects score does not contribute as it is always zero.
 
-        :param object: base class inheritance
-        :type object: class:`Object`
         :param feature_maps_image: feature_maps image
-        :type feature_maps_image: OpenCV image object
-        :param crop_rect: Input crop rectangle for which score is calculated
-        :type crop_rect: crop_rect
-        :return: score
-        :rtype: float
+        :type feature_maps_image: numpy array
+        :return: weighted feature map
+        :rtype: numpy array
         """
-        # setting the default scores for each crop rectangle
-        rect_score_detail = 0.0
-        rect_score_saliency = 0.0
-        rect_score_face = 0.0
-        rect_score_rects = 0.0
-        rect_score_total = 0.0
-
-        feature_maps_data = feature_maps_image
-        feature_maps_width, feature_maps_height = (
-            feature_maps_image.shape[1],
-            feature_maps_image.shape[0],
-        )
         # # Skin , Edge , Saliency are at index 0, 1, 2 respectively
-        # dummy importance matrix to store base values which will be updated in _importance function
-        importance_map = np.zeros((feature_maps_height, feature_maps_width))
-        importance_map[:, :] = self.outside_importance
-        # importance score matrix wrt rule of thirds and edge radius
-        importance = self._importance(crop_rect, importance_map)
-
-        if config.Image.DEBUG is True:
-            crop_rect.debug_image = importance.copy()
-            importance_max = np.max(crop_rect.debug_image)
-            importance_min = np.min(crop_rect.debug_image)
-            float_range = importance_max - importance_min
-            crop_rect.debug_image = (
-                crop_rect.debug_image - importance_min
-            ) / float_range
-            crop_rect.debug_image = 255 * crop_rect.debug_image
-            crop_rect.debug_image = crop_rect.debug_image.astype(np.uint8)
-
-        # print("Debug Image",crop_rect.debug_image)
-        detail = np.array(feature_maps_data)[:, :, 2] / 255
-        # detailT = detail.T
-        rect_score_rects = np.sum(rect_score_rects * importance)
-        # Skin score calculations
-        a = (np.array(feature_maps_data)[:, :, 1] / 255) * (detail + self.face_bias)
-        b = a * importance
-        rect_score_face = np.sum(b)
-        # edge score calculations
-        rect_score_detail = detail * importance
-        rect_score_detail = np.sum(rect_score_detail)
-        # Saliency score calculations
-        rect_score_saliency = np.sum(
-            (np.array(feature_maps_data)[:, :, 0] / 255)
-            * (detail + self.saliency_bias)
-            * importance
+        detail = feature_maps_image[:, :, 2] / 255
+        face = (feature_maps_image[:, :, 1] / 255) * (detail + self.face_bias)
+        saliency = (feature_maps_image[:, :, 0] / 255) * (detail + self.saliency_bias)
+
+        return (
+            detail * self.detail_weight
+            + face * self.face_weight
+            + saliency * self.saliency_weight
+        )
+
+    def _get_crop_score_map(self, weighted_feature_map, crop_width, crop_height):
+        """Internal function to get score of every crop rectangle of given size in one pass. Pixels outside crop
+        rectangle have constant outside_importance, so score of crop rectangle at (x, y) is
+        outside_importance * (sum of weighted_feature_map) + correlation of weighted_feature_map with
+        (importance kernel - outside_importance) at (x, y), normalized by crop area.
+        Correlation for all positions is computed with FFT.
+
+        :param weighted_feature_map: weighted feature map from _get_weighted_feature_map
+        :type weighted_feature_map: numpy array
+        :param crop_width: crop width
+        :type crop_width: float
+        :param crop_height: crop height
+        :type crop_height: float
+        :return: score map where value at [y, x] is score of crop rectangle with origin (x, y)
+        :rtype: numpy array
+        """
+        kernel = self._get_importance_kernel(crop_width, crop_height) - self.outside_importance
+        window_sums = fftconvolve(weighted_feature_map, kernel[::-1, ::-1], mode="valid")
+        outside_sum = self.outside_importance * np.sum(weighted_feature_map)
+
+        return (outside_sum + window_sums) / (crop_width * crop_height)
+
+    def _get_crop_scores(
+        self, weighted_feature_map, crop_width, crop_height, x_positions, y_positions
+    ):
+        """Internal function to get score of crop rectangles of given size only at given positions, each crop
+        rectangle is scored directly over its own window which is cheaper than computing complete score map
+        when only few positions are needed. Scores are same as scores from _get_crop_score_map.
+
+        :param weighted_feature_map: weighted feature map from _get_weighted_feature_map
+        :type weighted_feature_map: numpy array
+        :param crop_width: crop width
+        :type crop_width: float
+        :param crop_height: crop height
+        :type crop_height: float
+        :param x_positions: x position of crop rectangles
+        :type x_positions: numpy array of int
+        :param y_positions: y position of crop rectangles
+        :type y_positions: numpy array of int
+        :return: scores of crop rectangles
+        :rtype: numpy array
+        """
+        kernel = self._get_importance_kernel(crop_width, crop_height) - self.outside_importance
+        kernel_height, kernel_width = kernel.shape
+        outside_sum = self.outside_importance * np.sum(weighted_feature_map)
+
+        window_sums = np.array(
+            [
+                np.einsum(
+                    "ij,ij->",
+                    weighted_feature_map[y : y + kernel_height, x : x + kernel_width],
+                    kernel,
+                )
+                for x, y in zip(x_positions, y_positions)
+            ]
+        )
+        return (outside_sum + window_sums) / (crop_width * crop_height)
+
+    def _score_crop_candidates(
+        self, weighted_feature_map, crop_candidates, use_score_map=True
+    ):
+        """Internal function to score all candidate crop rectangles in batch, crop rectangles are
+        grouped by size and each group is scored either from one score map or window by window
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param weighted_feature_map: weighted feature map from _get_weighted_feature_map
+        :type weighted_feature_map: numpy array
+        :param crop_candidates: candidate crop rectangles, scores are updated in place
+        :type crop_candidates: CropCandidates
+        :param use_score_map: if True score complete score map for each crop size else score only \
+        candidate windows, defaults to True
+        :type use_score_map: bool
+        :return: crop_candidates
+        :rtype: CropCandidates
+        """
+        crop_sizes = np.unique(
+            np.stack([crop_candidates.w, crop_candidates.h], axis=1), axis=0
         )
+        for crop_width, crop_height in crop_sizes:
+            crops_of_size = np.logical_and(
+                crop_candidates.w == crop_width, crop_candidates.h == crop_height
+            )
+            x_positions = crop_candidates.x[crops_of_size]
+            y_positions = crop_candidates.y[crops_of_size]
+            if use_score_map:
+                score_map = self._get_crop_score_map(
+                    weighted_feature_map, crop_width, crop_height
+                )
+                crop_candidates.score[crops_of_size] = score_map[y_positions, x_positions]
+            else:
+                crop_candidates.score[crops_of_size] = self._get_crop_scores(
+                    weighted_feature_map, crop_width, crop_height, x_positions, y_positions
+                )
+        return crop_candidates
+
+    def _refine_crop_candidates(self, image, coarse_candidates, step, coarse_step):
+        """Internal function for coarse to fine crop search, for each crop size takes best scored
+        coarse candidates and returns all step grid crop rectangles around them (within coarse_step)
 
-        # Scoring mechanism
-        rect_score_total = (
-            rect_score_detail * self.detail_weight
-            + rect_score_face * self.face_weight
-            + rect_score_rects * self.rects_weight
-            + rect_score_saliency * self.saliency_weight
-        ) / (crop_rect.w * crop_rect.h)
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param image: image file
+        :type image: OpenCV numpy Image file
+        :param coarse_candidates: scored candidate crop rectangles on coarse grid
+        :type coarse_candidates: CropCandidates
+        :param step: step of fine grid
+        :type step: int
+        :param coarse_step: step of coarse grid, multiple of step
+        :type coarse_step: int
+        :return: unscored candidate crop rectangles on fine grid
+        :rtype: CropCandidates
+        """
+        image_width, image_height = image.shape[1], image.shape[0]
+        offsets = np.arange(-coarse_step + step, coarse_step, step)
+        xs, ys, ws, hs = [], [], [], []
+
+        # Keep order of crop sizes same as in _get_all_possible_crops
+        _, size_order = np.unique(
+            np.stack([coarse_candidates.w, coarse_candidates.h], axis=1),
+            axis=0,
+            return_index=True,
+        )
+        for first_index in np.sort(size_order):
+            crop_width = coarse_candidates.w[first_index]
+            crop_height = coarse_candidates.h[first_index]
+            crops_of_size = np.flatnonzero(
+                np.logical_and(
+                    coarse_candidates.w == crop_width, coarse_candidates.h == crop_height
+                )
+            )
+            best = crops_of_size[
+                np.argsort(-coarse_candidates.score[crops_of_size], kind="stable")[
+                    : self.coarse_to_fine_top_n
+                ]
+            ]
+
+            # All step grid windows around best coarse windows which stay inside the image
+            y_grid = (coarse_candidates.y[best][:, None, None] + offsets[None, :, None])
+            x_grid = (coarse_candidates.x[best][:, None, None] + offsets[None, None, :])
+            y_grid, x_grid = np.broadcast_arrays(y_grid, x_grid)
+            inside = (
+                (y_grid >= 0)
+                & (x_grid >= 0)
+                & (y_grid + crop_height <= image_height)
+                & (x_grid + crop_width <= image_width)
+            )
+            positions = np.unique(
+                np.stack([y_grid[inside], x_grid[inside]], axis=1), axis=0
+            )
+            ys.append(positions[:, 0])
+            xs.append(positions[:, 1])
+            ws.append(np.full(positions.shape[0], crop_width))
+            hs.append(np.full(positions.shape[0], crop_height))
 
-        return rect_score_total
+        return CropCandidates(
+            np.concatenate(xs), np.concatenate(ys), np.concatenate(ws), np.concatenate(hs)
+        )
 
     def _extract_and_score_crop_rects(
         self,
@@ -269,24 +400,50 @@ class CropExtractor(object):
         :param step: step
         :type step: int, default=8
         :return: all_possible_crops_rect
-        :rtype: list of CropRect
+        :rtype: CropCandidates
         """
 
-        all_possible_crops_rects = self._get_all_possible_crops(
-            image,
-            crop_width,
-            crop_height,
-            max_scale=max_scale,
-            min_scale=min_scale,
-            scale_step=scale_step,
-            step=step,
-        )
         # Storing all feature maps in numpy stack
         feature_maps_image = np.dstack(extracted_feature_maps)
         start = time.time()
-        for crop_rect in all_possible_crops_rects:
-            crop_rect.score = self._score(feature_maps_image, crop_rect)
-
+        weighted_feature_map = self._get_weighted_feature_map(feature_maps_image)
+
+        if self.search_mode == "coarse_to_fine":
+            # Score coarse grid first and then only fine grid windows around best coarse windows
+            coarse_step = step * self.coarse_step_multiplier
+            coarse_crops_rects = self._get_all_possible_crops(
+                image,
+                crop_width,
+                crop_height,
+                max_scale=max_scale,
+                min_scale=min_scale,
+                scale_step=scale_step,
+                step=coarse_step,
+            )
+            self._score_crop_candidates(
+                weighted_feature_map, coarse_crops_rects, use_score_map=False
+            )
+            all_possible_crops_rects = self._refine_crop_candidates(
+                image, coarse_crops_rects, step, coarse_step
+            )
+            self._score_crop_candidates(
+                weighted_feature_map, all_possible_crops_rects, use_score_map=False
+            )
+        elif self.search_mode == "exhaustive":
+            all_possible_crops_rects = self._get_all_possible_crops(
+                image,
+                crop_width,
+                crop_height,
+                max_scale=max_scale,
+                min_scale=min_scale,
+                scale_step=scale_step,
+                step=step,
+            )
+            self._score_crop_candidates(weighted_feature_map, all_possible_crops_rects)
+        else:
+            raise ValueError(
+                "Crop search mode is one of 'exhaustive', 'coarse_to_fine'"
+            )
         end = time.time()
         # print("Time Spent in scoring Crop rectangles", end - start)
         self.extracted_feature_maps = extracted_feature_maps
@@ -309,8 +466,8 @@ class CropExtractor(object):
         :type crop_height: Int
         :param feature_list: list of input feature maps to be used for scoring a crop rectangle
         :type feature_list: List of OpenCV numpy image type
-        :return: List of extracted crop rectangle objects
-        :rtype: list of crop_rect
+        :return: extracted candidate crop rectangles
+        :rtype: CropCandidates
         """
         extracted_candidate_crops = []
         extracted_feature_maps = []
@@ -338,17 +495,24 @@ class CropExtractor(object):
             crop_height_small,
         )
 
-        for crop_rect in extracted_candidate_crops:
-            crop_rect.x = int(crop_rect.x * self.down_sample_factor)
-            crop_rect.y = int(crop_rect.y * self.down_sample_factor)
-            crop_rect.w = int(crop_rect.w * self.down_sample_factor)
-            crop_rect.h = int(crop_rect.h * self.down_sample_factor)
-            # Save target Crop width and height into crop rectangle 
-            # Data structure for fixing bug where returned crop is of 
-            # slightly different resolution. 
-            # target_crop_width and height parameter is later used by
-            # get_image_crop function for returning corrrect image crop
-            crop_rect.target_crop_width = crop_width
-            crop_rect.target_crop_height = crop_height
+        extracted_candidate_crops.x = (
+            extracted_candidate_crops.x * self.down_sample_factor
+        ).astype(int)
+        extracted_candidate_crops.y = (
+            extracted_candidate_crops.y * self.down_sample_factor
+        ).astype(int)
+        extracted_candidate_crops.w = (
+            extracted_candidate_crops.w * self.down_sample_factor
+        ).astype(int)
+        extracted_candidate_crops.h = (
+            extracted_candidate_crops.h * self.down_sample_factor
+        ).astype(int)
+        # Save target Crop width and height into crop rectangle 
+        # Data structure for fixing bug where returned crop is of 
+        # slightly different resolution. 
+        # target_crop_width and height parameter is later used by
+        # get_image_crop function for returning corrrect image crop
+        extracted_candidate_crops.target_crop_width = crop_width
+        extracted_candidate_crops.target_crop_height = crop_height
 
         return extracted_candidate_crops
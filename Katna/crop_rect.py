@@ -68,3 +68,63 @@ class CropRect(object):
         else:
             resized_crop_img = cv2.resize(crop_img, (self.target_crop_width, self.target_crop_height))
             return resized_crop_img
+
+
+class CropCandidates(object):
+    """Data structure class for storing candidate crop rectangles column wise as numpy arrays,
+    crop rectangles are materialized as CropRect objects only when requested
+
+    :param object: base class inheritance
+    :type object: class:`Object`
+    """
+
+    def __init__(self, x, y, w, h, score=None):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.w = np.asarray(w)
+        self.h = np.asarray(h)
+        if score is None:
+            score = np.zeros(self.x.shape[0])
+        self.score = np.asarray(score)
+        self.target_crop_width = None
+        self.target_crop_height = None
+
+    def __len__(self):
+        """Number of candidate crop rectangles
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        """
+        return self.x.shape[0]
+
+    def get_crop_rect(self, index):
+        """public function which returns candidate crop rectangle at given index as CropRect object
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param index: index of candidate crop rectangle
+        :type index: int
+        :return: crop rectangle
+        :rtype: CropRect
+        """
+        crop_rect = CropRect(
+            self.x[index].item(),
+            self.y[index].item(),
+            self.w[index].item(),
+            self.h[index].item(),
+        )
+        crop_rect.score = self.score[index]
+        crop_rect.target_crop_width = self.target_crop_width
+        crop_rect.target_crop_height = self.target_crop_height
+        return crop_rect
+
+    def get_sorted_indices(self):
+        """public function which returns indices of candidate crop rectangles sorted by score in descending
+        order, candidates with equal score keep their original order
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :return: sorted indices
+        :rtype: numpy array
+        """
+        return np.argsort(-self.score, kind="stable")
@@ -7,9 +7,11 @@
 from __future__ import print_function
 
 import os
+import itertools
 import cv2
 import numpy as np
 import Katna.config as config
+from Katna.crop_rect import CropCandidates
 
 
 class CropSelector(object):
@@ -49,6 +51,22 @@ class CropSelector(object):
 
         return sorted_list
 
+    def _iter_sorted_crops(self, input_crop_list):
+        """ Function to iterate over crop rectangles in descending order of score, candidate crop rectangles
+            stored column wise are materialized as CropRect objects one at a time while iterating
+
+            :param input_crop_list: input crop rectangles
+            :type input_crop_list: CropCandidates or list of crop rect objects
+            :return: generator of crop rect objects sorted by score
+            :rtype: generator
+        """
+        if isinstance(input_crop_list, CropCandidates):
+            for index in input_crop_list.get_sorted_indices():
+                yield input_crop_list.get_crop_rect(index)
+        else:
+            for crop_rect in self._sort(input_crop_list):
+                yield crop_rect
+
     def select_candidate_crops(
         self, input_image, num_of_crops, input_crop_list, defined_filters, filters=[]
     ):
@@ -61,8 +79,8 @@ class CropSelector(object):
         :type object: class:`Object`
         :param input_image: input image
         :type input_image: Opencv Numpy Image
-        :param input_crop_list: list of input crop in list of crop_rect format
-        :type input_crop_list: python list crop_rect data structure
+        :param input_crop_list: input crop rectangles
+        :type input_crop_list: CropCandidates or python list crop_rect data structure
         :param number_of_crop: Required number of crop
         :type: int
 
@@ -70,50 +88,47 @@ class CropSelector(object):
         :rtype: python list of crop_rect data structure
         """
 
-        filtered_crop_list = []
+        sorted_crops = self._iter_sorted_crops(input_crop_list)
 
         # Has the user applied any filters
         if self.__are_filters_defined(filters) is False:
-            filtered_crop_list = self._sort(input_crop_list)
-            return self.__topk(filtered_crop_list, num_of_crops)
+            return self.__topk(sorted_crops, num_of_crops)
 
         # Are user added filters valid
         if self.__are_filters_valid(defined_filters, filters) is False:
             raise TypeError("Added filters do not match predefined filters")
 
-        # Apply the filter to all the crops. This is like scanning the crops with filters
         for defFilter in defined_filters:
-
             defFilter.set_image(input_image)
-            input_crop_list = self.__remove_crops_from_list(defFilter, input_crop_list)
 
         self.debug_image = input_image
 
-        filtered_crop_list = self._sort(input_crop_list)
+        # Apply the filters to crops from best to worst score and stop as soon as
+        # required number of crops pass all filters
+        filtered_crops = (
+            crop_rect
+            for crop_rect in sorted_crops
+            if self.__is_crop_accepted(defined_filters, crop_rect)
+        )
 
-        return self.__topk(filtered_crop_list, num_of_crops)
+        return self.__topk(filtered_crops, num_of_crops)
 
-    def __remove_crops_from_list(self, user_filter, input_crop_list):
-        """ Private function to remove crops not matching the user added filter.
+    def __is_crop_accepted(self, defined_filters, crop_rect):
+        """ Private function to check if crop matches all the filters.
         
-        :param user_filter: filter added by user
-        :type user_filter: custom object of type filter
+        :param defined_filters: filters to be applied
+        :type defined_filters: list of filter
 
-        :param input_crop_list: list of input crop in list of crop_rect format
-        :type input_crop_list: python list crop_rect data structure
+        :param crop_rect: crop rectangle to check
+        :type crop_rect: crop_rect data structure
         
-        :return: Returns updated crop list
-        :rtype: python list of crop_rect data structure
+        :return: True if no filter rejects the crop
+        :rtype: boolean
         """
-        # Iterate from last item to first item of python list input_crop_list 
-        for i in range(len(input_crop_list) - 1, -1, -1):
-            # Remove item from list if filter response is false 
-            # please note iterating list from last to first item ensures 
-            # you do not remove items are removed in right order
-            if user_filter.get_filter_result(input_crop_list[i]) is False:
-                input_crop_list.remove(input_crop_list[i])
-
-        return input_crop_list
+        for defFilter in defined_filters:
+            if defFilter.get_filter_result(crop_rect) is False:
+                return False
+        return True
 
     def __are_filters_defined(self, filters):
         """Private Function to check if any filters have been added.
@@ -153,12 +168,12 @@ class CropSelector(object):
     def __topk(self, crops_list, k):
         """Private Function to return top k items from the crops list.
 
-        :param crops_list: crops left after applying all the filters. 
-        :type crops_list: list of crops 
+        :param crops_list: crops left after applying all the filters, sorted by score. 
+        :type crops_list: iterable of crops 
         :param K: number of crops to return. 
         :type K: int 
 
         :return: crops
         :rtype: list of crops
         """
-        return crops_list[:k]
+        return list(itertools.islice(crops_list, k))
@@ -0,0 +1,390 @@
+"""
+.. module:: Katna.ffmpeg_reader
+    :platform: Platfrom Independent
+    :synopsis: This module has class for reading raw video frames from ffmpeg binary
+"""
+
+import os
+import re
+import functools
+import subprocess
+import threading
+from collections import deque
+import cv2
+import numpy as np
+import Katna.helper_functions as helper
+
+
+@functools.lru_cache(maxsize=None)
+def _get_passthrough_args(ffmpeg_binary):
+    """Returns arguments of ffmpeg for writing frames as they are decoded, without dropping or
+    duplicating frames. -fps_mode exists since ffmpeg 5.1, older versions have -vsync
+
+    :param ffmpeg_binary: path of ffmpeg binary
+    :type ffmpeg_binary: str
+    :return: ffmpeg arguments
+    :rtype: list
+    """
+    try:
+        proc = subprocess.run(
+            [ffmpeg_binary, "-hide_banner", "-h", "long"],
+            **helper._cross_platform_popen_params(
+                {"stdin": subprocess.DEVNULL, "stdout": subprocess.PIPE, "stderr": subprocess.STDOUT}
+            )
+        )
+        if b"-fps_mode" in proc.stdout:
+            return ["-fps_mode", "passthrough"]
+    except OSError:
+        pass
+    return ["-vsync", "passthrough"]
+
+
+class FFmpegVideoReader(object):
+    """Class for reading frames of a video by running ffmpeg binary and reading raw BGR
+    frames from its stdout. Video can be a file path, bytes or a file-like object (e.g. a
+    pipe) which is fed to stdin of ffmpeg, so in-memory videos are not written to disk.
+    Reader has the methods of cv2.VideoCapture used by FrameExtractor, so it can be used
+    in place of cv2.VideoCapture.
+
+    Videos fed to stdin are read sequentially, so mp4/mov videos must have their moov atom
+    at the start of the file (e.g. written with ffmpeg -movflags +faststart). Timestamps of
+    frames are computed from frame rate of the video.
+
+    Frames before start_frame and frames with index not multiple of frame_step are dropped by
+    ffmpeg before they are converted to BGR, grab skips them without reading any data and read
+    returns next frame which is not dropped, so frame indexes are same as for cv2.VideoCapture.
+    Video files are seeked by ffmpeg to start_frame using timestamps of frames read from the
+    video without decoding it, so frames before start_frame are not decoded.
+
+    :param source: video file path, bytes or file-like object with read method
+    :type source: str or bytes or file object
+    :param start_frame: index of first frame to be output, defaults to 0
+    :type start_frame: int, optional
+    :param frame_step: only frames with index multiple of frame_step are output, defaults to 1
+    :type frame_step: int, optional
+    :param threads: number of decoding threads of ffmpeg, if None ffmpeg chooses it, defaults to None
+    :type threads: int, optional
+    :param frame_width: if not None frames are scaled by ffmpeg to this width keeping aspect ratio, defaults to None
+    :type frame_width: int, optional
+    :param keyframes_only: if True only key frames (I-frames) are decoded and output, their timestamps are \
+    read from ffmpeg, defaults to False
+    :type keyframes_only: bool, optional
+    :param start_time: if not None video is read from this time in seconds, defaults to None
+    :type start_time: float, optional
+    :param duration: if not None only this duration of video in seconds is read, defaults to None
+    :type duration: float, optional
+    """
+
+    # Size of data written to stdin of ffmpeg at a time
+    _feed_chunk_size = 1024 * 1024
+
+    def __init__(
+        self, source, start_frame=0, frame_step=1, threads=None, frame_width=None,
+        keyframes_only=False, start_time=None, duration=None,
+    ):
+        self.start_frame = start_frame
+        self.frame_step = max(int(frame_step), 1)
+        self.keyframes_only = keyframes_only
+        self.start_time = 0.0 if start_time is None else start_time
+        # Timestamps of output frames relative to start_time, read from log of ffmpeg if keyframes_only is True
+        self.frame_timestamps = []
+        self._frame_timestamps_updated = threading.Condition()
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        # Number of frames read or grabbed, including frames dropped by ffmpeg
+        self.frame_position = 0
+        # Number of frames read from stdout of ffmpeg
+        self.no_of_output_frames = 0
+        # Last lines written by ffmpeg to stderr, used in error messages
+        self.ffmpeg_log = deque(maxlen=50)
+        self._process = None
+        self._log_reader = None
+        self._log_finished = False
+        self._grab_buffer = None
+
+        if os.getenv("FFMPEG_BINARY") is None:
+            helper._set_ffmpeg_binary_path()
+
+        # Time to which ffmpeg seeks to skip frames before start_frame without decoding them
+        seek_time = None
+        if isinstance(source, (str, os.PathLike)):
+            input_path = str(source)
+            stdin = subprocess.DEVNULL
+            if self.start_frame > 0 and start_time is None:
+                seek_time = self._get_seek_time(input_path, self.start_frame)
+        else:
+            input_path = "pipe:0"
+            stdin = subprocess.PIPE
+
+        cmd = [os.getenv("FFMPEG_BINARY"), "-hide_banner", "-nostats"]
+        if threads is not None:
+            cmd.extend(["-threads", str(threads)])
+        if keyframes_only:
+            cmd.extend(["-skip_frame", "nokey"])
+        if start_time is not None:
+            cmd.extend(["-ss", str(start_time)])
+        elif seek_time is not None:
+            cmd.extend(["-ss", "%.6f" % seek_time])
+        if duration is not None:
+            cmd.extend(["-t", str(duration)])
+        cmd.extend(["-i", input_path])
+
+        filters = []
+        if seek_time is not None:
+            # First frame after seeking is start_frame
+            if self.frame_step > 1:
+                filters.append("select=not(mod(n+%d\\,%d))" % (self.start_frame, self.frame_step))
+        elif self.start_frame > 0 or self.frame_step > 1:
+            filters.append("select=gte(n\\,%d)*not(mod(n\\,%d))" % (self.start_frame, self.frame_step))
+        if frame_width is not None:
+            filters.append("scale=%d:-2:flags=area" % frame_width)
+        if keyframes_only:
+            # Key frames are not evenly spaced, their timestamps are logged by showinfo filter
+            filters.append("showinfo")
+        if len(filters) > 0:
+            cmd.extend(["-vf", ",".join(filters)])
+
+        cmd.extend(["-f", "rawvideo", "-pix_fmt", "bgr24"])
+        # Frames are output as decoded, without dropping or duplicating frames
+        cmd.extend(_get_passthrough_args(os.getenv("FFMPEG_BINARY")))
+        cmd.append("pipe:1")
+        self._process = subprocess.Popen(
+            cmd,
+            **helper._cross_platform_popen_params(
+                {"stdin": stdin, "stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+            )
+        )
+
+        if stdin == subprocess.PIPE:
+            # Feeding thread is not joined, reading from source may block till source is closed
+            threading.Thread(target=self._feed_stdin, args=(source,), daemon=True).start()
+
+        self._read_stream_info()
+        # Rest of log is read in background, so ffmpeg never blocks on writing to stderr
+        self._log_reader = threading.Thread(target=self._read_log, daemon=True)
+        self._log_reader.start()
+
+    def _get_seek_time(self, file_path, frame_index):
+        """Returns time to which ffmpeg seeks so first frame it outputs is the frame at given index,
+        ffmpeg seeks by time and drops frames before it
+
+        :param file_path: video file path
+        :type file_path: str
+        :param frame_index: index of frame in video
+        :type frame_index: int
+        :return: time in seconds from start of the video, None if timestamps of frames can not be read
+        :rtype: float
+        """
+        try:
+            frame_timestamps = helper.get_frame_timestamps(file_path)
+        except OSError:
+            return None
+        if frame_timestamps is None or frame_index >= len(frame_timestamps):
+            return None
+        # Half way from previous frame, so rounding of timestamps does not drop the frame
+        return (frame_timestamps[frame_index - 1] + frame_timestamps[frame_index]) / 2.0
+
+    def _feed_stdin(self, source):
+        """Writes the video to stdin of ffmpeg, run in a separate thread
+
+        :param source: bytes or file-like object with read method
+        :type source: bytes or file object
+        """
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                data = memoryview(source)
+                for offset in range(0, len(data), self._feed_chunk_size):
+                    self._process.stdin.write(data[offset : offset + self._feed_chunk_size])
+            else:
+                while True:
+                    data = source.read(self._feed_chunk_size)
+                    if not data:
+                        break
+                    self._process.stdin.write(data)
+        except (BrokenPipeError, OSError, ValueError):
+            # ffmpeg stopped reading, e.g. reader was released or video is invalid
+            pass
+        finally:
+            try:
+                self._process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+    def _read_stream_info(self):
+        """Reads size and frame rate of output video stream from log of ffmpeg, it is
+        written before the first frame
+        """
+        in_output_section = False
+        for line in iter(self._process.stderr.readline, b""):
+            line = line.decode("utf8", errors="replace").rstrip()
+            if self._parse_frame_timestamp(line):
+                continue
+            self.ffmpeg_log.append(line)
+            if line.startswith("Output #0"):
+                in_output_section = True
+            elif in_output_section and " Video: " in line:
+                size_match = re.search(r" (\d{2,5})x(\d{2,5})[ ,]", line)
+                fps_match = re.search(r" ([\d.]+) (fps|tbr)", line)
+                if size_match is not None:
+                    self.width, self.height = int(size_match.group(1)), int(size_match.group(2))
+                if fps_match is not None:
+                    self.fps = float(fps_match.group(1))
+                return
+
+    def _read_log(self):
+        """Reads log of ffmpeg till it exits, run in a separate thread
+        """
+        for line in iter(self._process.stderr.readline, b""):
+            line = line.decode("utf8", errors="replace").rstrip()
+            if not self._parse_frame_timestamp(line):
+                self.ffmpeg_log.append(line)
+        with self._frame_timestamps_updated:
+            self._log_finished = True
+            self._frame_timestamps_updated.notify_all()
+
+    def _parse_frame_timestamp(self, line):
+        """Parses timestamp of a frame from a line of log of showinfo filter
+
+        :param line: line of log of ffmpeg
+        :type line: str
+        :return: True if line is logged by showinfo filter
+        :rtype: bool
+        """
+        if "showinfo" not in line:
+            return False
+        timestamp_match = re.search(r" pts_time:(\S+)", line)
+        if timestamp_match is not None:
+            with self._frame_timestamps_updated:
+                self.frame_timestamps.append(float(timestamp_match.group(1)))
+                self._frame_timestamps_updated.notify_all()
+        return True
+
+    def _get_frame_timestamp(self, output_frame_number):
+        """Returns timestamp of an output frame logged by showinfo filter, waits till it is logged
+
+        :param output_frame_number: number of frame in output of ffmpeg
+        :type output_frame_number: int
+        :return: timestamp in seconds relative to start_time, None if it is not logged
+        :rtype: float
+        """
+        with self._frame_timestamps_updated:
+            # Frame is logged by showinfo filter before it is written to stdout
+            self._frame_timestamps_updated.wait_for(
+                lambda: len(self.frame_timestamps) > output_frame_number or self._log_finished
+            )
+            if len(self.frame_timestamps) > output_frame_number:
+                return self.frame_timestamps[output_frame_number]
+        return None
+
+    def isOpened(self):
+        """Returns True if frames can be read from the video
+
+        :return: True if video stream is found by ffmpeg
+        :rtype: bool
+        """
+        return self._process is not None and self.width > 0 and self.height > 0
+
+    def _is_dropped(self, frame_index):
+        """Returns True if frame is dropped by ffmpeg
+
+        :param frame_index: index of frame in video
+        :type frame_index: int
+        :return: True if frame is not output by ffmpeg
+        :rtype: bool
+        """
+        return frame_index < self.start_frame or frame_index % self.frame_step != 0
+
+    def _read_frame_into(self, frame):
+        """Reads next frame from stdout of ffmpeg into given array
+
+        :param frame: array of frame size
+        :type frame: numpy.ndarray
+        :return: True if a complete frame is read
+        :rtype: bool
+        """
+        if not self.isOpened():
+            return False
+        buffer = memoryview(frame).cast("B")
+        no_of_bytes_read = 0
+        while no_of_bytes_read < len(buffer):
+            n = self._process.stdout.readinto(buffer[no_of_bytes_read:])
+            if not n:
+                return False
+            no_of_bytes_read = no_of_bytes_read + n
+        self.frame_position = self.frame_position + 1
+        self.no_of_output_frames = self.no_of_output_frames + 1
+        return True
+
+    def read(self):
+        """Reads next frame of the video
+
+        :return: True and frame if frame is read, else False and None
+        :rtype: tuple
+        """
+        while self._is_dropped(self.frame_position):
+            self.frame_position = self.frame_position + 1
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        if not self._read_frame_into(frame):
+            return False, None
+        return True, frame
+
+    def grab(self):
+        """Skips next frame of the video
+
+        :return: True if frame is skipped
+        :rtype: bool
+        """
+        if self._is_dropped(self.frame_position):
+            self.frame_position = self.frame_position + 1
+            return True
+        if self._grab_buffer is None:
+            self._grab_buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        return self._read_frame_into(self._grab_buffer)
+
+    def get(self, prop_id):
+        """Returns a property of the video like cv2.VideoCapture.get, supports frame width,
+        height, fps, position in frames and position in milliseconds
+
+        :param prop_id: cv2.CAP_PROP_* property id
+        :type prop_id: int
+        :return: value of property, 0 for unsupported properties
+        :rtype: float
+        """
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_position)
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            # Timestamp of last read frame, same as cv2.VideoCapture
+            if self.frame_position == 0:
+                return self.start_time * 1000.0
+            if self.keyframes_only:
+                timestamp = self._get_frame_timestamp(self.no_of_output_frames - 1)
+                if timestamp is not None:
+                    return (self.start_time + timestamp) * 1000.0
+            if self.fps <= 0:
+                return self.start_time * 1000.0
+            return (self.start_time + (self.frame_position - 1) / self.fps) * 1000.0
+        return 0.0
+
+    def release(self):
+        """Stops ffmpeg and frees its resources
+        """
+        if self._process is None:
+            return
+        self._process.stdout.close()
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        if self._log_reader is not None:
+            self._log_reader.join()
+        self._process.stderr.close()
+        self._process = None
+
+    def __del__(self):
+        self.release()
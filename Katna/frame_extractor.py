@@ -9,8 +9,29 @@ import operator
 import numpy as np
 from scipy.signal import argrelextrema
 
+import os
 import tempfile
+from collections import deque
 import Katna.config as config
+import Katna.helper_functions as helper
+from Katna.ffmpeg_reader import FFmpegVideoReader
+
+
+# Record of frame difference signal for each processed frame which has a previous frame, frame
+# difference is between the frame and previous processed frame, timestamp is in seconds. Local
+# maxima are detected separately for each segment of consecutive records, segment is the number of
+# the chunk of max_frames_in_chunk processed frames the record belongs to. in_range is True if
+# frame can be a candidate frame of the frame range the signal was computed for
+FRAME_DIFFERENCE_SIGNAL_DTYPE = np.dtype(
+    [
+        ("frame_index", np.int64),
+        ("timestamp", np.float32),
+        ("frame_difference", np.float32),
+        ("segment", np.int32),
+        ("in_range", np.bool_),
+    ]
+)
+
 
 class FrameExtractor(object):
     """Class for extraction of key frames from video : based on sum of absolute differences in LUV colorspace from given video 
@@ -22,8 +43,36 @@ class FrameExtractor(object):
         self.USE_LOCAL_MAXIMA = config.FrameExtractor.USE_LOCAL_MAXIMA
         # Lenght of sliding window taking difference
         self.len_window = config.FrameExtractor.len_window
-        # Chunk size of Images to be processed at a time in memory
+        # Number of frames after which frame differences are restarted for local maxima detection
         self.max_frames_in_chunk = config.FrameExtractor.max_frames_in_chunk
+        # Process every Nth frame of the video for frame differences
+        self.frame_sampling_step = config.FrameExtractor.frame_sampling_step
+        # Approximate number of frames per second of video to be processed, overrides frame_sampling_step
+        self.analysis_fps = config.FrameExtractor.analysis_fps
+        # Width to which frames are downscaled for computing frame differences
+        self.analysis_frame_width = config.FrameExtractor.analysis_frame_width
+        # Type of smoothing window
+        self.window_type = config.FrameExtractor.window_type
+        # Directory for frame difference signal files, if None they are saved next to video
+        self.frame_difference_signal_dir = config.FrameExtractor.frame_difference_signal_dir
+        # Duration before first read frame of a frame range to which video is seeked
+        self.seek_margin_in_sec = config.FrameExtractor.seek_margin_in_sec
+        # Decoder used for reading frames of video files
+        self.decoder_backend = config.FrameExtractor.decoder_backend
+        # Number of decoding threads and width of frames for ffmpeg decoder
+        self.ffmpeg_decoder_threads = config.FrameExtractor.ffmpeg_decoder_threads
+        self.ffmpeg_frame_width = config.FrameExtractor.ffmpeg_frame_width
+        # Decode only key frames (I-frames) of video files for finding candidate frames
+        self.keyframes_only_scan = config.FrameExtractor.keyframes_only_scan
+        # Length of smoothing window in key frames for key frames only scan
+        self.keyframe_scan_len_window = config.FrameExtractor.keyframe_scan_len_window
+        # Duration of video decoded fully after each candidate key frame of key frames only scan
+        self.keyframe_scan_refine_window_in_sec = config.FrameExtractor.keyframe_scan_refine_window_in_sec
+        # Criteria for detecting scene cuts from frame differences
+        self.scene_cut_threshold = config.FrameExtractor.scene_cut_threshold
+        self.scene_cut_ratio = config.FrameExtractor.scene_cut_ratio
+        self.scene_cut_window_len = config.FrameExtractor.scene_cut_window_len
+        self.min_scene_len_in_sec = config.FrameExtractor.min_scene_len_in_sec
 
     def __calculate_frame_difference(self, curr_frame, prev_frame):
         """Function to calculate the difference between current frame and previous frame
@@ -45,99 +94,277 @@ class FrameExtractor(object):
             return count
         return None
 
-    def __process_frame(self, frame, prev_frame, frame_diffs, frames):
+    def __get_analysis_frame(self, frame):
+        """Function to get the frame on which frame difference is computed, frame is
+        downscaled to analysis_frame_width if it is wider than analysis_frame_width
+
+        :param frame: frame from the video
+        :type frame: numpy array
+        :return: frame for computing frame difference
+        :rtype: numpy array
+        """
+        if self.analysis_frame_width is None:
+            return frame
+
+        height, width = frame.shape[:2]
+        if width <= self.analysis_frame_width:
+            return frame
+
+        analysis_frame_height = max(int(round(height * self.analysis_frame_width / width)), 1)
+        return cv2.resize(
+            frame,
+            (int(self.analysis_frame_width), analysis_frame_height),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    def __process_frame(self, frame, prev_frame):
         """Function to calculate the difference between current frame and previous frame
 
         :param frame: frame from the video
         :type frame: numpy array
         :param prev_frame: previous frame from the video in LUV format
         :type prev_frame: numpy array
-        :param frame_diffs: list of frame differences
-        :type frame_diffs: list of int
-        :param frames: list of frames
-        :type frames: list of numpy array
-        :return: previous frame and current frame
+        :return: frame difference (None for first frame) and current frame in LUV format
         :rtype: tuple
         """
 
-        luv = cv2.cvtColor(frame, cv2.COLOR_BGR2LUV)
+        luv = cv2.cvtColor(self.__get_analysis_frame(frame), cv2.COLOR_BGR2LUV)
         curr_frame = luv
         # Calculating the frame difference for previous and current frame
         frame_diff = self.__calculate_frame_difference(curr_frame, prev_frame)
-        
-        if frame_diff is not None:
-            #count, frame = frame_diff
-            frame_diffs.append(frame_diff)
-            frames.append(frame)
         del prev_frame
-        prev_frame = curr_frame
-        
-        return prev_frame, curr_frame
 
-    def __extract_all_frames_from_video__(self, videopath):
-        """Generator function for extracting frames from a input video which are sufficiently different from each other, 
-        and return result back as list of opencv images in memory
+        return frame_diff, curr_frame
 
-        :param videopath: inputvideo path
-        :type videopath: `str`
-        :return: Generator with extracted frames in max_process_frames chunks and difference between frames
-        :rtype: generator object with content of type [numpy.ndarray, numpy.ndarray] 
+    def __open_video(self, videopath, start_frame=0, step=1):
+        """Internal function for opening a video for reading its frames with decoder set in
+        config.FrameExtractor.decoder_backend, opened videos (cv2.VideoCapture or
+        Katna.ffmpeg_reader.FFmpegVideoReader objects) are returned as they are, so videos
+        which can be read only once like pipes are read from their current position
+
+        :param videopath: inputvideo path or opened video
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame which is read, frames before it are only grabbed, defaults to 0
+        :type start_frame: int, optional
+        :param step: only frames with index multiple of step are read, other frames are only grabbed, defaults to 1
+        :type step: int, optional
+        :raises ValueError: raises ValueError if decoder backend is not supported
+        :return: opened video
+        :rtype: cv2.VideoCapture or Katna.ffmpeg_reader.FFmpegVideoReader
         """
-        cap = cv2.VideoCapture(str(videopath))
+        if not isinstance(videopath, (str, os.PathLike)):
+            return videopath
+        if self.decoder_backend == "opencv":
+            return cv2.VideoCapture(str(videopath))
+        if self.decoder_backend == "ffmpeg":
+            # Frames which are only grabbed are dropped by ffmpeg before converting them to BGR
+            return FFmpegVideoReader(
+                videopath,
+                start_frame=start_frame,
+                frame_step=step,
+                threads=self.ffmpeg_decoder_threads,
+                frame_width=self.ffmpeg_frame_width,
+            )
+        raise ValueError("Decoder backend is one of 'opencv', 'ffmpeg'")
 
-        ret, frame = cap.read()
-        i = 1
-        chunk_no = 0
-        
-        while ret:
-            curr_frame = None
-            prev_frame = None
+    def __close_video(self, cap, videopath):
+        """Internal function for releasing a video opened by __open_video, opened videos
+        passed by caller are not released
 
-            frame_diffs = []
-            frames = []
-            for _ in range(0, self.max_frames_in_chunk):
-                if ret:
-                    # Calling process frame function to calculate the frame difference and adding the difference 
-                    # in **frame_diffs** list and frame to **frames** list
-                    prev_frame, curr_frame = self.__process_frame(frame, prev_frame, frame_diffs, frames)
-                    i = i + 1
-                    ret, frame = cap.read()
-                    # print(frame_count)
-                else:
-                    cap.release()
-                    break
-            chunk_no = chunk_no + 1
-            yield frames, frame_diffs
-        cap.release()
+        :param cap: opened video
+        :type cap: cv2.VideoCapture
+        :param videopath: inputvideo path or opened video passed to __open_video
+        :type videopath: `str` or cv2.VideoCapture
+        """
+        if cap is not videopath:
+            cap.release()
 
-    def __get_frames_in_local_maxima__(self, frames, frame_diffs):
-        """ Internal function for getting local maxima of key frames 
-        This functions Returns one single image with strongest change from its vicinity of frames 
-        ( vicinity defined using window length ) 
+    def __seek_video(self, cap, videopath, frame_index, position=0):
+        """Internal function for seeking a video opened with OpenCV to shortly before a frame, so
+        frames before it are not decoded. Seeking by time is not frame accurate for all videos (e.g.
+        variable frame rate videos), so index of frame reached after seeking is found from its
+        timestamp and seeking is retried from further before if it is not before the frame. If index
+        can not be found video is rewound to its start. Videos opened by caller and videos read with
+        ffmpeg decoder are not seeked, ffmpeg decoder seeks by itself.
 
-        :param object: base class inheritance
-        :type object: class:`Object`
-        :param frames: list of frames to do local maxima on
-        :type frames: `list of images`
-        :param frame_diffs: list of frame difference values 
-        :type frame_diffs: `list of images`
+        :param cap: video opened by __open_video
+        :type cap: cv2.VideoCapture
+        :param videopath: inputvideo path or opened video passed to __open_video
+        :type videopath: `str` or cv2.VideoCapture
+        :param frame_index: index of frame to be read next
+        :type frame_index: int
+        :param position: index of next frame of the video before seeking, defaults to 0
+        :type position: int, optional
+        :return: index of next frame of the video after seeking, it is not after frame_index
+        :rtype: int
+        """
+        if not isinstance(videopath, (str, os.PathLike)) or isinstance(cap, FFmpegVideoReader):
+            return position
+
+        fps = self.__get_fps(videopath)
+        margin = max(int(round(self.seek_margin_in_sec * fps)), 1)
+        # Short gaps are only grabbed
+        if frame_index - position <= margin:
+            return position
+        try:
+            frame_timestamps = helper.get_frame_timestamps(videopath)
+        except OSError:
+            return position
+        if frame_timestamps is None or frame_index >= len(frame_timestamps):
+            return position
+
+        # Timestamps of OpenCV are relative to first frame
+        frame_timestamps = frame_timestamps - frame_timestamps[0]
+        seek_frame = frame_index - margin
+        while seek_frame > position:
+            cap.set(cv2.CAP_PROP_POS_MSEC, frame_timestamps[seek_frame] * 1000.0)
+            if not cap.grab():
+                break
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            i = int(np.argmin(np.abs(frame_timestamps - timestamp)))
+            if abs(frame_timestamps[i] - timestamp) > 0.001:
+                break
+            if i < frame_index:
+                return i + 1
+            # Seeking went past the frame, seek to further before it
+            seek_frame = seek_frame - margin
+            margin = margin * 2
+
+        # Rewind, frames are grabbed from start of the video
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return 0
+
+    def __get_fps(self, videopath):
+        """Internal function for getting the frame rate of the video
 
+        :param videopath: inputvideo path or opened video
+        :type videopath: `str` or cv2.VideoCapture
+        :return: frame rate of the video, 0 if it is not known
+        :rtype: float
         """
-        extracted_key_frames = []
-        diff_array = np.array(frame_diffs)
-        # Normalizing the frame differences based on windows parameters
-        sm_diff_array = self.__smooth__(diff_array, self.len_window)
+        if isinstance(videopath, (str, os.PathLike)):
+            try:
+                fps = helper.probe_video(videopath).fps
+            except OSError:
+                return 0.0
+        else:
+            fps = videopath.get(cv2.CAP_PROP_FPS)
+        if fps is None or fps <= 0:
+            return 0.0
+        return fps
 
-        # Get the indexes of those frames which have maximum differences
-        frame_indexes = np.asarray(argrelextrema(sm_diff_array, np.greater))[0]
+    def __get_frame_sampling_step(self, videopath):
+        """Internal function for getting the step between two processed frames of the video
 
-        for frame_index in frame_indexes:
-            extracted_key_frames.append(frames[frame_index - 1])
-        del frames[:]
-        del sm_diff_array
-        del diff_array
-        del frame_diffs[:]
-        return extracted_key_frames
+        :param videopath: inputvideo path or opened video
+        :type videopath: `str` or cv2.VideoCapture
+        :return: step between two processed frames, 1 if all frames are processed
+        :rtype: int
+        """
+        if self.analysis_fps is None:
+            return max(int(self.frame_sampling_step), 1)
+
+        fps = self.__get_fps(videopath)
+        if fps <= 0:
+            return 1
+        return max(int(round(fps / self.analysis_fps)), 1)
+
+    def __get_decided_frames(self, decisions, pending_frames):
+        """Generator function for getting candidate frames for decisions of local maxima detector,
+        frames for which decision is made are removed from pending frames
+
+        :param decisions: list of (position in frame differences, is local maxima) tuples
+        :type decisions: list
+        :param pending_frames: dict of (frame index, timestamp, frame) tuples by position in frame differences
+        :type pending_frames: dict
+        :return: Generator with index of candidate frame in video, its timestamp and candidate frame
+        :rtype: generator object with content of type [int, float, numpy.ndarray]
+        """
+        for position, is_local_maxima in decisions:
+            # Local maxima at position selects frame before the position
+            frame_data = pending_frames.pop(position - 1, None)
+            if is_local_maxima and frame_data is not None:
+                yield frame_data
+
+    def __extract_candidate_frames_from_video__(
+        self, videopath, start_frame=0, end_frame=None, step=1, len_window=None, frame_difference_signal=None,
+        position=0,
+    ):
+        """Generator function for extracting frames from a input video which are sufficiently different from
+        frames in their vicinity ( vicinity defined using window length ). Local maxima of frame
+        differences are detected while video is being read, so only frames which could still be
+        a local maxima are kept in memory.
+
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame to be processed, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which processing stops (excluded), if None video is processed till end, defaults to None
+        :type end_frame: int, optional
+        :param step: only frames with index multiple of step are processed, defaults to 1
+        :type step: int, optional
+        :param len_window: length of smoothing window, if None len_window of config is used, defaults to None
+        :type len_window: int, optional
+        :param frame_difference_signal: if not None, (frame index, timestamp, frame difference, segment) \
+        tuple of each frame difference is appended to this list, defaults to None
+        :type frame_difference_signal: list, optional
+        :param position: index of next frame of an opened video, defaults to 0
+        :type position: int, optional
+        :return: Generator with index of candidate frame in video, its timestamp in seconds and candidate frame
+        :rtype: generator object with content of type [int, float, numpy.ndarray]
+        """
+        if len_window is None:
+            len_window = self.len_window
+
+        cap = self.__open_video(videopath, start_frame, step)
+
+        # Video is seeked to shortly before start_frame, frames after the position
+        # reached by seeking are only grabbed (decoded without being retrieved) to
+        # reach the start of the frame range
+        i = self.__seek_video(cap, videopath, start_frame, position)
+        ret = True
+        while ret and (i < start_frame or i % step != 0):
+            ret = cap.grab()
+            i = i + 1
+
+        if ret:
+            ret, frame = cap.read()
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+        # Frame differences are restarted at every max_frames_in_chunk th processed frame of the
+        # video, segments start at same frame indexes however the video is split into frame ranges
+        segment_len = self.max_frames_in_chunk * step
+        while ret and (end_frame is None or i < end_frame):
+            segment = i // segment_len
+            prev_frame = None
+            local_maxima_detector = LocalMaximaDetector(self.__smooth__, len_window, self.window_type)
+            # Frames which could still be local maxima by their position in frame differences
+            pending_frames = {}
+            position = 0
+            while ret and (end_frame is None or i < end_frame):
+                # Calling process frame function to calculate the frame difference
+                frame_diff, prev_frame = self.__process_frame(frame, prev_frame)
+                if frame_diff is not None:
+                    if frame_difference_signal is not None:
+                        frame_difference_signal.append((i, timestamp, frame_diff, segment))
+                    pending_frames[position] = (i, timestamp, frame)
+                    position = position + 1
+                    yield from self.__get_decided_frames(
+                        local_maxima_detector.add(frame_diff), pending_frames
+                    )
+                i = i + 1
+                # Frames in between sampled frames are only grabbed
+                while ret and i % step != 0:
+                    ret = cap.grab()
+                    i = i + 1
+                if ret:
+                    ret, frame = cap.read()
+                    timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if i % segment_len == 0:
+                    break
+            yield from self.__get_decided_frames(local_maxima_detector.flush(), pending_frames)
+            pending_frames.clear()
+        self.__close_video(cap, videopath)
 
     def __smooth__(self, x, window_len, window=config.FrameExtractor.window_type):
         """smooth the data using a window with requested size.
@@ -187,37 +414,814 @@ class FrameExtractor(object):
         y = np.convolve(w / w.sum(), s, mode="same")
         return y[window_len - 1 : -window_len + 1]
 
-    def extract_candidate_frames(self, videopath):
+    def __get_candidate_frames_in_range(self, videopath, start_frame=0, end_frame=None, frame_difference_signal=None):
+        """Generator function for candidate key-frames in a frame range of the video, frames of
+        len_window size around the frame range are also processed so frame differences are
+        smoothed same as processing the video in one go
+
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), if None frame range ends at end of video, defaults to None
+        :type end_frame: int, optional
+        :param frame_difference_signal: if not None, frame differences are appended to this list, defaults to None
+        :type frame_difference_signal: list, optional
+        :return: Generator with index of candidate frame in video, its timestamp in seconds and candidate frame
+        :rtype: generator object with content of type [int, float, numpy.ndarray]
+        """
+        if self.keyframes_only_scan and isinstance(videopath, (str, os.PathLike)):
+            yield from self.__get_candidate_frames_from_keyframes(videopath, start_frame, end_frame)
+            return
+
+        step = self.__get_frame_sampling_step(videopath)
+        # Smoothing window length in sampled frames, hanning window needs at least 3 values
+        len_window = self.len_window
+        if step > 1:
+            len_window = max(int(round(self.len_window / step)), 3)
+
+        # Extend the frame range with smoothing window on both sides
+        read_start_frame = max(start_frame - len_window * step, 0)
+        read_end_frame = None
+        if end_frame is not None:
+            read_end_frame = end_frame + len_window * step
+
+        if self.USE_LOCAL_MAXIMA:
+            # Get the frames with maximum frame difference in their vicinity using python Generators
+            frame_extractor_from_video_generator = self.__extract_candidate_frames_from_video__(
+                videopath, read_start_frame, read_end_frame, step, len_window, frame_difference_signal
+            )
+
+            for frame_index, timestamp, frame in frame_extractor_from_video_generator:
+                if frame_index >= start_frame and (end_frame is None or frame_index < end_frame):
+                    yield frame_index, timestamp, frame
+
+    def __get_candidate_frames_from_keyframes(self, videopath, start_frame=0, end_frame=None):
+        """Generator function for candidate key-frames found by decoding only key frames (I-frames)
+        of the video with ffmpeg. Frame differences are computed between consecutive key frames and
+        their local maxima are detected same as for all frames, with keyframe_scan_len_window as
+        smoothing window length. If keyframe_scan_refine_window_in_sec is not None, all frames of this
+        duration after each candidate key frame are decoded and candidate frames found in them are
+        returned instead of the key frame, key frame is returned if none are found.
+
+        Key frames of a frame range are found from timestamps of key frames read from the video without
+        decoding it, key frames of smoothing window length around the frame range are also processed, so
+        candidate frames of a frame range are same as processing the video in one go. If timestamps can
+        not be read, video is assumed to have constant frame rate and only the frame range is processed.
+
+        :param videopath: inputvideo path
+        :type videopath: `str`
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), if None frame range ends at end of video, defaults to None
+        :type end_frame: int, optional
+        :return: Generator with index of candidate frame in video, its timestamp in seconds and candidate frame
+        :rtype: generator object with content of type [int, float, numpy.ndarray]
+        """
+        fps = helper.probe_video(videopath).fps
+        if fps <= 0:
+            return
+        len_window = max(self.keyframe_scan_len_window, 3)
+
+        frame_timestamps = helper.get_frame_timestamps(videopath)
+        keyframe_timestamps = helper.get_keyframe_timestamps(videopath)
+        if frame_timestamps is None or keyframe_timestamps is None or len(keyframe_timestamps) == 0:
+            frame_timestamps = None
+            # Key frames are numbered from start of the frame range
+            read_start_keyframe = 0
+            read_end_keyframe = None
+            start_time = None
+            duration = None
+            if start_frame > 0:
+                start_time = start_frame / fps
+            if end_frame is not None:
+                duration = (end_frame - start_frame) / fps
+        else:
+            # Key frames are numbered from start of the video, so frame differences of key frames are
+            # restarted at same key frames however the video is split into frame ranges
+            keyframe_indexes = np.searchsorted(frame_timestamps, keyframe_timestamps - 1e-6)
+            read_start_keyframe = max(int(np.searchsorted(keyframe_indexes, start_frame)) - len_window, 0)
+            read_end_keyframe = None
+            start_time = None
+            duration = None
+            if read_start_keyframe > 0:
+                # Half way from previous frame, so rounding of timestamps does not drop the key frame
+                read_start_index = keyframe_indexes[read_start_keyframe]
+                start_time = (frame_timestamps[read_start_index - 1] + frame_timestamps[read_start_index]) / 2.0
+            if end_frame is not None:
+                read_end_keyframe = int(np.searchsorted(keyframe_indexes, end_frame)) + len_window
+                if read_end_keyframe < len(keyframe_indexes):
+                    read_end_index = keyframe_indexes[read_end_keyframe]
+                    end_time = (frame_timestamps[read_end_index - 1] + frame_timestamps[read_end_index]) / 2.0
+                    duration = end_time - (0.0 if start_time is None else start_time)
+
+        keyframes_reader = FFmpegVideoReader(
+            videopath,
+            threads=self.ffmpeg_decoder_threads,
+            frame_width=self.ffmpeg_frame_width,
+            keyframes_only=True,
+            start_time=start_time,
+            duration=duration,
+        )
+        # Index of last yielded frame, refine windows of close key frames can overlap
+        last_frame_index = -1
+        try:
+            # Frame indexes yielded for key frames are their numbers among key frames
+            for _, timestamp, frame in self.__extract_candidate_frames_from_video__(
+                keyframes_reader,
+                start_frame=read_start_keyframe,
+                end_frame=read_end_keyframe,
+                len_window=len_window,
+                position=read_start_keyframe,
+            ):
+                if frame_timestamps is None:
+                    frame_index = int(round(timestamp * fps))
+                else:
+                    # Index of frame with closest timestamp, frame rate of video can be variable. Frames
+                    # with same timestamp can not be told apart, first of them is taken
+                    frame_index = int(np.searchsorted(frame_timestamps, timestamp))
+                    if frame_index == len(frame_timestamps) or (
+                        frame_index > 0
+                        and timestamp - frame_timestamps[frame_index - 1] < frame_timestamps[frame_index] - timestamp
+                    ):
+                        frame_index = frame_index - 1
+                if frame_index < start_frame or (end_frame is not None and frame_index >= end_frame):
+                    continue
+                candidate_frames = [(frame_index, timestamp, frame)]
+                if self.keyframe_scan_refine_window_in_sec is not None:
+                    refined_candidate_frames = self.__get_candidate_frames_in_window(
+                        videopath, fps, frame_index, timestamp, end_frame
+                    )
+                    if len(refined_candidate_frames) > 0:
+                        candidate_frames = refined_candidate_frames
+
+                for candidate_frame in candidate_frames:
+                    if candidate_frame[0] > last_frame_index:
+                        last_frame_index = candidate_frame[0]
+                        yield candidate_frame
+        finally:
+            keyframes_reader.release()
+
+    def __get_candidate_frames_in_window(self, videopath, fps, frame_index, timestamp, end_frame=None):
+        """Internal function for decoding all frames of keyframe_scan_refine_window_in_sec duration of
+        video from given frame and finding candidate key-frames in them, video is seeked by ffmpeg,
+        so frames before the window are not decoded
+
+        :param videopath: inputvideo path
+        :type videopath: `str`
+        :param fps: frame rate of video
+        :type fps: float
+        :param frame_index: index of first frame of the window
+        :type frame_index: int
+        :param timestamp: timestamp of first frame of the window in seconds
+        :type timestamp: float
+        :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+        :type end_frame: int, optional
+        :return: list of (frame index, timestamp, frame) of candidate frames in window
+        :rtype: list
+        """
+        step = self.__get_frame_sampling_step(videopath)
+        len_window = self.len_window
+        if step > 1:
+            len_window = max(int(round(self.len_window / step)), 3)
+
+        window_reader = FFmpegVideoReader(
+            videopath,
+            frame_step=step,
+            threads=self.ffmpeg_decoder_threads,
+            frame_width=self.ffmpeg_frame_width,
+            start_time=timestamp,
+            duration=self.keyframe_scan_refine_window_in_sec,
+        )
+        candidate_frames = []
+        try:
+            for position, window_timestamp, frame in self.__extract_candidate_frames_from_video__(
+                window_reader, step=step, len_window=len_window
+            ):
+                if end_frame is None or frame_index + position < end_frame:
+                    candidate_frames.append((frame_index + position, window_timestamp, frame))
+        finally:
+            window_reader.release()
+        return candidate_frames
+
+    def extract_candidate_frames_iterator(self, videopath, start_frame=0, end_frame=None):
+        """Public generator function yielding candidate key-frames as soon as they are found
+        while the video is being read, along with their index and timestamp in the video.
+        Candidate key-frames are same as returned by extract_candidate_frames.
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), if None frame range ends at end of video, defaults to None
+        :type end_frame: int, optional
+        :return: Generator with index of candidate frame in video, its timestamp in seconds and candidate frame
+        :rtype: generator object with content of type [int, float, numpy.ndarray]
+        """
+        yield from self.__get_candidate_frames_in_range(videopath, start_frame, end_frame)
+
+    def extract_candidate_frames(self, videopath, start_frame=0, end_frame=None, return_frame_difference_signal=False):
         """ Pubic function for this module , Given and input video path
         This functions Returns one list of all candidate key-frames  
+        If start_frame or end_frame is given only candidate key-frames in the
+        frame range are returned, frames of len_window size around the frame
+        range are also processed so frame differences are smoothed same as
+        processing the video in one go.
+        If frames are sampled (see config.FrameExtractor.frame_sampling_step and
+        analysis_fps) smoothing window length is reduced by the sampling step so
+        it spans same duration of the video.
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), if None frame range ends at end of video, defaults to None
+        :type end_frame: int, optional
+        :param return_frame_difference_signal: if True frame difference signal computed while extracting candidate \
+        frames is returned too, see get_candidate_frame_indexes_from_signal, defaults to False
+        :type return_frame_difference_signal: bool, optional
+        :return: opencv.Image.Image objects, and frame difference signal as numpy array of \
+        FRAME_DIFFERENCE_SIGNAL_DTYPE records if return_frame_difference_signal is True
+        :rtype: list or tuple
+        """
+
+        frame_difference_signal = [] if return_frame_difference_signal else None
+        extracted_candidate_key_frames = [
+            frame
+            for _, _, frame in self.__get_candidate_frames_in_range(
+                videopath, start_frame, end_frame, frame_difference_signal
+            )
+        ]
+
+        if not return_frame_difference_signal:
+            return extracted_candidate_key_frames
+
+        signal = np.zeros(len(frame_difference_signal), dtype=FRAME_DIFFERENCE_SIGNAL_DTYPE)
+        if len(frame_difference_signal) > 0:
+            frame_indexes, timestamps, frame_diffs, segments = zip(*frame_difference_signal)
+            signal["frame_index"] = frame_indexes
+            signal["timestamp"] = timestamps
+            signal["frame_difference"] = frame_diffs
+            signal["segment"] = segments
+            signal["in_range"] = (signal["frame_index"] >= start_frame) & (
+                end_frame is None or signal["frame_index"] < end_frame
+            )
+        return extracted_candidate_key_frames, signal
+
+    def get_candidate_frame_indexes_from_signal(self, frame_difference_signal, len_window=None, window_type=None):
+        """Public function to detect candidate key-frames again from frame difference signal, for
+        example with a different smoothing window, without reading the video. Local maxima are
+        detected same as in extract_candidate_frames, so for same settings same candidate
+        key-frames are returned.
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param frame_difference_signal: frame difference signal as numpy array of FRAME_DIFFERENCE_SIGNAL_DTYPE records
+        :type frame_difference_signal: numpy.ndarray
+        :param len_window: length of smoothing window in frames of video, if None len_window of config is used, defaults to None
+        :type len_window: int, optional
+        :param window_type: type of smoothing window, if None window_type of config is used, defaults to None
+        :type window_type: str, optional
+        :return: indexes of candidate key-frames in video
+        :rtype: list
+        """
+        if len_window is None:
+            len_window = self.len_window
+        if window_type is None:
+            window_type = self.window_type
+        if not window_type in ["flat", "hanning", "hamming", "bartlett", "blackman"]:
+            raise ValueError("Smoothing Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
+
+        candidate_frame_indexes = []
+        if len(frame_difference_signal) == 0:
+            return candidate_frame_indexes
+
+        # Records of a segment are consecutive
+        segment_starts = np.flatnonzero(np.diff(frame_difference_signal["segment"])) + 1
+        segments = np.split(frame_difference_signal, segment_starts)
+
+        # Smoothing window length in sampled frames, same as in extract_candidate_frames
+        step = 1
+        for segment in segments:
+            if len(segment) > 1:
+                step = int(segment["frame_index"][1] - segment["frame_index"][0])
+                break
+        if step > 1:
+            len_window = max(int(round(len_window / step)), 3)
+
+        for segment in segments:
+            smoothed_frame_diffs = self.__smooth__(
+                segment["frame_difference"].astype(np.float64), len_window, window_type
+            )
+            # Local maxima at position selects frame before the position
+            for position in np.asarray(argrelextrema(smoothed_frame_diffs, np.greater))[0]:
+                if segment["in_range"][position - 1]:
+                    candidate_frame_indexes.append(int(segment["frame_index"][position - 1]))
+
+        return candidate_frame_indexes
+
+    def extract_frames(self, videopath, frame_indexes):
+        """Public function to read frames of video at given indexes, video is seeked to shortly
+        before each frame and frames in between are only grabbed, so no frame differences are computed
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param videopath: inputvideo path or opened video
+        :type videopath: `str` or cv2.VideoCapture
+        :param frame_indexes: indexes of frames in video
+        :type frame_indexes: list
+        :return: frames in increasing order of frame index
+        :rtype: list
+        """
+        frames = []
+        frame_indexes = sorted(set(frame_indexes))
+        # ffmpeg decoder seeks to first frame by itself
+        cap = self.__open_video(videopath, frame_indexes[0] if len(frame_indexes) > 0 else 0)
+        i = 0
+        for frame_index in frame_indexes:
+            # Video is seeked to shortly before frame if it is far from current position
+            i = self.__seek_video(cap, videopath, frame_index, i)
+            ret = True
+            while ret and i < frame_index:
+                ret = cap.grab()
+                i = i + 1
+            if not ret:
+                break
+            ret, frame = cap.read()
+            i = i + 1
+            if not ret:
+                break
+            frames.append(frame)
+        self.__close_video(cap, videopath)
+        return frames
+
+    def get_frame_difference_signal_path(self, videopath, start_frame=0, end_frame=None):
+        """Public function to get path of file of frame difference signal of a video, file is in
+        config.FrameExtractor.frame_difference_signal_dir or next to the video if it is None
 
         :param object: base class inheritance
         :type object: class:`Object`
         :param videopath: inputvideo path
         :type videopath: `str`
-        :return: opencv.Image.Image objects
-        :rtype: list
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+        :type end_frame: int, optional
+        :return: path of frame difference signal file
+        :rtype: str
+        """
+        signal_dir, file_name = os.path.split(os.path.abspath(videopath))
+        if self.frame_difference_signal_dir is not None:
+            signal_dir = self.frame_difference_signal_dir
+        if start_frame != 0 or end_frame is not None:
+            file_name = "%s_%d_%s" % (file_name, start_frame, "end" if end_frame is None else str(end_frame))
+        return os.path.join(signal_dir, file_name + ".frame_diff.npy")
+
+    def save_frame_difference_signal(self, frame_difference_signal, videopath, start_frame=0, end_frame=None):
+        """Public function to save frame difference signal of a video as .npy file
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param frame_difference_signal: frame difference signal as numpy array of FRAME_DIFFERENCE_SIGNAL_DTYPE records
+        :type frame_difference_signal: numpy.ndarray
+        :param videopath: inputvideo path
+        :type videopath: `str`
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+        :type end_frame: int, optional
+        :return: path of frame difference signal file
+        :rtype: str
+        """
+        signal_path = self.get_frame_difference_signal_path(videopath, start_frame, end_frame)
+        signal_dir = os.path.dirname(signal_path)
+        if not os.path.isdir(signal_dir):
+            os.makedirs(signal_dir, exist_ok=True)
+        np.save(signal_path, frame_difference_signal, allow_pickle=False)
+        return signal_path
+
+    def load_frame_difference_signal(self, videopath, start_frame=0, end_frame=None):
+        """Public function to load frame difference signal of a video saved by save_frame_difference_signal
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param videopath: inputvideo path
+        :type videopath: `str`
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+        :type end_frame: int, optional
+        :return: frame difference signal as numpy array of FRAME_DIFFERENCE_SIGNAL_DTYPE records
+        :rtype: numpy.ndarray
+        """
+        return np.load(self.get_frame_difference_signal_path(videopath, start_frame, end_frame), allow_pickle=False)
+
+    def __get_min_scene_len(self, fps, step):
+        """Internal function for getting minimum length of a scene in frames of the video
+
+        :param fps: frame rate of the video, 0 if it is not known
+        :type fps: float
+        :param step: step between two processed frames
+        :type step: int
+        :return: minimum length of a scene in frames
+        :rtype: int
+        """
+        if fps <= 0:
+            return step
+        return max(int(round(self.min_scene_len_in_sec * fps)), step)
+
+    def __get_scene_frame_records(self, videopath, start_frame=0, end_frame=None, step=1, return_keyframes=False):
+        """Generator function for reading the video and computing difference of each processed frame
+        from previous processed frame, same as for extracting candidate frames, normalized to mean
+        absolute difference of LUV values. Sharpness of a frame is variance of laplacian of lightness
+        (L channel) of the frame on which frame difference is computed.
+
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame to be processed, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which processing stops (excluded), if None video is processed till end, defaults to None
+        :type end_frame: int, optional
+        :param step: only frames with index multiple of step are processed, defaults to 1
+        :type step: int, optional
+        :param return_keyframes: if True frames and their sharpness are returned, defaults to False
+        :type return_keyframes: bool, optional
+        :return: Generator with index of frame in video, its timestamp in seconds, frame difference (None for \
+        first frame), frame and sharpness (None if return_keyframes is False)
+        :rtype: generator object with content of type [int, float, float, numpy.ndarray, float]
         """
+        cap = self.__open_video(videopath, start_frame, step)
+        try:
+            # Video is seeked to shortly before start_frame, frames in between are only grabbed
+            i = self.__seek_video(cap, videopath, start_frame)
+            ret = True
+            while ret and (i < start_frame or i % step != 0):
+                ret = cap.grab()
+                i = i + 1
+
+            if ret:
+                ret, frame = cap.read()
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+            prev_frame = None
+            while ret and (end_frame is None or i < end_frame):
+                frame_diff, prev_frame = self.__process_frame(frame, prev_frame)
+                if frame_diff is not None:
+                    frame_diff = float(frame_diff) / prev_frame.size
+                if return_keyframes:
+                    sharpness = float(cv2.Laplacian(prev_frame[:, :, 0], cv2.CV_64F).var())
+                    yield i, timestamp, frame_diff, frame, sharpness
+                else:
+                    yield i, timestamp, frame_diff, None, None
+                i = i + 1
+                # Frames in between sampled frames are only grabbed
+                while ret and i % step != 0:
+                    ret = cap.grab()
+                    i = i + 1
+                if ret:
+                    ret, frame = cap.read()
+                    timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        finally:
+            self.__close_video(cap, videopath)
+
+    def __get_scenes(self, frame_records, start_frame, end_frame, step, fps):
+        """Generator function for scenes of the video from records of processed frames. Frames before
+        start_frame only provide previous frame differences to scene cut detector. A scene is yielded
+        as soon as next scene starts, so at most sharpest frame of current scene is kept in memory.
+
+        :param frame_records: iterable of (frame index, timestamp, frame difference, frame, sharpness) tuples \
+        in order of frame index, see __get_scene_frame_records
+        :type frame_records: iterable
+        :param start_frame: index of first frame of the frame range
+        :type start_frame: int
+        :param end_frame: index of frame at which frame range ends (excluded), None for end of video
+        :type end_frame: int
+        :param step: step between two processed frames
+        :type step: int
+        :param fps: frame rate of the video, 0 if it is not known
+        :type fps: float
+        :return: Generator with scenes as dictionaries, see detect_scenes_iterator
+        :rtype: generator object with content of type dict
+        """
+        scene_cut_detector = SceneCutDetector(
+            self.scene_cut_threshold,
+            self.scene_cut_ratio,
+            self.scene_cut_window_len,
+            self.__get_min_scene_len(fps, step),
+        )
+        scene = None
+        for frame_index, timestamp, frame_diff, frame, sharpness in frame_records:
+            if end_frame is not None and frame_index >= end_frame:
+                break
+            is_cut = frame_diff is not None and scene_cut_detector.add(frame_index, frame_diff)
+            if frame_index < start_frame:
+                continue
+
+            if scene is None or is_cut:
+                if scene is not None:
+                    yield self.__finish_scene(scene, frame_index, timestamp)
+                scene = {
+                    "start_frame": frame_index,
+                    "start_time": timestamp,
+                    "starts_with_cut": is_cut or frame_index == 0,
+                    "no_of_frame_differences": 0,
+                    "mean_frame_difference": 0.0,
+                    "max_frame_difference": 0.0,
+                }
+            if frame_diff is not None and not is_cut:
+                # Sum of frame differences till scene is finished
+                scene["no_of_frame_differences"] += 1
+                scene["mean_frame_difference"] += frame_diff
+                scene["max_frame_difference"] = max(scene["max_frame_difference"], frame_diff)
+
+            if frame is not None and ("keyframe" not in scene or sharpness > scene["keyframe_sharpness"]):
+                scene["keyframe"] = frame
+                scene["keyframe_index"] = frame_index
+                scene["keyframe_timestamp"] = timestamp
+                scene["keyframe_sharpness"] = sharpness
+            last_frame_index = frame_index
+            last_timestamp = timestamp
+
+        if scene is not None:
+            scene_end_frame = last_frame_index + step
+            if end_frame is not None:
+                scene_end_frame = min(scene_end_frame, end_frame)
+            scene_end_time = last_timestamp
+            if fps > 0:
+                scene_end_time = last_timestamp + (scene_end_frame - last_frame_index) / fps
+            yield self.__finish_scene(scene, scene_end_frame, scene_end_time)
+
+    def __finish_scene(self, scene, end_frame, end_time):
+        """Internal function for setting end and statistics of a scene
+
+        :param scene: scene with sum of its frame differences
+        :type scene: dict
+        :param end_frame: index of frame at which scene ends (excluded)
+        :type end_frame: int
+        :param end_time: timestamp of end of scene in seconds
+        :type end_time: float
+        :return: scene
+        :rtype: dict
+        """
+        scene["end_frame"] = end_frame
+        scene["end_time"] = end_time
+        scene["no_of_frames"] = end_frame - scene["start_frame"]
+        if scene["no_of_frame_differences"] > 0:
+            scene["mean_frame_difference"] = scene["mean_frame_difference"] / scene["no_of_frame_differences"]
+        return scene
+
+    def detect_scenes_iterator(self, videopath, start_frame=0, end_frame=None, return_keyframes=False):
+        """Public generator function yielding scenes (shots) of the video as soon as they end while
+        the video is being read. Scene cuts are detected from the same LUV frame differences which
+        are used for finding candidate key-frames (see config.FrameExtractor for scene cut criteria),
+        so video is read only once. If return_keyframes is True sharpest frame of each scene is
+        returned with the scene, only sharpest frame of current scene is kept in memory.
 
-        extracted_candidate_key_frames = []
+        Each scene is a dictionary with keys "start_frame", "end_frame" (excluded), "start_time",
+        "end_time" (in seconds), "no_of_frames", "starts_with_cut" (False if scene starts at start of
+        frame range without a cut), "no_of_frame_differences", "mean_frame_difference" and
+        "max_frame_difference" (mean absolute difference of LUV values between consecutive processed
+        frames of the scene), and "keyframe", "keyframe_index", "keyframe_timestamp" and
+        "keyframe_sharpness" if return_keyframes is True.
 
-        # Get all frames from video in chunks using python Generators
-        frame_extractor_from_video_generator = self.__extract_all_frames_from_video__(
-            videopath
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), if None frame range ends at end of video, defaults to None
+        :type end_frame: int, optional
+        :param return_keyframes: if True sharpest frame of each scene is returned, defaults to False
+        :type return_keyframes: bool, optional
+        :return: Generator with scenes as dictionaries
+        :rtype: generator object with content of type dict
+        """
+        step = self.__get_frame_sampling_step(videopath)
+        fps = self.__get_fps(videopath)
+        # Frames before the frame range are processed too, so a cut at start of the frame
+        # range is detected with frame differences before it
+        read_start_frame = max(
+            start_frame - max(self.scene_cut_window_len * step, self.__get_min_scene_len(fps, step)), 0
+        )
+        if not isinstance(videopath, (str, os.PathLike)):
+            read_start_frame = start_frame
+        frame_records = self.__get_scene_frame_records(
+            videopath, read_start_frame, end_frame, step, return_keyframes
         )
+        try:
+            yield from self.__get_scenes(frame_records, start_frame, end_frame, step, fps)
+        finally:
+            frame_records.close()
+
+    def detect_scenes(self, videopath, start_frame=0, end_frame=None, return_keyframes=False):
+        """Public function to detect scenes (shots) of the video, see detect_scenes_iterator
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param videopath: inputvideo path or opened video, opened video is read from its current position
+        :type videopath: `str` or cv2.VideoCapture
+        :param start_frame: index of first frame of the frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), if None frame range ends at end of video, defaults to None
+        :type end_frame: int, optional
+        :param return_keyframes: if True sharpest frame of each scene is returned, defaults to False
+        :type return_keyframes: bool, optional
+        :return: scenes as dictionaries in order of frame index
+        :rtype: list
+        """
+        return list(self.detect_scenes_iterator(videopath, start_frame, end_frame, return_keyframes))
+
+    def detect_scenes_from_signal(self, frame_difference_signal, videopath):
+        """Public function to detect scenes (shots) of the video from its frame difference signal
+        returned by extract_candidate_frames or saved while extracting keyframes, so scenes are found
+        without reading the video again. Frame differences are normalized with size of frames they
+        were computed on, which is found from the video and current config, so signal should be
+        computed with same analysis_frame_width and decoder settings. Scenes are same as returned by
+        detect_scenes without keyframes, except that there is no frame difference at start of each
+        segment of the signal.
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param frame_difference_signal: frame difference signal as numpy array of FRAME_DIFFERENCE_SIGNAL_DTYPE records
+        :type frame_difference_signal: numpy.ndarray
+        :param videopath: inputvideo path of the signal
+        :type videopath: `str`
+        :return: scenes as dictionaries in order of frame index, see detect_scenes_iterator
+        :rtype: list
+        """
+        in_range_indexes = np.flatnonzero(frame_difference_signal["in_range"])
+        if len(in_range_indexes) == 0:
+            return []
+
+        frame_indexes = frame_difference_signal["frame_index"]
+        step = 1
+        if len(frame_indexes) > 1:
+            step = int(np.min(np.diff(frame_indexes)))
+
+        frame_records = [
+            (int(record["frame_index"]), float(record["timestamp"]), float(record["frame_difference"]), None, None)
+            for record in frame_difference_signal
+        ]
+        start_frame = int(frame_indexes[in_range_indexes[0]])
+        if in_range_indexes[0] == 0 and start_frame == step:
+            # First frame of the video has no frame difference
+            start_frame = 0
+            frame_records.insert(0, (0, 0.0, None, None, None))
+        end_frame = int(frame_indexes[in_range_indexes[-1]]) + step
+
+        video_info = helper.probe_video(videopath)
+        width, height = video_info.width, video_info.height
+        if self.decoder_backend == "ffmpeg" and self.ffmpeg_frame_width is not None and width > 0:
+            # Height of frames scaled by ffmpeg is rounded to even number
+            height = max(int(round(height * self.ffmpeg_frame_width / width / 2.0)) * 2, 2)
+            width = self.ffmpeg_frame_width
+        if self.analysis_frame_width is not None and width > self.analysis_frame_width:
+            height = max(int(round(height * self.analysis_frame_width / width)), 1)
+            width = self.analysis_frame_width
+        no_of_values = max(width * height * 3, 1)
+
+        frame_records = [
+            (frame_index, timestamp, None if frame_diff is None else frame_diff / no_of_values, frame, sharpness)
+            for frame_index, timestamp, frame_diff, frame, sharpness in frame_records
+        ]
+        return list(self.__get_scenes(frame_records, start_frame, end_frame, step, video_info.fps))
+
+class LocalMaximaDetector(object):
+    """Class for online detection of local maxima of smoothed frame differences. Frame
+    differences are added one at a time and for each position of frame differences it
+    is returned if position is a local maxima as soon as smoothed values around the
+    position can not change anymore. Result is same as finding local maxima of frame
+    differences smoothed in one go.
+
+    :param smooth: function used for smoothing the frame differences
+    :type smooth: function
+    :param len_window: length of smoothing window
+    :type len_window: int
+    :param window_type: type of smoothing window, defaults to config.FrameExtractor.window_type
+    :type window_type: str, optional
+    """
+
+    def __init__(self, smooth, len_window, window_type=config.FrameExtractor.window_type):
+        if not window_type in ["flat", "hanning", "hamming", "bartlett", "blackman"]:
+            raise ValueError("Smoothing Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
+
+        self.smooth = smooth
+        self.len_window = len_window
+        self.window_type = window_type
+        # Smoothed value at a position depends on frame differences from
+        # len_window // 2 positions before to lookahead positions after the position
+        self.lookahead = len_window - 1 - len_window // 2
+
+        if window_type == "flat":
+            w = np.ones(len_window, "d")
+        else:
+            w = getattr(np, window_type)(len_window)
+        self.window = w / w.sum()
+
+        self.frame_diffs = []
+        # Smoothed frame differences which can not change anymore
+        self.smoothed_frame_diffs = []
+        # First position for which local maxima decision is not made yet
+        self.next_position = 0
+
+    def add(self, frame_diff):
+        """Adds a frame difference and returns decisions which can be made with it
+
+        :param frame_diff: frame difference
+        :type frame_diff: int
+        :return: list of (position, is local maxima) tuples
+        :rtype: list
+        """
+        self.frame_diffs.append(frame_diff)
+        n = len(self.frame_diffs)
+        if n <= self.len_window:
+            return []
+
+        if len(self.smoothed_frame_diffs) == 0:
+            # Smoothed values at start depend on reflected frame differences,
+            # compute them once enough frame differences are available
+            smoothed_frame_diffs = self.smooth(np.array(self.frame_diffs), self.len_window, self.window_type)
+            self.smoothed_frame_diffs = list(smoothed_frame_diffs[: n - self.lookahead])
+        else:
+            start = n - 1 - self.lookahead - self.len_window // 2
+            frame_diffs = np.array(self.frame_diffs[start : start + self.len_window], dtype=np.float64)
+            self.smoothed_frame_diffs.append(np.convolve(frame_diffs, self.window, mode="valid")[0])
+
+        decisions = []
+        while self.next_position + 1 < len(self.smoothed_frame_diffs):
+            position = self.next_position
+            sm = self.smoothed_frame_diffs
+            is_local_maxima = position > 0 and sm[position] > sm[position - 1] and sm[position] > sm[position + 1]
+            decisions.append((position, is_local_maxima))
+            self.next_position = position + 1
+        return decisions
+
+    def flush(self):
+        """Returns decisions for all the remaining positions assuming no more frame differences
+        will be added
 
-        # Loop over every frame in the frame extractor generator object and calculate the
-        # local maxima of frames 
-        for frames, frame_diffs in frame_extractor_from_video_generator:
-            extracted_candidate_key_frames_chunk = []
-            if self.USE_LOCAL_MAXIMA:
-
-                # Getting the frame with maximum frame difference
-                extracted_candidate_key_frames_chunk = self.__get_frames_in_local_maxima__(
-                    frames, frame_diffs
-                )
-                extracted_candidate_key_frames.extend(
-                    extracted_candidate_key_frames_chunk
-                )
-
-        return extracted_candidate_key_frames
+        :return: list of (position, is local maxima) tuples
+        :rtype: list
+        """
+        n = len(self.frame_diffs)
+        local_maxima = set()
+        if n > 0:
+            smoothed_frame_diffs = self.smooth(np.array(self.frame_diffs), self.len_window, self.window_type)
+            local_maxima = set(np.asarray(argrelextrema(smoothed_frame_diffs, np.greater))[0])
+
+        decisions = [(position, position in local_maxima) for position in range(self.next_position, n)]
+        self.next_position = n
+        return decisions
+
+
+class SceneCutDetector(object):
+    """Class for online detection of scene cuts from frame differences. A frame is a scene cut
+    if its frame difference is at least threshold and at least ratio times mean frame difference
+    of window_len previous frames, and previous scene cut is at least min_scene_len frames before.
+    Comparing with previous frame differences avoids detecting fast motion as scene cuts.
+
+    :param threshold: minimum frame difference of a scene cut
+    :type threshold: float
+    :param ratio: minimum ratio of frame difference of a scene cut to mean of previous frame differences
+    :type ratio: float
+    :param window_len: number of previous frame differences
+    :type window_len: int
+    :param min_scene_len: minimum length of a scene in frames of video
+    :type min_scene_len: int
+    """
+
+    def __init__(self, threshold, ratio, window_len, min_scene_len):
+        self.threshold = threshold
+        self.ratio = ratio
+        self.min_scene_len = min_scene_len
+        self.previous_frame_diffs = deque(maxlen=max(int(window_len), 1))
+        self.last_cut_frame_index = None
+
+    def add(self, frame_index, frame_diff):
+        """Adds difference of a frame from previous processed frame
+
+        :param frame_index: index of frame in video
+        :type frame_index: int
+        :param frame_diff: frame difference
+        :type frame_diff: float
+        :return: True if frame is a scene cut
+        :rtype: bool
+        """
+        is_cut = (
+            len(self.previous_frame_diffs) > 0
+            and frame_diff >= self.threshold
+            and frame_diff >= self.ratio * np.mean(self.previous_frame_diffs)
+            and (
+                self.last_cut_frame_index is None
+                or frame_index - self.last_cut_frame_index >= self.min_scene_len
+            )
+        )
+        if is_cut:
+            self.last_cut_frame_index = frame_index
+        self.previous_frame_diffs.append(frame_diff)
+        return is_cut
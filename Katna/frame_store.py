@@ -0,0 +1,145 @@
+"""
+.. module:: Katna.frame_store
+    :platform: Platfrom Independent
+    :synopsis: This module has class for passing frames between processes using shared memory
+"""
+
+import os
+import numpy as np
+
+try:
+    # shared_memory module is available from python 3.8
+    from multiprocessing import shared_memory
+    from multiprocessing import resource_tracker
+except ImportError:
+    shared_memory = None
+    resource_tracker = None
+
+
+def _is_shared_memory_available():
+    """Function to check if frames can be passed between processes using shared memory
+
+    :return: True if multiprocessing.shared_memory module is available else False
+    :rtype: bool
+    """
+    return shared_memory is not None
+
+
+def _can_return_frame_store_from_worker():
+    """Function to check if a frame store created in a worker process can be returned
+    to the parent process. On Windows shared memory is freed as soon as the worker
+    process closes it, so frame stores can only be passed to worker processes.
+
+    :return: True if frame store can be returned from worker process else False
+    :rtype: bool
+    """
+    return _is_shared_memory_available() and os.name != "nt"
+
+
+def _ensure_shared_memory_tracking():
+    """Function to start resource tracker in this process before creating worker processes.
+    Forked worker processes then register shared memory they create with the same resource
+    tracker, otherwise each worker process starts its own resource tracker which frees the
+    shared memory created by the worker process as soon as it exits.
+    """
+    if resource_tracker is not None and os.name != "nt":
+        resource_tracker.ensure_running()
+
+
+class SharedFrameStore(object):
+    """Class for storing a list of frames in a single shared memory block.
+    When the store is pickled, for example while passing it to or returning it
+    from multiprocessing pool workers, only the name of shared memory block and
+    layout of the frames is pickled, frames are read from shared memory as numpy
+    arrays without copying them. Process creating the store is responsible for
+    calling unlink, or for handing this responsibility over to the process the
+    store is returned to.
+
+    :param frames: list of frames to be stored
+    :type frames: list of numpy.ndarray
+    :raises OSError: raises OSError if shared memory block can not be created
+    """
+
+    def __init__(self, frames):
+        if not _is_shared_memory_available():
+            raise OSError("Shared memory is not supported by this python version")
+
+        # (offset, shape, dtype) of each frame in shared memory block
+        self.layout = []
+        size = 0
+        for frame in frames:
+            self.layout.append((size, frame.shape, frame.dtype.str))
+            size = size + frame.nbytes
+
+        # Writing to shared memory which can not be backed by /dev/shm crashes the process
+        # with SIGBUS, so make sure it has enough space before creating the block
+        if os.path.isdir("/dev/shm") and hasattr(os, "statvfs"):
+            stat = os.statvfs("/dev/shm")
+            if stat.f_bavail * stat.f_frsize < size:
+                raise OSError("Not enough space in /dev/shm for storing frames")
+
+        # Shared memory block can not be of zero size
+        self._shared_memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.name = self._shared_memory.name
+        for index in range(len(frames)):
+            self[index][...] = frames[index]
+
+    def __getstate__(self):
+        """Function to get the state of store for pickling, shared memory block is not pickled
+        """
+        return {"name": self.name, "layout": self.layout}
+
+    def __setstate__(self, state):
+        """Function to update the state of store after unpickling, shared memory block is
+        attached when a frame is read
+        """
+        self.name = state["name"]
+        self.layout = state["layout"]
+        self._shared_memory = None
+
+    def __get_shared_memory(self):
+        """Function to get the shared memory block of store, attaching to it if needed
+
+        :return: shared memory block
+        :rtype: multiprocessing.shared_memory.SharedMemory
+        """
+        if self._shared_memory is None:
+            self._shared_memory = shared_memory.SharedMemory(name=self.name)
+        return self._shared_memory
+
+    def __len__(self):
+        return len(self.layout)
+
+    def __getitem__(self, index):
+        """Function to get a frame of store, returned frame is a view on shared memory
+        block and is valid until store is closed
+
+        :param index: index of frame
+        :type index: int
+        :return: frame
+        :rtype: numpy.ndarray
+        """
+        offset, shape, dtype = self.layout[index]
+        return np.ndarray(shape, dtype=dtype, buffer=self.__get_shared_memory().buf, offset=offset)
+
+    def get_frames(self):
+        """Function to get all the frames of store as views on shared memory block
+
+        :return: list of frames
+        :rtype: list of numpy.ndarray
+        """
+        return [self[index] for index in range(len(self))]
+
+    def close(self):
+        """Function to detach store from shared memory block in this process,
+        all the frames read from store must be deleted before closing it
+        """
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+            self._shared_memory = None
+
+    def unlink(self):
+        """Function to free the shared memory block, memory is released once all
+        the processes have closed the store
+        """
+        self.__get_shared_memory().unlink()
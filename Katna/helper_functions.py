@@ -5,6 +5,7 @@
 """
 import os
 import cv2
+import functools
 import operator
 import numpy as np
 from scipy.signal import argrelextrema
@@ -16,6 +17,7 @@ import tempfile
 import Katna.config as config
 import subprocess
 import re
+import threading
 import ffmpy
 from imageio_ffmpeg import get_ffmpeg_exe
 
@@ -57,6 +59,184 @@ def _convert_to_seconds(time):
     return sum(mult * part for mult, part in zip(factors, reversed(time)))
 
 
+class VideoInfo(object):
+    """Class for metadata of a video read from its container header
+
+    :param is_valid: True if video can be opened and its first frame can be decoded
+    :type is_valid: bool
+    :param width: width of video frames
+    :type width: int
+    :param height: height of video frames
+    :type height: int
+    :param fps: frame rate of video
+    :type fps: float
+    :param frame_count: number of frames of video
+    :type frame_count: int
+    """
+
+    def __init__(self, is_valid, width=0, height=0, fps=0.0, frame_count=0):
+        self.is_valid = is_valid
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+
+    @property
+    def frame_size_in_bytes(self):
+        """Size of a decoded BGR frame in bytes"""
+        return self.width * self.height * 3
+
+    @property
+    def duration(self):
+        """Duration of video in seconds"""
+        if self.fps <= 0:
+            return 0.0
+        return self.frame_count / self.fps
+
+
+@functools.lru_cache(maxsize=config.Video.video_probe_cache_size)
+def _probe_video(file_path, file_size, file_mtime_ns):
+    """Function to read metadata of a video, result is memoized, size and modification
+    time of the file are part of the key so a changed file is probed again
+
+    :param file_path: absolute path of video file
+    :type file_path: str
+    :param file_size: size of video file in bytes
+    :type file_size: int
+    :param file_mtime_ns: modification time of video file in nanoseconds
+    :type file_mtime_ns: int
+    :return: metadata of video
+    :rtype: VideoInfo
+    """
+    try:
+        vid = cv2.VideoCapture(file_path)
+        try:
+            if not vid.isOpened():
+                return VideoInfo(False)
+            width = int(vid.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(vid.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = vid.get(cv2.CAP_PROP_FPS)
+            frame_count = int(vid.get(cv2.CAP_PROP_FRAME_COUNT))
+            # Frame properties are read from container header, making sure first frame
+            # can be decoded, it is not converted to BGR
+            is_valid = width > 0 and height > 0 and fps > 0 and vid.grab()
+            return VideoInfo(is_valid, width, height, fps, frame_count)
+        finally:
+            vid.release()
+    except cv2.error as e:
+        #print("cv2.error:", e)
+        return VideoInfo(False)
+
+
+def probe_video(file_path):
+    """Function to get metadata of a video, results are memoized per path, size and
+    modification time of the file, so a video is opened only once by keyframe
+    extraction and compression
+
+    :param file_path: video filename
+    :type file_path: str
+    :raises OSError: raises OSError if video file can not be accessed
+    :return: metadata of video
+    :rtype: VideoInfo
+    """
+    file_stat = os.stat(file_path)
+    return _probe_video(os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=config.Video.frame_timestamps_cache_size)
+def _get_frame_timestamps(file_path, file_size, file_mtime_ns):
+    """Function to read timestamps of frames and key frames of first video stream of a video from
+    its packets with ffmpeg, packets are only demuxed, not decoded. Result is memoized, size and
+    modification time of the file are part of the key so a changed file is read again
+
+    :param file_path: absolute path of video file
+    :type file_path: str
+    :param file_size: size of video file in bytes
+    :type file_size: int
+    :param file_mtime_ns: modification time of video file in nanoseconds
+    :type file_mtime_ns: int
+    :return: timestamps of frames and timestamps of key frames in display order in seconds from \
+    start of the video, None and None if they can not be read
+    :rtype: tuple
+    """
+    if os.getenv("FFMPEG_BINARY") is None:
+        _set_ffmpeg_binary_path()
+    cmd = [
+        os.getenv("FFMPEG_BINARY"), "-hide_banner", "-nostats", "-i", file_path,
+        "-map", "0:v:0", "-c", "copy", "-f", "framecrc", "-",
+    ]
+    try:
+        proc = subprocess.run(
+            cmd,
+            **_cross_platform_popen_params(
+                {"stdin": subprocess.DEVNULL, "stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+            )
+        )
+    except OSError:
+        return None, None
+    if proc.returncode != 0:
+        return None, None
+
+    # Timestamps passed to ffmpeg -ss are relative to start time of the video
+    start_match = re.search(r"Duration: .*, start: (-?[\d.]+)", proc.stderr.decode("utf8", errors="replace"))
+    start_time = float(start_match.group(1)) if start_match is not None else 0.0
+
+    time_base = None
+    pts = []
+    keyframe_pts = []
+    for line in proc.stdout.decode("utf8", errors="replace").splitlines():
+        if line.startswith("#tb 0:"):
+            numerator, denominator = line.split(":", 1)[1].strip().split("/")
+            time_base = int(numerator) / int(denominator)
+        elif line and not line.startswith("#"):
+            # stream index, dts, pts, duration, size, checksum of each packet, followed by
+            # flags of the packet if it is not just a key frame
+            fields = line.split(",")
+            if len(fields) < 3:
+                return None, None
+            pts.append(int(fields[2]))
+            flags = fields[6].strip() if len(fields) > 6 else "F=0x1"
+            if flags.startswith("F=") and int(flags[2:], 16) & 1:
+                keyframe_pts.append(int(fields[2]))
+    if time_base is None or len(pts) == 0 or min(pts) == -(2 ** 63):
+        # Packets without timestamps
+        return None, None
+    return (
+        np.sort(np.array(pts, dtype=np.int64)) * time_base - start_time,
+        np.sort(np.array(keyframe_pts, dtype=np.int64)) * time_base - start_time,
+    )
+
+
+def get_frame_timestamps(file_path):
+    """Function to get timestamps of frames of a video without decoding it, results are memoized
+    per path, size and modification time of the file. Timestamps are used for seeking to frame
+    ranges of the video, frame with index i has timestamp timestamps[i] for videos read from start.
+
+    :param file_path: video filename
+    :type file_path: str
+    :raises OSError: raises OSError if video file can not be accessed
+    :return: timestamps of frames in display order in seconds from start of the video, None if \
+    they can not be read
+    :rtype: numpy.ndarray
+    """
+    file_stat = os.stat(file_path)
+    return _get_frame_timestamps(os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)[0]
+
+
+def get_keyframe_timestamps(file_path):
+    """Function to get timestamps of key frames (I-frames) of a video without decoding it, they are
+    read and memoized together with timestamps of all frames by get_frame_timestamps.
+
+    :param file_path: video filename
+    :type file_path: str
+    :raises OSError: raises OSError if video file can not be accessed
+    :return: timestamps of key frames in display order in seconds from start of the video, None if \
+    they can not be read
+    :rtype: numpy.ndarray
+    """
+    file_stat = os.stat(file_path)
+    return _get_frame_timestamps(os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)[1]
+
 @FileDecorators.validate_file_path
 def _check_if_valid_video(file_path):
     """Function to check if given video file is a valid video compatible with
@@ -74,21 +254,7 @@ def _check_if_valid_video(file_path):
         if file_extension not in config.Video.video_extensions:
             return False
 
-        vid = cv2.VideoCapture(file_path)
-        if vid.isOpened():
-            # Making sure we can read at least two frames from video
-            ret, frame = vid.read()
-            ret, frame = vid.read()
-            # Making sure video frame is not empty
-            if frame is not None:
-                return True
-            else:
-                return False
-        else:
-            return False
-    except cv2.error as e:
-        #print("cv2.error:", e)
-        return False
+        return probe_video(file_path).is_valid
     except Exception as e:
         #print("Exception:", e)
         return False
@@ -97,42 +263,25 @@ def _check_if_valid_video(file_path):
 @FileDecorators.validate_file_path
 def get_video_info(file_path):
     """
-    Function to get the video frame size in bytes.
-    :param file_path:
-    :type file_path:
-    :return:
-    :rtype:
+    Function to get the video frame size in bytes, fps and number of frames.
+    :param file_path: video filename
+    :type file_path: str
+    :return: frame size in bytes, fps and number of frames of video
+    :rtype: tuple
     """
-    try:
-        # Check if file extension of video is in list of
-        # supported/valid videos according to ffmpeg
-        file_extension = os.path.splitext(file_path)[1]
-        if file_extension not in config.Video.video_extensions:
-            return False
-
-        vid = cv2.VideoCapture(file_path)
-        if vid.isOpened():
-            # Making sure we can read at least two frames from video
-            ret, frame = vid.read()
-            ret, frame = vid.read()
-
-            frame_size_in_bytes = frame.size
+    # Check if file extension of video is in list of
+    # supported/valid videos according to ffmpeg
+    file_extension = os.path.splitext(file_path)[1]
+    if file_extension not in config.Video.video_extensions:
+        return False
 
-            fps = vid.get(cv2.CAP_PROP_FPS)
-            frame_count = vid.get(cv2.CAP_PROP_FRAME_COUNT)
-
-            # Making sure video frame is not empty
-            if frame is not None:
-                return frame_size_in_bytes, fps, frame_count
-            else:
-                raise Exception(" Could not read frame from Video.")
-        else:
-            raise Exception(" Could not read frame from Video.")
-    except cv2.error as e:
-        #print("cv2.error:", e)
-        raise Exception(" Could not read frame from Video.", e)
+    try:
+        video_info = probe_video(file_path)
     except Exception as e:
         raise Exception(" Could not read frame from Video.", e)
+    if not video_info.is_valid:
+        raise Exception(" Could not read frame from Video.")
+    return video_info.frame_size_in_bytes, video_info.fps, video_info.frame_count
 
 
 def _set_ffmpeg_binary_path():
@@ -207,3 +356,39 @@ def _cross_platform_popen_params(popen_params):
     if os.name == "nt":
         popen_params["creationflags"] = 0x08000000
     return popen_params
+
+
+def _imap_unordered_bounded(pool, func, iterable, max_in_flight):
+    """Applies func to every item of iterable using multiprocessing pool and yields results in the order
+    they complete, like pool.imap_unordered. Unlike pool.imap_unordered at most max_in_flight items are
+    submitted to pool and not yet consumed by caller at any time, so memory used by pending tasks and
+    results stays bounded even for very long iterables.
+
+    :param pool: multiprocessing pool
+    :type pool: multiprocessing.Pool
+    :param func: function to apply, must be picklable
+    :type func: function
+    :param iterable: items to process
+    :type iterable: iterable
+    :param max_in_flight: max number of submitted but not yet consumed items
+    :type max_in_flight: int
+    :return: generator of results
+    :rtype: generator
+    """
+    semaphore = threading.BoundedSemaphore(max_in_flight)
+    stopped = threading.Event()
+
+    def _gated_iterable():
+        # Runs inside pool task handler thread, blocks submission until caller consumes a result
+        for item in iterable:
+            while not semaphore.acquire(timeout=0.1):
+                if stopped.is_set():
+                    return
+            yield item
+
+    try:
+        for result in pool.imap_unordered(func, _gated_iterable()):
+            semaphore.release()
+            yield result
+    finally:
+        stopped.set()
@@ -6,12 +6,14 @@
 import os
 import cv2
 import numpy as np
+from multiprocessing import Pool, cpu_count
 from Katna.decorators import FileDecorators
 from Katna.feature_list import FeatureList
 from Katna.filter_list import FilterList
 from Katna.crop_extractor import CropExtractor
 from Katna.crop_selector import CropSelector
 import Katna.config as config
+import Katna.helper_functions as helper
 from Katna.decorators import DebugDecorators
 
 
@@ -21,6 +23,58 @@ class UserFiltersEnum:
     text = "TextDetector"
 
 
+# Image object of a pool worker process, features and filters (DNN models) are
+# loaded only once per worker process by _init_image_worker
+_worker_image = None
+
+
+def _init_image_worker():
+    """Initializer for pool worker processes, creates Image object used by the worker"""
+    global _worker_image
+    _worker_image = Image()
+
+
+def _crop_image_worker(task):
+    """Crops one image file inside pool worker process
+
+    :param task: tuple of filepath, crop_width, crop_height, num_of_crops, filters, down_sample_factor
+    :type task: tuple
+    :return: dict containing error (if any), crops and filepath of image processed, None if file is not a valid image
+    :rtype: dict
+    """
+    filepath, crop_width, crop_height, num_of_crops, filters, down_sample_factor = task
+    imgFile = _worker_image._read_image(filepath)
+    if imgFile is None:
+        return None
+
+    try:
+        crop_list = _worker_image.crop_image_from_cvimage(
+            input_image=imgFile,
+            crop_width=crop_width,
+            crop_height=crop_height,
+            num_of_crops=num_of_crops,
+            filters=filters,
+            down_sample_factor=down_sample_factor,
+        )
+        return {"crops": crop_list, "error": None, "filepath": filepath}
+    except Exception as e:
+        return {"crops": [], "error": e, "filepath": filepath}
+
+
+def _resize_image_worker(task):
+    """Resizes one image file inside pool worker process
+
+    :param task: tuple of filepath, target_width, target_height, down_sample_factor
+    :type task: tuple
+    :return: dict containing error (if any), resized image and filepath of image processed
+    :rtype: dict
+    """
+    filepath, target_width, target_height, down_sample_factor = task
+    return _worker_image._resize_image_file(
+        filepath, target_width, target_height, down_sample_factor
+    )
+
+
 class Image(object):
     """Class for all image cropping operations
 
@@ -212,7 +266,74 @@ class Image(object):
                 )
                 yield {"crops": crop_list, "error": None,"filepath": filepath}
             except Exception as e:
-                yield {"crops": crop_list, "error": e,"filepath": filepath}
+                yield {"crops": [], "error": e,"filepath": filepath}
+
+    def _get_n_processes(self, n_processes):
+        """Internal function to get number of worker processes for processing images of a directory
+
+        :param n_processes: requested number of processes, None to use all but one cpu core
+        :type n_processes: int or None
+        :return: number of processes
+        :rtype: int
+        """
+        if n_processes is None:
+            n_processes = max(cpu_count() - 1, 1)
+        return n_processes
+
+    def _walk_files(self, dir_path):
+        """Generator which yields filepaths of all the files inside a directory (recursively)
+
+        :param dir_path: Input Directory path
+        :type dir_path: str
+        :yield: filepath
+        :rtype: str
+        """
+        for path, subdirs, files in os.walk(dir_path):
+            for filename in files:
+                yield os.path.join(path, filename)
+
+    def _extract_crop_for_files_in_pool(
+        self,
+        list_of_files,
+        crop_width,
+        crop_height,
+        num_of_crops,
+        filters,
+        down_sample_factor,
+        n_processes,
+    ):
+        """Generator which crops files using a pool of worker processes and yields crop data / error for
+        each valid image file as soon as it is processed. Invalid image files are skipped.
+
+        :param list_of_files: files to process for crop
+        :type list_of_files: iterable, required
+        :param crop_width: output crop width
+        :type crop_width: int
+        :param crop_height: output crop height
+        :type crop_height: int
+        :param num_of_crops: number of crops required
+        :type num_of_crops: int
+        :param filters: filters to be applied for cropping(checks if image contains english text and the crop rectangle doesn't cut the text)
+        :type filters: list (eg. ['text'])
+        :param down_sample_factor: number by which you want to reduce image height & width (use it if image is large or to fasten the process)
+        :type down_sample_factor: int [default=8]
+        :param n_processes: number of worker processes
+        :type n_processes: int
+        :yield: dict containing error (if any), data ,and filepath of image processed
+        :rtype: dict
+        """
+        tasks = (
+            (filepath, crop_width, crop_height, num_of_crops, filters, down_sample_factor)
+            for filepath in list_of_files
+        )
+        max_in_flight = n_processes * config.Image.max_in_flight_images_per_process
+
+        with Pool(processes=n_processes, initializer=_init_image_worker) as pool:
+            for data in helper._imap_unordered_bounded(
+                pool, _crop_image_worker, tasks, max_in_flight
+            ):
+                if data is not None:
+                    yield data
 
     @FileDecorators.validate_dir_path
     def crop_image_from_dir(
@@ -224,6 +345,7 @@ class Image(object):
         writer,
         filters=[],
         down_sample_factor=config.Image.down_sample_factor,
+        n_processes=1,
     ):
         """smartly crops all the images (inside a directory) based on the specification - width and height
 
@@ -241,19 +363,31 @@ class Image(object):
         :type filters: list (eg. ['text'])
         :param down_sample_factor: number by which you want to reduce image height & width (use it if image is large or to fasten the process)
         :type down_sample_factor: int [default=8]
+        :param n_processes: number of worker processes used for cropping images in parallel, 1 crops images \
+        one by one in current process, None uses all but one cpu core, defaults to 1
+        :type n_processes: int, optional
         :return: crop dict with key as filepath and crop list for the file
         :rtype: dict
         """
 
-        valid_files = []
-        all_crops = {}
-        for path, subdirs, files in os.walk(dir_path):
-            for filename in files:
-                filepath = os.path.join(path, filename)
+        n_processes = self._get_n_processes(n_processes)
+        if n_processes > 1:
+            # Files are validated inside worker processes, results are written as soon as they complete
+            generator = self._extract_crop_for_files_in_pool(
+                self._walk_files(dir_path),
+                crop_width,
+                crop_height,
+                num_of_crops,
+                filters,
+                down_sample_factor,
+                n_processes,
+            )
+        else:
+            valid_files = []
+            for filepath in self._walk_files(dir_path):
                 if self._check_if_valid_image(filepath):
                     valid_files.append(filepath)
-        
-        if len(valid_files) > 0:
+
             generator = self._extract_crop_for_files_iterator(
                 valid_files,
                 crop_width,
@@ -263,19 +397,22 @@ class Image(object):
                 down_sample_factor
             )
 
-            for data in generator:
-                file_path = data["filepath"]
-                file_crops = data["crops"]
-                error = data["error"]
-
-                if error is None:
-                    writer.write(file_path, file_crops) 
-                    print("Completed processing for : ", file_path)
-                else:
-                    print("Error processing file : ", file_path)
-                    print(error)
-        else:
-            print("All the files in directory %s are invalid video files" % dir_path)
+        no_of_valid_files = 0
+        for data in generator:
+            no_of_valid_files += 1
+            file_path = data["filepath"]
+            file_crops = data["crops"]
+            error = data["error"]
+
+            if error is None:
+                writer.write(file_path, file_crops) 
+                print("Completed processing for : ", file_path)
+            else:
+                print("Error processing file : ", file_path)
+                print(error)
+
+        if no_of_valid_files == 0:
+            print("All the files in directory %s are invalid image files" % dir_path)
 
     def _crop_image(
         self,
@@ -447,10 +584,30 @@ class Image(object):
         :return: resized image
         :rtype: cv_image
         """
-        if not self._check_if_valid_image(file_path):
+        imgFile = self._read_image(file_path)
+        if imgFile is None:
             print("Error: Invalid Image, check image path: ", file_path)
             return
-        imgFile = cv2.imread(file_path)
+        return self._resize_image_from_cvimage(
+            imgFile, target_width, target_height, down_sample_factor
+        )
+
+    def _resize_image_from_cvimage(
+        self, imgFile, target_width, target_height, down_sample_factor
+    ):
+        """Internal function which smartly resizes the in-memory image based on the specification - width and height
+
+        :param imgFile: Input image
+        :type imgFile: numpy array, required
+        :param target_width: output image width
+        :type target_width: int
+        :param target_height: output image height
+        :type target_height: int
+        :param down_sample_factor: number by which you want to reduce image height & width (use it if image is large or to fasten the process)
+        :type down_sample_factor: int
+        :return: resized image
+        :rtype: cv_image
+        """
         input_image_height, input_image_width, _ = imgFile.shape
 
         target_image_aspect_ratio = target_width / target_height
@@ -478,6 +635,70 @@ class Image(object):
             target_image = cv2.resize(resized_image, (target_width, target_height))
             return target_image
 
+    def _resize_image_file(
+        self, filepath, target_width, target_height, down_sample_factor
+    ):
+        """Internal function which reads and resizes a single image file, file is read only once
+
+        :param filepath: Input file path
+        :type filepath: str
+        :param target_width: output image width
+        :type target_width: int
+        :param target_height: output image height
+        :type target_height: int
+        :param down_sample_factor: number by which you want to reduce image height & width
+        :type down_sample_factor: int
+        :return: dict containing error (if any), resized image (None if file is not a valid image) and filepath of image processed
+        :rtype: dict
+        """
+        imgFile = self._read_image(filepath)
+        if imgFile is None:
+            return {"image": None, "error": None, "filepath": filepath}
+        try:
+            resized_image = self._resize_image_from_cvimage(
+                imgFile, target_width, target_height, down_sample_factor
+            )
+            return {"image": resized_image, "error": None, "filepath": filepath}
+        except Exception as e:
+            return {"image": None, "error": e, "filepath": filepath}
+
+    def _resize_image_for_files_iterator(
+        self, list_of_files, target_width, target_height, down_sample_factor, n_processes
+    ):
+        """Generator which yields resized image / error for filepaths, if n_processes is more than 1 files
+        are resized in a pool of worker processes and yielded in the order they complete
+
+        :param list_of_files: files to resize
+        :type list_of_files: iterable, required
+        :param target_width: output width
+        :type target_width: int
+        :param target_height: output height
+        :type target_height: int
+        :param down_sample_factor: number by which you want to reduce image height & width
+        :type down_sample_factor: int
+        :param n_processes: number of worker processes
+        :type n_processes: int
+        :yield: dict containing error (if any), resized image and filepath of image processed
+        :rtype: dict
+        """
+        if n_processes > 1:
+            tasks = (
+                (filepath, target_width, target_height, down_sample_factor)
+                for filepath in list_of_files
+            )
+            max_in_flight = n_processes * config.Image.max_in_flight_images_per_process
+
+            with Pool(processes=n_processes, initializer=_init_image_worker) as pool:
+                for data in helper._imap_unordered_bounded(
+                    pool, _resize_image_worker, tasks, max_in_flight
+                ):
+                    yield data
+        else:
+            for filepath in list_of_files:
+                yield self._resize_image_file(
+                    filepath, target_width, target_height, down_sample_factor
+                )
+
     def _generate_crop_options_given_for_given_aspect_ratio(
         self,
         imgFile,
@@ -557,6 +778,8 @@ class Image(object):
         target_width,
         target_height,
         down_sample_factor=config.Image.down_sample_factor,
+        writer=None,
+        n_processes=1,
     ):
         """smartly resizes all the images (inside a directory) based on the specification - width and height
 
@@ -568,23 +791,41 @@ class Image(object):
         :type target_height: int
         :param down_sample_factor: number by which you want to reduce image height & width (use it if image is large or to fasten the process)
         :type down_sample_factor: int [default=8]
-        :return: dict with key as filepath and resized image as in opencv format as value
+        :param writer: optional writer object to process each resized image as soon as it is ready, \
+        if given resized images are not kept in memory and nothing is returned
+        :type writer: Writer, optional
+        :param n_processes: number of worker processes used for resizing images in parallel, 1 resizes images \
+        one by one in current process, None uses all but one cpu core, defaults to 1
+        :type n_processes: int, optional
+        :return: dict with key as filepath and resized image as in opencv format as value, None if writer is given
         :rtype: dict
         """
 
         all_resized_images = {}
-        for path, subdirs, files in os.walk(dir_path):
-            for filename in files:
-                filepath = os.path.join(path, filename)
-                image_file_path = os.path.join(path, filename)
-                if self._check_if_valid_image(image_file_path):
-                    resized_image = self.resize_image(
-                        image_file_path, target_width, target_height, down_sample_factor
-                    )
-                    all_resized_images[filepath] = resized_image
-                else:
-                    print("Error: Not a valid image file:", image_file_path)
+        generator = self._resize_image_for_files_iterator(
+            self._walk_files(dir_path),
+            target_width,
+            target_height,
+            down_sample_factor,
+            self._get_n_processes(n_processes),
+        )
+
+        for data in generator:
+            file_path = data["filepath"]
+            error = data["error"]
+
+            if error is not None:
+                print("Error processing file : ", file_path)
+                print(error)
+            elif data["image"] is None:
+                print("Error: Not a valid image file:", file_path)
+            elif writer is not None:
+                writer.write(file_path, data["image"])
+            else:
+                all_resized_images[file_path] = data["image"]
 
+        if writer is not None:
+            return None
         return all_resized_images
 
     @FileDecorators.validate_file_path
@@ -614,16 +855,23 @@ class Image(object):
         :return: Return True if valid image file else False
         :rtype: bool
         """
+        return self._read_image(file_path) is not None
+
+    def _read_image(self, file_path):
+        """Function to read image file, returns None if given file is not a valid image compatible with
+        opencv
+
+        :param file_path: image filename
+        :type file_path: str
+        :return: image if valid image file else None
+        :rtype: numpy array
+        """
         try:
-            frame = cv2.imread(file_path)
-            # Making sure video frame is not empty
-            if frame is not None:
-                return True
-            else:
-                return False
+            # imread returns None if file is not a valid image
+            return cv2.imread(file_path)
         except cv2.error as e:
             print("cv2.error:", e)
-            return False
+            return None
         except Exception as e:
             print("Exception:", e)
-            return False
+            return None
@@ -11,7 +11,7 @@ from glob import glob
 import tempfile
 import cv2
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from skimage.filters.rank import entropy
 from skimage.morphology import disk
 from skimage import img_as_float
@@ -19,6 +19,8 @@ import itertools
 import time
 from multiprocessing import Pool
 import Katna.config as config
+from Katna.frame_store import SharedFrameStore
+import Katna.frame_store as frame_store_helper
 
 
 class ImageSelector(object):
@@ -28,11 +30,17 @@ class ImageSelector(object):
 
     :param object: base class inheritance
     :type object: class:`Object`
+    :param n_processes: number of processes of multiprocessing pool created for each selection, defaults to 1
+    :type n_processes: int, optional
+    :param pool: multiprocessing pool to be used instead of creating a pool for each selection, defaults to None
+    :type pool: multiprocessing.Pool, optional
     """
 
-    def __init__(self, n_processes=1):
+    def __init__(self, n_processes=1, pool=None):
         # Setting number of processes for Multiprocessing Pool Object
         self.n_processes = n_processes
+        # Multiprocessing pool shared with caller, if None a pool is created for each selection
+        self.pool = pool
 
         # Setting for optimum Brightness values
         self.min_brightness_value = config.ImageSelector.min_brightness_value
@@ -44,6 +52,18 @@ class ImageSelector(object):
         self.max_entropy_value = config.ImageSelector.max_entropy_value
         self.entropy_step = config.ImageSelector.entropy_step 
 
+        # Setting for Contrast/Entropy score computation
+        self.entropy_engine = config.ImageSelector.entropy_engine
+        self.fast_entropy_image_width = config.ImageSelector.fast_entropy_image_width
+        self.fast_entropy_window_size = config.ImageSelector.fast_entropy_window_size
+
+        # Setting for clustering of images
+        self.clustering_engine = config.ImageSelector.clustering_engine
+        self.minibatch_kmeans_batch_size = config.ImageSelector.minibatch_kmeans_batch_size
+
+        # Pass images to worker processes using shared memory
+        self.use_shared_memory = config.ImageSelector.use_shared_memory
+
     def __get_brightness_score__(self, image):
         """Internal function to compute the brightness of input image , returns brightness score between 0 to 100.0 , 
 
@@ -71,7 +91,23 @@ class ImageSelector(object):
         :return: result of Entropy measurment
         :rtype: float value between 0.0 to 10.0
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return self.__get_gray_entropy_score__(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+
+    def __get_gray_entropy_score__(self, gray):
+        """Internal function to compute the entropy/contrast of gray scale image , returns entropy score between 0 to 10 ,
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param gray: gray scale input image
+        :type gray: Opencv Numpy Image
+        :return: result of Entropy measurment
+        :rtype: float value between 0.0 to 10.0
+        """
+        if self.entropy_engine == "fast":
+            return self.__get_fast_entropy_score__(gray)
+        if self.entropy_engine != "skimage":
+            raise ValueError("Entropy engine is one of 'skimage', 'fast'")
+
         entr_img = entropy(gray, disk(5))
         all_sum = np.sum(entr_img)
         num_of_pixels = entr_img.shape[0] * entr_img.shape[1]
@@ -79,6 +115,58 @@ class ImageSelector(object):
 
         return entropy_score
 
+    def __get_fast_entropy_score__(self, gray):
+        """Internal function to compute the entropy/contrast of gray scale image on downscaled image, local entropy
+        in a square window is computed from count of each gray level in window, counts are computed for
+        all the pixels at once using box filter, returns entropy score between 0 to 10 ,
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param gray: gray scale input image
+        :type gray: Opencv Numpy Image
+        :return: result of Entropy measurment
+        :rtype: float value between 0.0 to 10.0
+        """
+        height, width = gray.shape
+        if width > self.fast_entropy_image_width:
+            gray = cv2.resize(
+                gray,
+                (self.fast_entropy_image_width, max(int(round(height * self.fast_entropy_image_width / width)), 1)),
+                interpolation=cv2.INTER_AREA,
+            )
+
+        window_size = (self.fast_entropy_window_size, self.fast_entropy_window_size)
+        window_area = self.fast_entropy_window_size * self.fast_entropy_window_size
+        if window_area > 255:
+            raise ValueError("fast_entropy_window_size should be less than 16")
+
+        # Lookup table of count * log2(count) for gray level counts in window
+        counts = np.arange(1, window_area + 1)
+        count_log_count = np.zeros(256, dtype=np.float32)
+        count_log_count[1 : window_area + 1] = counts * np.log2(counts)
+
+        # Number of pixels in window, less than window area near the image border
+        n_pixels = cv2.boxFilter(
+            np.ones(gray.shape, dtype=np.uint8), cv2.CV_32F, window_size,
+            normalize=False, borderType=cv2.BORDER_CONSTANT,
+        )
+
+        # Entropy of window is log2(n) - sum(count * log2(count)) / n over gray levels in window
+        sum_count_log_count = np.zeros(gray.shape, dtype=np.float32)
+        for gray_level in np.flatnonzero(np.bincount(gray.ravel(), minlength=256)):
+            gray_level_count = cv2.boxFilter(
+                (gray == gray_level).view(np.uint8), cv2.CV_8U, window_size,
+                normalize=False, borderType=cv2.BORDER_CONSTANT,
+            )
+            cv2.add(sum_count_log_count, cv2.LUT(gray_level_count, count_log_count), dst=sum_count_log_count)
+
+        entr_img = np.log2(n_pixels) - sum_count_log_count / n_pixels
+        all_sum = np.sum(entr_img, dtype=np.float64)
+        num_of_pixels = entr_img.shape[0] * entr_img.shape[1]
+        entropy_score = (all_sum) / (num_of_pixels)
+
+        return entropy_score
+
     def __variance_of_laplacian__(self, image):
         """Internal function to compute the laplacian of the image and then return the focus
         measure, which is simply the variance of the laplacian,
@@ -93,7 +181,128 @@ class ImageSelector(object):
 
         return cv2.Laplacian(image, cv2.CV_64F).var()
 
-    def __filter_optimum_brightness_and_contrast_images__(self, input_img_files):
+    def __get_histogram__(self, gray):
+        """Internal function to compute 256 bins histogram of gray scale image
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param gray: gray scale input image
+        :type gray: Opencv Numpy Image
+        :return: histogram of image
+        :rtype: np.array
+        """
+        return cv2.calcHist([gray], [0], None, [256], [0, 256]).reshape((256))
+
+    def __get_frame_features__(self, image):
+        """Internal function to compute all the features of input image used for frame selection
+        in a single pass, image is converted to gray scale only once for entropy/contrast score,
+        histogram and variance of laplacian
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param image: input image
+        :type image: Opencv Numpy Image
+        :return: dictionary with brightness, entropy, histogram and sharpness of image
+        :rtype: dict
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return {
+            "brightness": self.__get_brightness_score__(image),
+            "entropy": self.__get_gray_entropy_score__(gray),
+            "histogram": self.__get_histogram__(gray),
+            "sharpness": self.__variance_of_laplacian__(gray),
+        }
+
+    def __get_frame_features_from_store__(self, task):
+        """Internal function to compute the features of images in frame store
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param task: frame store and indexes of images in frame store
+        :type task: tuple
+        :return: list of dictionaries with features of each image
+        :rtype: list
+        """
+        frame_store, indexes = task
+        features = [self.__get_frame_features__(frame_store[index]) for index in indexes]
+        frame_store.close()
+        return features
+
+    def __map(self, func, iterable):
+        """Internal function to map a function over an iterable using multiprocessing pool
+        shared with caller or a pool created for this call
+
+        :param func: function to be mapped
+        :type func: function
+        :param iterable: iterable of function arguments
+        :type iterable: iterable
+        :return: list of results
+        :rtype: list
+        """
+        if self.pool is not None:
+            return self.pool.map(func, iterable)
+
+        pool_obj = Pool(processes=self.n_processes)
+        with pool_obj:
+            return pool_obj.map(func, iterable)
+
+    def __get_frame_features_of_images__(self, input_img_files):
+        """Internal function to compute features of input images used for filtering, clustering
+        and selection of best image of each cluster in a single pass of multiprocessing pool
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param input_img_files: list of input image files
+        :type input_img_files: python list of images
+        :return: Returns dictionary with array of brightness scores, array of entropy scores, \
+        array of histograms and array of sharpness (variance of laplacian) scores
+        :rtype: dict
+        """
+        if len(input_img_files) == 0:
+            return {
+                "brightness": np.array([]),
+                "entropy": np.array([]),
+                "histogram": np.empty((0, 256), dtype=np.float32),
+                "sharpness": np.array([]),
+            }
+
+        frame_store = None
+        if self.use_shared_memory:
+            try:
+                frame_store = SharedFrameStore(input_img_files)
+            except OSError:
+                # Fallback to passing images to worker processes by pickling them
+                frame_store = None
+
+        # -------- calculating the features of images by multiprocessing ------
+        if frame_store is not None:
+            # Worker processes attach to frame store, so their shared memory must be
+            # tracked by resource tracker of this process
+            frame_store_helper._ensure_shared_memory_tracking()
+            # Each task gets frame store and a batch of indexes of images in it
+            n_tasks = min(len(input_img_files), 4 * (self.n_processes or os.cpu_count() or 1))
+            tasks = [
+                (frame_store, indexes)
+                for indexes in np.array_split(np.arange(len(input_img_files)), n_tasks)
+            ]
+            try:
+                features = list(itertools.chain.from_iterable(
+                    self.__map(self.__get_frame_features_from_store__, tasks)
+                ))
+            finally:
+                frame_store.unlink()
+                frame_store.close()
+        else:
+            features = self.__map(self.__get_frame_features__, input_img_files)
+
+        return {
+            "brightness": np.array([feature["brightness"] for feature in features]),
+            "entropy": np.array([feature["entropy"] for feature in features]),
+            "histogram": np.array([feature["histogram"] for feature in features]),
+            "sharpness": np.array([feature["sharpness"] for feature in features]),
+        }
+
+    def __filter_optimum_brightness_and_contrast_images__(self, input_img_files, brightness_score=None, entropy_score=None):
         """ Internal function for selection of given input images with following parameters :optimum brightness and contrast range ,
         returns array of image files which are in optimum brigtness and contrast/entropy range.
  
@@ -101,25 +310,36 @@ class ImageSelector(object):
         :type object: class:`Object`
         :param files: list of input image files 
         :type files: python list of images
+        :param brightness_score: precomputed brightness scores of input images, computed if None, defaults to None
+        :type brightness_score: numpy.ndarray, optional
+        :param entropy_score: precomputed entropy scores of input images, computed if None, defaults to None
+        :type entropy_score: numpy.ndarray, optional
         :return: Returns list of filtered images  
         :rtype: python list of images 
         """
 
-        n_files = len(input_img_files)
-
-        # -------- calculating the brightness and entropy score by multiprocessing ------
-        pool_obj = Pool(processes=self.n_processes)
+        if brightness_score is None or entropy_score is None:
+            frame_features = self.__get_frame_features_of_images__(input_img_files)
+            brightness_score, entropy_score = frame_features["brightness"], frame_features["entropy"]
 
-        # self.pool_obj_entropy = Pool(processes=self.n_processes)
-        with pool_obj:
-            brightness_score = np.array(
-                pool_obj.map(self.__get_brightness_score__, input_img_files)
-            )
+        # Returning only those images which are have good brightness and contrast score
+        return [
+            input_img_files[i]
+            for i in self.__get_optimum_brightness_and_contrast_indexes__(brightness_score, entropy_score)
+        ]
 
-            entropy_score = np.array(
-                pool_obj.map(self.__get_entropy_score__, input_img_files)
-            )
+    def __get_optimum_brightness_and_contrast_indexes__(self, brightness_score, entropy_score):
+        """ Internal function returns indexes of images with brightness and contrast/entropy scores in optimum range
 
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param brightness_score: brightness scores of images
+        :type brightness_score: numpy.ndarray
+        :param entropy_score: entropy scores of images
+        :type entropy_score: numpy.ndarray
+        :return: Returns list of indexes of images in optimum brightness and contrast range
+        :rtype: python list
+        """
         # -------- Check if brightness and contrast scores are in the min and max defined range ------
         brightness_ok = np.where(
             np.logical_and(
@@ -138,15 +358,97 @@ class ImageSelector(object):
             False,
         )
 
-        # Returning only those images which are have good brightness and contrast score
+        return [i for i in range(len(brightness_score)) if brightness_ok[i] and contrast_ok[i]]
 
-        return [
-            input_img_files[i]
-            for i in range(n_files)
-            if brightness_ok[i] and contrast_ok[i]
-        ]
+    def __get_histograms__(self, files):
+        """ Internal function to compute 256 bins gray scale histograms of all input image files,
+        histograms are written to a single array instead of being collected in a list
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param files: list of input image files
+        :type files: python list of opencv numpy images
+        :return: Returns array of histograms with a row for each file
+        :rtype: np.array
+        """
+        all_hists = np.empty((len(files), 256), dtype=np.float32)
+
+        # Calculating the histograms for each image and writing them into **all_hists** array
+        for i, img_file in enumerate(files):
+            all_hists[i] = self.__get_histogram__(cv2.cvtColor(img_file, cv2.COLOR_BGR2GRAY))
+
+        return all_hists
 
-    def __prepare_cluster_sets__(self, files):
+    def __get_kcenter_labels__(self, all_hists):
+        """ Internal function for greedy k-center clustering of histograms. First center is the
+        histogram closest to mean histogram and each next center is the histogram farthest from
+        centers chosen so far, each histogram is then labelled with its closest center.
+        Clustering is deterministic and needs only nb_clusters passes over the histograms. If there are
+        fewer distinct histograms than nb_clusters, each distinct histogram gets its own cluster.
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param all_hists: array of histograms with a row for each file
+        :type all_hists: np.array
+        :return: Returns array of cluster label of each histogram
+        :rtype: np.array
+        """
+        all_hists = all_hists.astype(np.float64)
+        # Squared distances are computed as |x|^2 - 2 x.c + |c|^2, so each pass is a matrix vector product
+        squared_norms = np.einsum("ij,ij->i", all_hists, all_hists)
+
+        def squared_distances(center_hist):
+            return squared_norms - 2 * all_hists.dot(center_hist) + center_hist.dot(center_hist)
+
+        centers = [int(np.argmin(squared_distances(all_hists.mean(axis=0))))]
+        # Distance of each histogram from its closest center and label of that center
+        min_distances = squared_distances(all_hists[centers[0]])
+        labels = np.zeros(len(all_hists), dtype=np.int64)
+
+        for label in range(1, self.nb_clusters):
+            center = int(np.argmax(min_distances))
+            # Farthest histogram is a repeat of a center, so there are fewer distinct histograms than
+            # clusters and choosing it again would leave a cluster without any histogram
+            if any(np.array_equal(all_hists[center], all_hists[i]) for i in centers):
+                break
+            centers.append(center)
+            distances = squared_distances(all_hists[center])
+            closer = distances < min_distances
+            labels[closer] = label
+            min_distances[closer] = distances[closer]
+
+        # Centers are distinct histograms, each belongs to its own cluster despite rounding of distances
+        labels[centers] = np.arange(len(centers))
+        return labels
+
+    def __get_cluster_labels__(self, all_hists):
+        """ Internal function for clustering histograms with engine set in config.ImageSelector.clustering_engine
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param all_hists: array of histograms with a row for each file
+        :type all_hists: np.array
+        :raises ValueError: raises ValueError if clustering engine is not supported
+        :return: Returns array of cluster label of each histogram
+        :rtype: np.array
+        """
+        if self.clustering_engine == "kmeans":
+            # Kmeans clustering on the histograms
+            kmeans = KMeans(n_clusters=self.nb_clusters, random_state=0).fit(all_hists)
+            return kmeans.labels_
+        if self.clustering_engine == "minibatch_kmeans":
+            kmeans = MiniBatchKMeans(
+                n_clusters=self.nb_clusters,
+                random_state=0,
+                batch_size=self.minibatch_kmeans_batch_size,
+                n_init=3,
+            ).fit(all_hists)
+            return kmeans.labels_
+        if self.clustering_engine == "kcenter":
+            return self.__get_kcenter_labels__(all_hists)
+        raise ValueError("Unsupported clustering engine: " + str(self.clustering_engine))
+
+    def __prepare_cluster_sets__(self, files, all_hists=None):
         """ Internal function for clustering input image files, returns array of indexs of each input file
         (which determines which cluster a given file belongs)
  
@@ -154,22 +456,16 @@ class ImageSelector(object):
         :type object: class:`Object`
         :param files: list of input image files 
         :type files: python list of opencv numpy images
+        :param all_hists: precomputed histograms of input image files, computed if None, defaults to None
+        :type all_hists: np.array, optional
         :return: Returns array containing index for each file for cluster belongingness 
         :rtype: np.array   
         """
 
-        all_hists = []
-
-        # Calculating the histograms for each image and adding them into **all_hists** list
-        for img_file in files:
-            img = cv2.cvtColor(img_file, cv2.COLOR_BGR2GRAY)
-            hist = cv2.calcHist([img], [0], None, [256], [0, 256])
-            hist = hist.reshape((256))
-            all_hists.append(hist)
+        if all_hists is None:
+            all_hists = self.__get_histograms__(files)
 
-        # Kmeans clustering on the histograms
-        kmeans = KMeans(n_clusters=self.nb_clusters, random_state=0).fit(all_hists)
-        labels = kmeans.labels_
+        labels = self.__get_cluster_labels__(all_hists)
 
         # Identifying the label for each image in the cluster and tagging them
         files_clusters_index_array = []
@@ -180,22 +476,22 @@ class ImageSelector(object):
         files_clusters_index_array = np.array(files_clusters_index_array, dtype=object)
         return files_clusters_index_array
 
-    def __get_laplacian_scores(self, files, n_images):
+    def __get_laplacian_scores(self, files, image_indexes):
         """Function to iteratee over each image in the cluster and calculates the laplacian/blurryness 
            score and adds the score to a list
 
         :param files: list of input filenames 
         :type files: python list of string
-        :param n_images: number of images in the given cluster
-        :type n_images: int
+        :param image_indexes: indexes of images in the given cluster
+        :type image_indexes: np.array
         :return: Returns list of laplacian scores for each image in the given cluster
         :rtype: python list 
         """
 
         variance_laplacians = []
         # Iterate over all images in image list
-        for image_i in n_images:
-            img_file = files[n_images[image_i]]
+        for image_i in image_indexes:
+            img_file = files[image_i]
             img = cv2.cvtColor(img_file, cv2.COLOR_BGR2GRAY)
 
             # Calculating the blurryness of image
@@ -205,7 +501,7 @@ class ImageSelector(object):
         return variance_laplacians
 
     def __get_best_images_index_from_each_cluster__(
-        self, files, files_clusters_index_array
+        self, files, files_clusters_index_array, sharpness_score=None
     ):
         """ Internal function returns index of one best image from each cluster
 
@@ -215,6 +511,8 @@ class ImageSelector(object):
         :type files: python list of string
         :param files_clusters_index_array: Input is array containing index for each file for cluster belongingness 
         :type: np.array   
+        :param sharpness_score: precomputed variance of laplacian of input files, computed if None, defaults to None
+        :type sharpness_score: np.array, optional
         :return: Returns list of filtered files which are best candidate from each cluster
         :rtype: python list 
         """
@@ -224,10 +522,15 @@ class ImageSelector(object):
         # Iterating over every image in each cluster to find the best images from every cluster
         clusters = np.arange(len(files_clusters_index_array))
         for cluster_i in clusters:
-            curr_row = files_clusters_index_array[cluster_i][0]
+            # Index arrays are of object type if all the clusters are of same size
+            curr_row = np.asarray(files_clusters_index_array[cluster_i][0], dtype=np.int64)
+            if len(curr_row) == 0:
+                continue
             # kp_lengths = []
-            n_images = np.arange(len(curr_row))
-            variance_laplacians = self.__get_laplacian_scores(files, n_images)
+            if sharpness_score is None:
+                variance_laplacians = self.__get_laplacian_scores(files, curr_row)
+            else:
+                variance_laplacians = sharpness_score[curr_row]
 
             # Selecting image with low burr(high laplacian) score
             selected_frame_of_current_cluster = curr_row[np.argmax(variance_laplacians)]
@@ -235,42 +538,80 @@ class ImageSelector(object):
 
         return filtered_items
 
-    # def __getstate__(self):
-    #     """Function to get the state of initialized class object and remove the pool object from it
-    #     """
-    #     self_dict = self.__dict__.copy()
-    #     del self_dict["pool_obj"]
-    #     return self_dict
+    def __getstate__(self):
+        """Function to get the state of initialized class object and remove the pool object from it
+        """
+        self_dict = self.__dict__.copy()
+        self_dict["pool"] = None
+        return self_dict
 
-    # def __setstate__(self, state):
-    #     """Function to update the state of initialized class object woth the pool object
-    #     """
-    #     self.__dict__.update(state)
+    def __setstate__(self, state):
+        """Function to update the state of initialized class object woth the pool object
+        """
+        self.__dict__.update(state)
 
-    def select_best_frames(self, input_key_frames, number_of_frames):
-        """[summary] Public function for Image selector class: takes list of key-frames images and number of required
-        frames as input, returns list of filtered keyframes
+    def __get_frame_features_subset__(self, frame_features, indexes):
+        """Internal function to get features of images at given indexes
 
         :param object: base class inheritance
         :type object: class:`Object`
-        :param input_key_frames: list of input keyframes in list of opencv image format 
+        :param frame_features: dictionary of feature arrays returned by __get_frame_features_of_images__
+        :type frame_features: dict
+        :param indexes: indexes of images
+        :type indexes: python list
+        :return: Returns dictionary of feature arrays of images at given indexes
+        :rtype: dict
+        """
+        indexes = np.asarray(indexes, dtype=np.int64)
+        return {feature: values[indexes] for feature, values in frame_features.items()}
+
+    def __concatenate_frame_features__(self, frame_features_list):
+        """Internal function to concatenate features of several lists of images, in the same order
+        as the lists of images are concatenated
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param frame_features_list: list of dictionaries of feature arrays
+        :type frame_features_list: python list
+        :return: Returns dictionary of concatenated feature arrays
+        :rtype: dict
+        """
+        return {
+            feature: np.concatenate([frame_features[feature] for frame_features in frame_features_list])
+            for feature in ("brightness", "entropy", "histogram", "sharpness")
+        }
+
+    def __select_best_frames_indexes__(self, input_key_frames, number_of_frames, frame_features=None):
+        """Internal function for selection of best frames, returns indexes of selected frames in input
+        keyframes along with features of all input keyframes, so callers can carry features of selected
+        frames forward instead of computing them again
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param input_key_frames: list of input keyframes in list of opencv image format
         :type input_key_frames: python list opencv images
-        :param number_of_frames: Required number of images 
-        :type: int   
-        :return: Returns list of filtered image files 
-        :rtype: python list of images
+        :param number_of_frames: Required number of images
+        :type: int
+        :param frame_features: precomputed features of input keyframes, computed if None, defaults to None
+        :type frame_features: dict, optional
+        :return: Returns list of indexes of selected frames and dictionary of features of input keyframes
+        :rtype: tuple
         """
 
         self.nb_clusters = number_of_frames
 
-        filtered_key_frames = []
-        filtered_images_list = []
         # Repeat until number of frames 
         min_brightness_values = np.arange(config.ImageSelector.min_brightness_value, -0.01, -self.brightness_step)
         max_brightness_values = np.arange(config.ImageSelector.max_brightness_value, 100.01, self.brightness_step)
         min_entropy_values = np.arange(config.ImageSelector.min_entropy_value, -0.01, -self.entropy_step)
         max_entropy_values = np.arange(config.ImageSelector.max_entropy_value, 10.01, self.entropy_step)
 
+        # Features don't depend on the thresholds, so they are computed once for all the iterations
+        # and reused for filtering, clustering and selecting best image of each cluster
+        if frame_features is None:
+            frame_features = self.__get_frame_features_of_images__(input_key_frames)
+        filtered_indexes = []
+
         for (min_brightness_value, max_brightness_value, min_entropy_value, max_entropy_value) in itertools.zip_longest(min_brightness_values, max_brightness_values, min_entropy_values, max_entropy_values): 
             if min_brightness_value is None:
                 min_brightness_value = 0.0
@@ -284,25 +625,43 @@ class ImageSelector(object):
             self.max_brightness_value = max_brightness_value
             self.min_entropy_value = min_entropy_value
             self.max_entropy_value = max_entropy_value
-            filtered_key_frames = self.__filter_optimum_brightness_and_contrast_images__(
-                input_key_frames, 
+            filtered_indexes = self.__get_optimum_brightness_and_contrast_indexes__(
+                frame_features["brightness"], frame_features["entropy"]
             )
-            if len(filtered_key_frames) >= number_of_frames:
+            if len(filtered_indexes) >= number_of_frames:
                 break
 
         # Selecting the best images from each cluster by first preparing the clusters on basis of histograms 
         # and then selecting the best images from every cluster
-        if len(filtered_key_frames) >= self.nb_clusters:
-            files_clusters_index_array = self.__prepare_cluster_sets__(filtered_key_frames)
+        if len(filtered_indexes) >= self.nb_clusters:
+            filtered_key_frames = [input_key_frames[i] for i in filtered_indexes]
+            files_clusters_index_array = self.__prepare_cluster_sets__(
+                filtered_key_frames, frame_features["histogram"][filtered_indexes]
+            )
             selected_images_index = self.__get_best_images_index_from_each_cluster__(
-                filtered_key_frames, files_clusters_index_array
+                filtered_key_frames, files_clusters_index_array, frame_features["sharpness"][filtered_indexes]
             )
-
-            for index in selected_images_index:
-                img = filtered_key_frames[index]
-                filtered_images_list.append(img)
+            selected_indexes = [filtered_indexes[index] for index in selected_images_index]
         else:
             # if number of required files are less than requested key-frames return all the files
-            for img in filtered_key_frames:
-                filtered_images_list.append(img)
-        return filtered_images_list
+            selected_indexes = filtered_indexes
+
+        return selected_indexes, frame_features
+
+    def select_best_frames(self, input_key_frames, number_of_frames, frame_features=None):
+        """[summary] Public function for Image selector class: takes list of key-frames images and number of required
+        frames as input, returns list of filtered keyframes
+
+        :param object: base class inheritance
+        :type object: class:`Object`
+        :param input_key_frames: list of input keyframes in list of opencv image format 
+        :type input_key_frames: python list opencv images
+        :param number_of_frames: Required number of images 
+        :type: int   
+        :param frame_features: precomputed features of input keyframes, computed if None, defaults to None
+        :type frame_features: dict, optional
+        :return: Returns list of filtered image files 
+        :rtype: python list of images
+        """
+        selected_indexes, _ = self.__select_best_frames_indexes__(input_key_frames, number_of_frames, frame_features)
+        return [input_key_frames[i] for i in selected_indexes]
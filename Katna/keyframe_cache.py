@@ -0,0 +1,283 @@
+"""
+.. module:: Katna.keyframe_cache
+    :platform: Platfrom Independent
+    :synopsis: This module has class for caching keyframe extraction results on disk
+"""
+
+import os
+import hashlib
+import shutil
+import tempfile
+import numpy as np
+import Katna.config as config
+
+
+# Settings of config.FrameExtractor which change candidate frames of a video, frame
+# ranges give same candidate frames as the whole video so splitting settings are left out
+CANDIDATE_FRAME_SETTINGS = (
+    "USE_LOCAL_MAXIMA",
+    "len_window",
+    "max_frames_in_chunk",
+    "frame_sampling_step",
+    "analysis_fps",
+    "analysis_frame_width",
+    "window_type",
+    "decoder_backend",
+    "ffmpeg_frame_width",
+    "keyframes_only_scan",
+)
+
+
+def _get_config_hash(config_class, setting_names=None):
+    """Function to get hash of settings of a config class, settings used for caching
+    itself are left out
+
+    :param config_class: config class
+    :type config_class: class
+    :param setting_names: names of settings to hash, if None all the settings are hashed, defaults to None
+    :type setting_names: tuple, optional
+    :return: hex digest of settings
+    :rtype: str
+    """
+    settings = []
+    for name, value in sorted(vars(config_class).items()):
+        if name.startswith("_") or name.startswith("keyframe_cache") or callable(value):
+            continue
+        if setting_names is not None and name not in setting_names:
+            continue
+        settings.append((config_class.__name__, name, repr(value)))
+    return hashlib.sha1(repr(settings).encode("utf8")).hexdigest()
+
+
+class KeyFrameCache(object):
+    """Class for caching indexes of candidate frames, their features and selected keyframes of videos
+    on disk. Each video (or frame range of a video) has an entry directory keyed by path, size and
+    modification time of the video file, frame range and settings which change candidate frames.
+    Features and selected keyframes are further keyed by image selector settings, so keyframes for
+    a different number of frames are selected again from cached features without computing frame
+    differences of the video, frames are read again from the video by their index.
+    Least recently used entries are removed when size of cache grows above max_size_in_mb.
+
+    :param cache_dir: directory to store the cache in
+    :type cache_dir: str
+    :param max_size_in_mb: maximum size of cache in MB
+    :type max_size_in_mb: float
+    """
+
+    def __init__(self, cache_dir, max_size_in_mb):
+        self.cache_dir = cache_dir
+        self.max_size_in_bytes = max_size_in_mb * 1024 * 1024
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_video_key(self, file_path, start_frame=0, end_frame=None):
+        """Returns key of cache entry of a video, frame extraction settings which change candidate
+        frames are part of the key
+
+        :param file_path: path of video file
+        :type file_path: str
+        :param start_frame: index of first frame of frame range, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+        :type end_frame: int, optional
+        :raises OSError: raises OSError if video file can not be accessed
+        :return: key of cache entry
+        :rtype: str
+        """
+        file_stat = os.stat(file_path)
+        video_id = (
+            os.path.abspath(file_path),
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            start_frame,
+            end_frame,
+            _get_config_hash(config.FrameExtractor, CANDIDATE_FRAME_SETTINGS),
+        )
+        return hashlib.sha1(repr(video_id).encode("utf8")).hexdigest()
+
+    def get_selection_key(self):
+        """Returns key of features and selected keyframes in a cache entry
+
+        :return: key of image selector settings
+        :rtype: str
+        """
+        return _get_config_hash(config.ImageSelector)
+
+    def __get_entry_path(self, video_key, file_name):
+        """Returns path of a file in cache entry of a video
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param file_name: name of file in cache entry
+        :type file_name: str
+        :return: path of file
+        :rtype: str
+        """
+        return os.path.join(self.cache_dir, video_key, file_name)
+
+    def __load(self, video_key, file_name):
+        """Loads a file of cache entry and marks the entry as recently used
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param file_name: name of file in cache entry
+        :type file_name: str
+        :return: numpy array or NpzFile, None if file is not cached or can not be read
+        :rtype: numpy.ndarray or numpy.lib.npyio.NpzFile
+        """
+        file_path = self.__get_entry_path(video_key, file_name)
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            data = np.load(file_path, allow_pickle=False)
+            os.utime(os.path.join(self.cache_dir, video_key))
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def __save(self, video_key, file_name, save_func):
+        """Saves a file in cache entry, file is written to a temporary file first and then
+        renamed, so partially written files are never read. Least recently used entries
+        are removed afterwards if cache is too big.
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param file_name: name of file in cache entry
+        :type file_name: str
+        :param save_func: function writing data to the given file object
+        :type save_func: function
+        """
+        entry_dir = os.path.join(self.cache_dir, video_key)
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            fd, temp_file_path = tempfile.mkstemp(dir=entry_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file_obj:
+                    save_func(file_obj)
+                os.replace(temp_file_path, self.__get_entry_path(video_key, file_name))
+            except BaseException:
+                os.remove(temp_file_path)
+                raise
+        except OSError as e:
+            print("Could not write keyframe cache entry : ", entry_dir)
+            print(e)
+            return
+        self.__evict()
+
+    def __evict(self):
+        """Removes least recently used entries till size of cache is less than max size
+        """
+        entries = []
+        total_size = 0
+        for video_key in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, video_key)
+            if not os.path.isdir(entry_dir):
+                continue
+            try:
+                entry_size = sum(
+                    os.path.getsize(os.path.join(entry_dir, file_name)) for file_name in os.listdir(entry_dir)
+                )
+                entries.append((os.path.getmtime(entry_dir), entry_size, entry_dir))
+            except OSError:
+                # Entry removed by another process
+                continue
+            total_size = total_size + entry_size
+
+        for _, entry_size, entry_dir in sorted(entries):
+            if total_size <= self.max_size_in_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size = total_size - entry_size
+
+    def load_candidate_frame_indexes(self, video_key):
+        """Loads indexes of candidate frames of a video
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :return: list of indexes of candidate frames in the video, None if not cached
+        :rtype: list
+        """
+        frame_indexes = self.__load(video_key, "candidate_frame_indexes.npy")
+        if frame_indexes is None:
+            return None
+        return [int(frame_index) for frame_index in frame_indexes]
+
+    def save_candidate_frame_indexes(self, video_key, frame_indexes):
+        """Saves indexes of candidate frames of a video, indexes already cached are not written again
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param frame_indexes: list of indexes of candidate frames in the video
+        :type frame_indexes: list
+        """
+        if os.path.isfile(self.__get_entry_path(video_key, "candidate_frame_indexes.npy")):
+            return
+        self.__save(
+            video_key, "candidate_frame_indexes.npy",
+            lambda file_obj: np.save(file_obj, np.array(frame_indexes, dtype=np.int64), allow_pickle=False),
+        )
+
+    def load_frame_features(self, video_key, selection_key):
+        """Loads features of candidate frames of a video computed by image selector
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param selection_key: key of image selector settings
+        :type selection_key: str
+        :return: dictionary of feature arrays, None if not cached
+        :rtype: dict
+        """
+        features = self.__load(video_key, "frame_features_" + selection_key + ".npz")
+        if features is None:
+            return None
+        with features:
+            return {feature: features[feature] for feature in features.files}
+
+    def save_frame_features(self, video_key, selection_key, frame_features):
+        """Saves features of candidate frames of a video computed by image selector
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param selection_key: key of image selector settings
+        :type selection_key: str
+        :param frame_features: dictionary of feature arrays
+        :type frame_features: dict
+        """
+        self.__save(
+            video_key, "frame_features_" + selection_key + ".npz",
+            lambda file_obj: np.savez(file_obj, **frame_features),
+        )
+
+    def load_selected_indexes(self, video_key, selection_key, no_of_frames):
+        """Loads indexes of keyframes selected from candidate frames of a video
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param selection_key: key of image selector settings
+        :type selection_key: str
+        :param no_of_frames: number of keyframes
+        :type no_of_frames: int
+        :return: list of indexes of keyframes in candidate frames, None if not cached
+        :rtype: list
+        """
+        selected_indexes = self.__load(video_key, "keyframes_%s_%d.npy" % (selection_key, no_of_frames))
+        if selected_indexes is None:
+            return None
+        return [int(index) for index in selected_indexes]
+
+    def save_selected_indexes(self, video_key, selection_key, no_of_frames, selected_indexes):
+        """Saves indexes of keyframes selected from candidate frames of a video
+
+        :param video_key: key of cache entry
+        :type video_key: str
+        :param selection_key: key of image selector settings
+        :type selection_key: str
+        :param no_of_frames: number of keyframes
+        :type no_of_frames: int
+        :param selected_indexes: list of indexes of keyframes in candidate frames
+        :type selected_indexes: list
+        """
+        self.__save(
+            video_key, "keyframes_%s_%d.npy" % (selection_key, no_of_frames),
+            lambda file_obj: np.save(file_obj, np.array(selected_indexes, dtype=np.int64), allow_pickle=False),
+        )
@@ -5,7 +5,6 @@
 """
 import os.path
 import os
-import psutil
 import sys
 import math
 import numpy as np
@@ -17,6 +16,10 @@ from Katna.decorators import FileDecorators
 
 from Katna.frame_extractor import FrameExtractor
 from Katna.image_selector import ImageSelector
+from Katna.frame_store import SharedFrameStore
+import Katna.frame_store as frame_store
+from Katna.keyframe_cache import KeyFrameCache
+from Katna.ffmpeg_reader import FFmpegVideoReader
 from Katna.mediapipe import MediaPipeAutoFlip
 import Katna.config as config
 from Katna.video_compressor import VideoCompressor
@@ -30,10 +33,127 @@ from imageio_ffmpeg import get_ffmpeg_exe
 from multiprocessing import Pool, Process, cpu_count
 import functools
 import operator
+import inspect
+import contextlib
+import weakref
+import queue
+from collections import deque
+
+
+def _shutdown_pool_after_call(method):
+    """Decorator for public methods of Video which use its pool of worker processes. If Video
+    object is not used as a context manager, pool is shut down when outermost of these calls
+    returns (or its generator is finished), so worker processes don't outlive the call
+
+    :param method: method of Video
+    :type method: function
+    :return: decorated method
+    :rtype: function
+    """
+    if inspect.isgeneratorfunction(inspect.unwrap(method)):
+
+        def using_pool(self, generator):
+            with self._using_pool():
+                yield from generator
+
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            # Arguments are validated by method when it is called, not when generator is started
+            return using_pool(self, method(self, *args, **kwargs))
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._using_pool():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _extract_candidate_frames_to_frame_store(
+    frame_extractor, videopath, start_frame=0, end_frame=None, return_frame_difference_signal=False
+):
+    """Extracts candidate frames of a video in a worker process and returns them in a
+    shared memory frame store, so frames are not pickled while returning them from
+    worker process. If shared memory can not be used list of frames is returned.
+
+    :param frame_extractor: frame extractor object
+    :type frame_extractor: Katna.frame_extractor.FrameExtractor
+    :param videopath: inputvideo path
+    :type videopath: str
+    :param start_frame: index of first frame of the frame range, defaults to 0
+    :type start_frame: int, optional
+    :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+    :type end_frame: int, optional
+    :param return_frame_difference_signal: if True frame difference signal is returned too, defaults to False
+    :type return_frame_difference_signal: bool, optional
+    :return: frame store of candidate frames or list of candidate frames, and frame difference \
+    signal if return_frame_difference_signal is True
+    :rtype: Katna.frame_store.SharedFrameStore or list or tuple
+    """
+    candidate_frames = frame_extractor.extract_candidate_frames(
+        videopath, start_frame, end_frame, return_frame_difference_signal
+    )
+    if return_frame_difference_signal:
+        candidate_frames, frame_difference_signal = candidate_frames
+
+    if frame_store._can_return_frame_store_from_worker():
+        try:
+            candidate_frames = SharedFrameStore(candidate_frames)
+        except OSError:
+            pass
+
+    if return_frame_difference_signal:
+        return candidate_frames, frame_difference_signal
+    return candidate_frames
+
+
+def _extract_candidate_frames_with_timestamps(
+    frame_extractor, videopath, start_frame=0, end_frame=None, use_shared_memory=True
+):
+    """Extracts candidate frames of a frame range of a video in a worker process along with
+    their indexes and timestamps in the video, frames are returned in a shared memory frame
+    store if use_shared_memory is True and shared memory can be used
+
+    :param frame_extractor: frame extractor object
+    :type frame_extractor: Katna.frame_extractor.FrameExtractor
+    :param videopath: inputvideo path
+    :type videopath: str
+    :param start_frame: index of first frame of the frame range, defaults to 0
+    :type start_frame: int, optional
+    :param end_frame: index of frame at which frame range ends (excluded), defaults to None
+    :type end_frame: int, optional
+    :param use_shared_memory: if True frames are returned in a frame store, defaults to True
+    :type use_shared_memory: bool, optional
+    :return: frame store or list of candidate frames, list of their frame indexes and list of their timestamps in seconds
+    :rtype: tuple
+    """
+    candidate_frames = []
+    frame_indexes = []
+    timestamps = []
+    for frame_index, timestamp, frame in frame_extractor.extract_candidate_frames_iterator(
+        videopath, start_frame, end_frame
+    ):
+        frame_indexes.append(frame_index)
+        timestamps.append(timestamp)
+        candidate_frames.append(frame)
+
+    if use_shared_memory and frame_store._can_return_frame_store_from_worker():
+        try:
+            candidate_frames = SharedFrameStore(candidate_frames)
+        except OSError:
+            pass
+    return candidate_frames, frame_indexes, timestamps
 
 
 class Video(object):
-    """Class for all video frames operations
+    """Class for all video frames operations. Video object lazily creates a pool
+    of worker processes for keyframe extraction. If Video object is used as a
+    context manager the pool is reused by all the keyframe extraction calls and
+    stopped on leaving the context, otherwise it is stopped at the end of each
+    call. Pool left running (e.g. by an unfinished generator) is terminated when
+    Video object is garbage collected.
 
     :param object: base class inheritance
     :type object: class:`Object`
@@ -51,6 +171,15 @@ class Video(object):
         if self.n_processes < 1:
             self.n_processes = None
 
+        # Pool of worker processes, created on first use
+        self._pool = None
+        # Terminates the pool if Video object is garbage collected before shutdown
+        self._pool_finalizer = None
+        # True inside with block, pool is then kept for following calls
+        self._in_context = False
+        # Number of running public calls using the pool
+        self._no_of_pool_users = 0
+
         if autoflip_build_path is not None and autoflip_model_path is not None:
             self.mediapipe_autoflip = MediaPipeAutoFlip(
                 autoflip_build_path, autoflip_model_path
@@ -63,6 +192,65 @@ class Video(object):
         if not os.path.isdir(self.temp_folder):
             os.mkdir(self.temp_folder)
 
+    def __enter__(self):
+        self._in_context = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._in_context = False
+        self.shutdown()
+
+    def __getstate__(self):
+        """Function to get the state of initialized class object and remove the pool object from it
+        """
+        self_dict = self.__dict__.copy()
+        self_dict["_pool"] = None
+        self_dict["_pool_finalizer"] = None
+        return self_dict
+
+    def __setstate__(self, state):
+        """Function to update the state of initialized class object
+        """
+        self.__dict__.update(state)
+
+    def _get_pool(self):
+        """Returns pool of worker processes of Video object, pool is created on first call
+
+        :return: pool of worker processes
+        :rtype: multiprocessing.Pool
+        """
+        if self._pool is None:
+            # Worker processes return shared memory to this process, so resource tracker of
+            # this process must be running before worker processes are created
+            frame_store._ensure_shared_memory_tracking()
+            self._pool = Pool(processes=self.n_processes)
+            self._pool_finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+    @contextlib.contextmanager
+    def _using_pool(self):
+        """Context manager for a public call using the pool of worker processes, pool is shut
+        down when outermost call ends unless Video object is used as a context manager
+        """
+        self._no_of_pool_users += 1
+        try:
+            yield
+        finally:
+            self._no_of_pool_users -= 1
+            if self._no_of_pool_users == 0 and not self._in_context:
+                self.shutdown()
+
+    def shutdown(self):
+        """Stops worker processes of Video object after they finish pending tasks,
+        a new pool of worker processes is created if Video object is used again
+        """
+        if self._pool is not None:
+            self._pool_finalizer.detach()
+            self._pool_finalizer = None
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
     def _remove_clips(self, video_clips):
         """Remove video clips from the temp directory given list of video clips
 
@@ -155,64 +343,579 @@ class Video(object):
 
         print("Finished processing for files")
 
-    def _extract_keyframes_from_video(self, no_of_frames, file_path):
+    def _extract_keyframes_from_video(self, no_of_frames, file_path, start_frame=0, end_frame=None):
         """Core method to extract keyframe for a video
 
         :param no_of_frames: [description]
         :type no_of_frames: [type]
         :param file_path: [description]
         :type file_path: [type]
+        :param start_frame: index of first frame of the video to be processed, \
+        used only if config.Video.split_video_with_ffmpeg is False or keyframe cache is used, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which processing stops (excluded), if None video is processed till end, \
+        used only if config.Video.split_video_with_ffmpeg is False or keyframe cache is used, defaults to None
+        :type end_frame: int, optional
+        """
+        # Chunks of the video are processed by the pool of worker processes and candidate frames
+        # are read from keyframe cache if enabled
+        results_iterator = self._extract_keyframes_for_videos_iterator(
+            no_of_frames, [(file_path, start_frame, end_frame)], [0]
+        )
+        try:
+            data = next(results_iterator)
+        finally:
+            results_iterator.close()
+
+        if data["error"] is not None:
+            raise data["error"]
+        return data["keyframes"]
+
+    def _get_keyframe_cache(self):
+        """Returns keyframe cache if it is enabled in config.Video.keyframe_cache_dir
+
+        :return: keyframe cache or None if cache is disabled
+        :rtype: Katna.keyframe_cache.KeyFrameCache
+        """
+        if config.Video.keyframe_cache_dir is None:
+            return None
+        return KeyFrameCache(config.Video.keyframe_cache_dir, config.Video.keyframe_cache_max_size_in_mb)
+
+    def _get_extraction_tasks(self, file_path, start_frame=0, end_frame=None, split_video_with_ffmpeg=None):
+        """Splits a video in chunks to be processed in parallel, a chunk is either a clip
+        written to disk with ffmpeg or a frame range of the input video
+
+        :param file_path: video file path
+        :type file_path: str
+        :param start_frame: index of first frame of the video to be processed, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which processing stops (excluded), defaults to None
+        :type end_frame: int, optional
+        :param split_video_with_ffmpeg: if True video is split in clips with ffmpeg, if None \
+        config.Video.split_video_with_ffmpeg is used, defaults to None
+        :type split_video_with_ffmpeg: bool, optional
+        :raises Exception: raises Exception if video is invalid or corrupted
+        :return: list of clips written to disk and list of (video path, start frame, end frame) extraction tasks
+        :rtype: tuple
         """
-        # Creating the multiprocessing pool
-        self.pool_extractor = Pool(processes=self.n_processes)
         # Split the input video into chunks. Each split(video) will be stored
         # in a temp
         if not helper._check_if_valid_video(file_path):
             raise Exception("Invalid or corrupted video: " + file_path)
 
-        # split videos in chunks in smaller chunks for parallel processing.
-        chunked_videos = self._split(file_path)
-        frame_extractor = FrameExtractor()
+        if split_video_with_ffmpeg is None:
+            split_video_with_ffmpeg = config.Video.split_video_with_ffmpeg
+
+        if split_video_with_ffmpeg:
+            # split videos in chunks in smaller chunks for parallel processing.
+            chunked_videos = self._split(file_path)
+            extraction_tasks = [(chunked_video, 0, None) for chunked_video in chunked_videos]
+        else:
+            # each worker process reads its own frame range from the input video
+            chunked_videos = []
+            extraction_tasks = [
+                (file_path, chunk_start_frame, chunk_end_frame)
+                for chunk_start_frame, chunk_end_frame in self._get_frame_ranges(
+                    file_path, start_frame=start_frame, end_frame=end_frame
+                )
+            ]
+        return chunked_videos, extraction_tasks
+
+    def _get_extraction_func(self, frame_extractor):
+        """Returns function run by worker processes for an extraction task
 
-        # Passing all the clipped videos for  the frame extraction using map function of the
-        # multiprocessing pool
-        with self.pool_extractor:
-            extracted_candidate_frames = self.pool_extractor.map(
-                frame_extractor.extract_candidate_frames, chunked_videos
+        :param frame_extractor: frame extractor object
+        :type frame_extractor: Katna.frame_extractor.FrameExtractor
+        :return: function extracting candidate frames
+        :rtype: function
+        """
+        if config.Video.use_shared_memory:
+            return _extract_candidate_frames_to_frame_store
+        return frame_extractor.extract_candidate_frames
+
+    def _get_extraction_args(self, frame_extractor, extraction_task, return_frame_difference_signal=False):
+        """Returns arguments of function run by worker processes for an extraction task
+
+        :param frame_extractor: frame extractor object
+        :type frame_extractor: Katna.frame_extractor.FrameExtractor
+        :param extraction_task: (video path, start frame, end frame) extraction task
+        :type extraction_task: tuple
+        :param return_frame_difference_signal: if True function returns frame difference signal too, defaults to False
+        :type return_frame_difference_signal: bool, optional
+        :return: arguments of function returned by _get_extraction_func
+        :rtype: tuple
+        """
+        if config.Video.use_shared_memory:
+            return (frame_extractor,) + tuple(extraction_task) + (return_frame_difference_signal,)
+        return tuple(extraction_task) + (return_frame_difference_signal,)
+
+    def _merge_frame_difference_signals(self, frame_difference_signals):
+        """Merges frame difference signals of chunks of a video. Segments of each chunk are numbered
+        after segments of previous chunks, so candidate frames detected again from the merged signal
+        are same as candidate frames of the chunks.
+
+        :param frame_difference_signals: frame difference signal of each chunk in order of chunks
+        :type frame_difference_signals: list of numpy.ndarray
+        :return: frame difference signal of the video
+        :rtype: numpy.ndarray
+        """
+        segment_offset = 0
+        for frame_difference_signal in frame_difference_signals:
+            frame_difference_signal["segment"] += segment_offset
+            if len(frame_difference_signal) > 0:
+                segment_offset = frame_difference_signal["segment"][-1] + 1
+        return np.concatenate(frame_difference_signals)
+
+    def _save_frame_difference_signal(self, frame_extractor, video, frame_difference_signal):
+        """Saves frame difference signal of a video next to the video or in
+        config.FrameExtractor.frame_difference_signal_dir
+
+        :param frame_extractor: frame extractor object
+        :type frame_extractor: Katna.frame_extractor.FrameExtractor
+        :param video: (video path, start frame, end frame) of the video
+        :type video: tuple
+        :param frame_difference_signal: frame difference signal of the video merged from its chunks
+        :type frame_difference_signal: numpy.ndarray
+        """
+        try:
+            frame_extractor.save_frame_difference_signal(frame_difference_signal, *video)
+        except OSError as e:
+            print("Could not save frame difference signal of video : ", video[0])
+            print(e)
+
+    def _select_keyframes_from_candidate_frames(
+        self,
+        no_of_frames,
+        extracted_candidate_frames,
+        return_frame_features=False,
+        keyframe_cache=None,
+        video_key=None,
+        candidate_frame_indexes=None,
+    ):
+        """Selects keyframes from candidate frames returned by extraction tasks of a video
+        and frees frame stores of candidate frames
+
+        :param no_of_frames: number of keyframes to be selected
+        :type no_of_frames: int
+        :param extracted_candidate_frames: list of frame stores or lists of candidate frames, one per extraction task
+        :type extracted_candidate_frames: list
+        :param return_frame_features: if True features of selected keyframes computed by image selector are \
+        returned too, defaults to False
+        :type return_frame_features: bool, optional
+        :param keyframe_cache: keyframe cache to store indexes of candidate frames, their features and selected \
+        keyframes in, defaults to None
+        :type keyframe_cache: Katna.keyframe_cache.KeyFrameCache, optional
+        :param video_key: key of cache entry of the video, defaults to None
+        :type video_key: str, optional
+        :param candidate_frame_indexes: indexes of candidate frames in the video, nothing is cached if None, \
+        defaults to None
+        :type candidate_frame_indexes: list, optional
+        :return: list of keyframes, or list of keyframes and dictionary of their features if return_frame_features is True
+        :rtype: list or tuple
+        """
+        frame_stores = [
+            candidate_frames for candidate_frames in extracted_candidate_frames
+            if isinstance(candidate_frames, SharedFrameStore)
+        ]
+        try:
+            # Converting the nested list of extracted frames into 1D list, frames in frame
+            # stores are read without copying them
+            extracted_candidate_frames = functools.reduce(
+                operator.iconcat,
+                [
+                    candidate_frames.get_frames() if isinstance(candidate_frames, SharedFrameStore) else candidate_frames
+                    for candidate_frames in extracted_candidate_frames
+                ],
+                [],
             )
-        # Converting the nested list of extracted frames into 1D list
-        extracted_candidate_frames = functools.reduce(operator.iconcat, extracted_candidate_frames, [])
 
-        self._remove_clips(chunked_videos)
-        image_selector = ImageSelector(self.n_processes)
+            image_selector = ImageSelector(self.n_processes, pool=self._get_pool())
+
+            # Candidate frame indexes are detected again from frame difference signal, they are
+            # cached only if they match candidate frames, e.g. key frames only scan has no signal
+            if (
+                keyframe_cache is not None
+                and video_key is not None
+                and candidate_frame_indexes is not None
+                and len(candidate_frame_indexes) == len(extracted_candidate_frames)
+            ):
+                keyframe_cache.save_candidate_frame_indexes(video_key, candidate_frame_indexes)
+                selected_indexes, frame_features = self._select_best_frames_indexes_with_cache(
+                    image_selector, extracted_candidate_frames, no_of_frames, keyframe_cache, video_key
+                )
+            else:
+                selected_indexes, frame_features = image_selector.__select_best_frames_indexes__(
+                    extracted_candidate_frames, no_of_frames
+                )
+            top_frames = [extracted_candidate_frames[i] for i in selected_indexes]
 
-        top_frames = image_selector.select_best_frames(
-            extracted_candidate_frames, no_of_frames
-        )
+            del extracted_candidate_frames
 
-        del extracted_candidate_frames
+            # Copying top frames out of the frame stores before they are freed
+            if len(frame_stores) > 0:
+                top_frames = [np.array(frame) for frame in top_frames]
+        finally:
+            self._release_frame_stores(frame_stores)
 
+        if return_frame_features:
+            return top_frames, image_selector.__get_frame_features_subset__(frame_features, selected_indexes)
         return top_frames
 
+    def _select_best_frames_indexes_with_cache(
+        self, image_selector, candidate_frames, no_of_frames, keyframe_cache, video_key, frame_features=None
+    ):
+        """Selects keyframes from candidate frames of a video reusing features of candidate frames
+        and selected keyframes stored in keyframe cache, results are stored in cache if not cached
+
+        :param image_selector: image selector object
+        :type image_selector: Katna.image_selector.ImageSelector
+        :param candidate_frames: list of candidate frames
+        :type candidate_frames: list
+        :param no_of_frames: number of keyframes to be selected
+        :type no_of_frames: int
+        :param keyframe_cache: keyframe cache
+        :type keyframe_cache: Katna.keyframe_cache.KeyFrameCache
+        :param video_key: key of cache entry of the video
+        :type video_key: str
+        :param frame_features: features of candidate frames already loaded from cache, loaded if None, defaults to None
+        :type frame_features: dict, optional
+        :return: list of indexes of keyframes in candidate frames and dictionary of features of candidate frames
+        :rtype: tuple
+        """
+        selection_key = keyframe_cache.get_selection_key()
+        if frame_features is None:
+            frame_features = keyframe_cache.load_frame_features(video_key, selection_key)
+        selected_indexes = keyframe_cache.load_selected_indexes(video_key, selection_key, no_of_frames)
+        if frame_features is not None and selected_indexes is not None:
+            return selected_indexes, frame_features
+
+        features_cached = frame_features is not None
+        selected_indexes, frame_features = image_selector.__select_best_frames_indexes__(
+            candidate_frames, no_of_frames, frame_features
+        )
+        if not features_cached:
+            keyframe_cache.save_frame_features(video_key, selection_key, frame_features)
+        keyframe_cache.save_selected_indexes(video_key, selection_key, no_of_frames, selected_indexes)
+        return selected_indexes, frame_features
+
+    def _release_frame_stores(self, frame_stores):
+        """Frees shared memory of frame stores returned by frame extraction worker processes
+
+        :param frame_stores: list of frame stores
+        :type frame_stores: list of Katna.frame_store.SharedFrameStore
+        """
+        for candidate_frame_store in frame_stores:
+            candidate_frame_store.unlink()
+            try:
+                candidate_frame_store.close()
+            except BufferError:
+                # Frames of store are still referenced, store is closed once they are deleted
+                pass
+
     def _extract_keyframes_for_files_iterator(self, no_of_frames, list_of_filepaths):
         """Extract desirable number of keyframes for files in the list of filepaths.
-
-        :param no_of_frames: [description]
-        :type no_of_frames: [type]
-        :param list_of_filepaths: [description]
-        :type list_of_filepaths: [type]
-        :raises Exception: [description]
-        :return: [description]
-        :rtype: [type]
+        Chunks of all the files are processed together by the pool of worker processes,
+        so short videos with a single chunk keep all the worker processes busy. Longest
+        videos are scheduled first and result for a file is yielded as soon as all of
+        its chunks are processed, so results are not in the order of list of filepaths.
+
+        :param no_of_frames: number of keyframes to be extracted for each file
+        :type no_of_frames: int
+        :param list_of_filepaths: list of video file paths
+        :type list_of_filepaths: list
+        :return: generator of dictionaries with keyframes, error and filepath of each file
+        :rtype: generator
         """
+        file_durations = []
         for filepath in list_of_filepaths:
-            print("Running for : ", filepath)
             try:
-                keyframes = self._extract_keyframes_from_video(no_of_frames, filepath)
-                yield {"keyframes": keyframes, "error": None,"filepath": filepath}
-            except Exception as e:
-                yield {"keyframes": [],"error": e,"filepath": filepath}
+                file_durations.append(self._get_video_duration_with_cv(filepath))
+            except Exception:
+                file_durations.append(0)
+
+        videos = [(filepath, 0, None) for filepath in list_of_filepaths]
+        for data in self._extract_keyframes_for_videos_iterator(no_of_frames, videos, file_durations):
+            yield {"keyframes": data["keyframes"], "error": data["error"], "filepath": list_of_filepaths[data["index"]]}
+
+    def _extract_keyframes_for_videos_iterator(
+        self, no_of_frames, videos, video_durations, return_frame_features=False, use_cache=True
+    ):
+        """Extract desirable number of keyframes for each video in the list of videos, a video is
+        a file or a frame range of a file. Chunks of all the videos are processed together by
+        the pool of worker processes, longest videos are scheduled first and result for a video
+        is yielded as soon as all of its chunks are processed.
+
+        :param no_of_frames: number of keyframes to be extracted for each video
+        :type no_of_frames: int
+        :param videos: list of (video path, start frame, end frame) tuples
+        :type videos: list
+        :param video_durations: estimated duration of each video in seconds, used for scheduling
+        :type video_durations: list
+        :param return_frame_features: if True features of keyframes computed by image selector are \
+        yielded too, defaults to False
+        :type return_frame_features: bool, optional
+        :param use_cache: if True keyframe cache is used if it is enabled in config.Video.keyframe_cache_dir, \
+        defaults to True
+        :type use_cache: bool, optional
+        :return: generator of dictionaries with keyframes, frame features, error and index of each video in list of videos
+        :rtype: generator
+        """
+        # Scheduling longest videos first, so chunks of shorter videos fill up the
+        # worker processes at the end
+        videos_to_schedule = deque(
+            sorted(range(len(videos)), key=lambda video_index: video_durations[video_index], reverse=True)
+        )
+
+        keyframe_cache = self._get_keyframe_cache() if use_cache else None
+
+        pool = self._get_pool()
+        frame_extractor = FrameExtractor()
+        extraction_func = self._get_extraction_func(frame_extractor)
+        # Indexes of candidate frames are cached so videos are processed in frame ranges if cache is used
+        split_video_with_ffmpeg = config.Video.split_video_with_ffmpeg and keyframe_cache is None
+        # Frame indexes of clips written by ffmpeg are not frame indexes of the video, so frame
+        # difference signal is saved only if chunks are frame ranges of the video
+        save_frame_difference_signal = (
+            config.FrameExtractor.save_frame_difference_signal and not split_video_with_ffmpeg
+        )
+        # Indexes of candidate frames to be cached are detected again from frame difference signal
+        return_frame_difference_signal = save_frame_difference_signal or keyframe_cache is not None
+        # Chunks are submitted only while few chunks are pending in the pool, this bounds the
+        # candidate frames held in memory and lets frame selection tasks run without waiting
+        # for chunks of all the videos
+        max_pending_chunks = (self.n_processes or cpu_count()) * config.Video.max_pending_chunks_per_process
+
+        # (video index, chunk index, candidate frames, error) of processed chunks are put in
+        # this queue by result handler thread of the pool
+        processed_chunks = queue.Queue()
+        # State of videos which have chunks being processed, keyed by video index
+        videos_in_progress = {}
+        no_of_pending_chunks = 0
+
+        try:
+            while len(videos_to_schedule) > 0 or len(videos_in_progress) > 0:
+                while len(videos_to_schedule) > 0 and no_of_pending_chunks < max_pending_chunks:
+                    video_index = videos_to_schedule.popleft()
+                    video_path, start_frame, end_frame = videos[video_index]
+                    print("Running for : ", video_path)
+
+                    video_key = None
+                    if keyframe_cache is not None:
+                        try:
+                            video_key = keyframe_cache.get_video_key(video_path, start_frame, end_frame)
+                        except OSError:
+                            video_key = None
+
+                    cached_candidate_frame_indexes = None
+                    if video_key is not None:
+                        cached_candidate_frame_indexes = keyframe_cache.load_candidate_frame_indexes(video_key)
+
+                    if cached_candidate_frame_indexes is not None:
+                        # Frame differences of the video are not computed again, keyframes are selected
+                        # from candidate frames read by their cached indexes
+                        yield self._get_cached_video_keyframes_result(
+                            no_of_frames,
+                            video_index,
+                            video_path,
+                            cached_candidate_frame_indexes,
+                            keyframe_cache,
+                            video_key,
+                            return_frame_features,
+                        )
+                        continue
+
+                    try:
+                        chunked_videos, extraction_tasks = self._get_extraction_tasks(
+                            video_path, start_frame, end_frame, split_video_with_ffmpeg
+                        )
+                    except Exception as e:
+                        yield {"keyframes": [], "frame_features": None, "error": e, "index": video_index}
+                        continue
+
+                    video_state = {
+                        "index": video_index,
+                        "chunked_videos": chunked_videos,
+                        "candidate_frames": [None] * len(extraction_tasks),
+                        "no_of_pending_chunks": len(extraction_tasks),
+                        "error": None,
+                        "keyframe_cache": keyframe_cache,
+                        "video_key": video_key,
+                        "frame_difference_signals": [None] * len(extraction_tasks),
+                        "candidate_frame_indexes": None,
+                    }
+                    if len(extraction_tasks) == 0:
+                        yield self._get_video_keyframes_result(no_of_frames, video_state, return_frame_features)
+                        continue
+
+                    videos_in_progress[video_index] = video_state
+                    for chunk_index, extraction_task in enumerate(extraction_tasks):
+                        chunk_key = (video_index, chunk_index)
+                        pool.apply_async(
+                            extraction_func,
+                            self._get_extraction_args(
+                                frame_extractor, extraction_task, return_frame_difference_signal
+                            ),
+                            callback=lambda result, chunk_key=chunk_key: processed_chunks.put(
+                                chunk_key + (result, None)
+                            ),
+                            error_callback=lambda error, chunk_key=chunk_key: processed_chunks.put(
+                                chunk_key + (None, error)
+                            ),
+                        )
+                        no_of_pending_chunks += 1
+
+                if no_of_pending_chunks == 0:
+                    continue
+
+                # Waiting for next processed chunk of any video
+                video_index, chunk_index, candidate_frames, error = processed_chunks.get()
+                no_of_pending_chunks -= 1
+                video_state = videos_in_progress[video_index]
+                if return_frame_difference_signal and candidate_frames is not None:
+                    candidate_frames, video_state["frame_difference_signals"][chunk_index] = candidate_frames
+                video_state["candidate_frames"][chunk_index] = candidate_frames
+                if error is not None and video_state["error"] is None:
+                    video_state["error"] = error
+                video_state["no_of_pending_chunks"] -= 1
+
+                if video_state["no_of_pending_chunks"] == 0:
+                    del videos_in_progress[video_index]
+                    if return_frame_difference_signal and video_state["error"] is None:
+                        frame_difference_signal = self._merge_frame_difference_signals(
+                            video_state["frame_difference_signals"]
+                        )
+                        video_state["frame_difference_signals"] = None
+                        if save_frame_difference_signal:
+                            self._save_frame_difference_signal(
+                                frame_extractor, videos[video_index], frame_difference_signal
+                            )
+                        if video_state["video_key"] is not None:
+                            video_state["candidate_frame_indexes"] = (
+                                frame_extractor.get_candidate_frame_indexes_from_signal(frame_difference_signal)
+                            )
+                        del frame_difference_signal
+                    yield self._get_video_keyframes_result(no_of_frames, video_state, return_frame_features)
+        finally:
+            # If iteration is stopped early, wait for pending chunks and free their candidate frames
+            while no_of_pending_chunks > 0:
+                video_index, chunk_index, candidate_frames, error = processed_chunks.get()
+                no_of_pending_chunks -= 1
+                if return_frame_difference_signal and candidate_frames is not None:
+                    candidate_frames, _ = candidate_frames
+                videos_in_progress[video_index]["candidate_frames"][chunk_index] = candidate_frames
+            for video_state in videos_in_progress.values():
+                self._remove_clips(video_state["chunked_videos"])
+                self._release_frame_stores(
+                    [
+                        candidate_frames for candidate_frames in video_state["candidate_frames"]
+                        if isinstance(candidate_frames, SharedFrameStore)
+                    ]
+                )
+
+    def _get_video_keyframes_result(self, no_of_frames, video_state, return_frame_features=False):
+        """Selects keyframes of a video once all of its chunks are processed
+
+        :param no_of_frames: number of keyframes to be extracted
+        :type no_of_frames: int
+        :param video_state: state of video with index, chunked videos, candidate frames of each chunk, error \
+        and keyframe cache and key of cache entry of the video
+        :type video_state: dict
+        :param return_frame_features: if True features of keyframes are returned too, defaults to False
+        :type return_frame_features: bool, optional
+        :return: dictionary with keyframes, frame features, error and index of video
+        :rtype: dict
+        """
+        self._remove_clips(video_state["chunked_videos"])
+        video_index = video_state["index"]
+        if video_state["error"] is not None:
+            self._release_frame_stores(
+                [
+                    candidate_frames for candidate_frames in video_state["candidate_frames"]
+                    if isinstance(candidate_frames, SharedFrameStore)
+                ]
+            )
+            return {"keyframes": [], "frame_features": None, "error": video_state["error"], "index": video_index}
+
+        try:
+            keyframes = self._select_keyframes_from_candidate_frames(
+                no_of_frames,
+                video_state["candidate_frames"],
+                return_frame_features,
+                video_state["keyframe_cache"],
+                video_state["video_key"],
+                video_state["candidate_frame_indexes"],
+            )
+        except Exception as e:
+            return {"keyframes": [], "frame_features": None, "error": e, "index": video_index}
+
+        frame_features = None
+        if return_frame_features:
+            keyframes, frame_features = keyframes
+        return {"keyframes": keyframes, "frame_features": frame_features, "error": None, "index": video_index}
+
+    def _get_cached_video_keyframes_result(
+        self,
+        no_of_frames,
+        video_index,
+        video_path,
+        candidate_frame_indexes,
+        keyframe_cache,
+        video_key,
+        return_frame_features=False,
+    ):
+        """Selects keyframes of a video from its candidate frames read again by their indexes stored in
+        keyframe cache. If features of candidate frames are cached only the selected keyframes are read,
+        otherwise all the candidate frames are read for computing their features.
+
+        :param no_of_frames: number of keyframes to be extracted
+        :type no_of_frames: int
+        :param video_index: index of video in list of videos
+        :type video_index: int
+        :param video_path: video file path
+        :type video_path: str
+        :param candidate_frame_indexes: cached indexes of candidate frames in the video
+        :type candidate_frame_indexes: list
+        :param keyframe_cache: keyframe cache
+        :type keyframe_cache: Katna.keyframe_cache.KeyFrameCache
+        :param video_key: key of cache entry of the video
+        :type video_key: str
+        :param return_frame_features: if True features of keyframes are returned too, defaults to False
+        :type return_frame_features: bool, optional
+        :return: dictionary with keyframes, frame features, error and index of video
+        :rtype: dict
+        """
+        try:
+            frame_extractor = FrameExtractor()
+            image_selector = ImageSelector(self.n_processes, pool=self._get_pool())
+            frame_features = keyframe_cache.load_frame_features(video_key, keyframe_cache.get_selection_key())
+            if frame_features is None:
+                candidate_frames = frame_extractor.extract_frames(video_path, candidate_frame_indexes)
+                if len(candidate_frames) != len(candidate_frame_indexes):
+                    raise Exception("Could not read cached candidate frames of video: " + video_path)
+            else:
+                # Keyframes are selected only with cached features, frames are not needed
+                candidate_frames = [None] * len(candidate_frame_indexes)
+
+            selected_indexes, frame_features = self._select_best_frames_indexes_with_cache(
+                image_selector, candidate_frames, no_of_frames, keyframe_cache, video_key, frame_features
+            )
+            keyframes = [candidate_frames[i] for i in selected_indexes]
+            if any(keyframe is None for keyframe in keyframes):
+                selected_frame_indexes = [candidate_frame_indexes[i] for i in selected_indexes]
+                frames = frame_extractor.extract_frames(video_path, selected_frame_indexes)
+                if len(frames) != len(set(selected_frame_indexes)):
+                    raise Exception("Could not read cached candidate frames of video: " + video_path)
+                frames_by_index = dict(zip(sorted(set(selected_frame_indexes)), frames))
+                keyframes = [frames_by_index[frame_index] for frame_index in selected_frame_indexes]
+        except Exception as e:
+            return {"keyframes": [], "frame_features": None, "error": e, "index": video_index}
 
+        frame_features_of_keyframes = None
+        if return_frame_features:
+            frame_features_of_keyframes = image_selector.__get_frame_features_subset__(frame_features, selected_indexes)
+        return {"keyframes": keyframes, "frame_features": frame_features_of_keyframes, "error": None, "index": video_index}
+
+    @_shutdown_pool_after_call
     @FileDecorators.validate_dir_path
     def extract_keyframes_from_videos_dir(self, no_of_frames, dir_path, writer):
         """Returns best key images/frames from the videos in the given directory.
@@ -257,6 +960,7 @@ class Video(object):
         else:
             print("All the files in directory %s are invalid video files" % dir_path)
 
+    @_shutdown_pool_after_call
     def extract_video_keyframes_big_video(self, no_of_frames, file_path):
         """
 
@@ -268,32 +972,66 @@ class Video(object):
         :rtype:
         """
 
-        # split the videos with break point at 20 min
-        video_splits = self._split_large_video(file_path)
-        print("Video split complete.")
-
-        all_top_frames_split = []
-
-        # call _extract_keyframes_from_video
-        for split_video_file_path in video_splits:
-            # print("Processing split : ", split_video_file_path)
-            top_frames_split = self._extract_keyframes_from_video(no_of_frames, split_video_file_path)
-            all_top_frames_split.append(top_frames_split)
-
-        # collect and merge keyframes to get no_of_frames
-        self._remove_clips(video_splits)
-        image_selector = ImageSelector(self.n_processes)
-
-        # list of list to 1d list
-        extracted_candidate_frames = functools.reduce(operator.iconcat, all_top_frames_split, [])
+        if config.Video.split_video_with_ffmpeg:
+            # split the videos with break point at 20 min
+            video_splits = self._split_large_video(file_path)
+            splits = [(split_video_file_path, 0, None) for split_video_file_path in video_splits]
+            split_durations = [
+                self._get_video_duration_with_cv(split_video_file_path) for split_video_file_path in video_splits
+            ]
+            print("Video split complete.")
+        else:
+            # frame ranges with break point at 20 min, no video is written to disk
+            video_splits = []
+            _, fps, video_frames = helper.get_video_info(file_path)
+            splits = [
+                (file_path, split_start_frame, split_end_frame)
+                for split_start_frame, split_end_frame in self._get_frame_ranges(
+                    file_path,
+                    break_point_duration_in_sec=config.Video.video_split_threshold_in_minutes * 60,
+                )
+            ]
+            split_durations = [
+                ((video_frames if split_end_frame is None else split_end_frame) - split_start_frame) / fps
+                for _, split_start_frame, split_end_frame in splits
+            ]
+
+        image_selector = ImageSelector(self.n_processes, pool=self._get_pool())
+
+        # Splits are processed together by the pool of worker processes, keyframes of a split and
+        # their features are kept as soon as the split is processed and its candidate frames are freed
+        split_results = [None] * len(splits)
+        # Splits written to disk by ffmpeg are temporary files, so they are not cached
+        split_results_iterator = self._extract_keyframes_for_videos_iterator(
+            no_of_frames, splits, split_durations, return_frame_features=True,
+            use_cache=not config.Video.split_video_with_ffmpeg,
+        )
+        try:
+            for data in split_results_iterator:
+                if data["error"] is not None:
+                    raise data["error"]
+                split_results[data["index"]] = data
+        finally:
+            split_results_iterator.close()
+            self._remove_clips(video_splits)
+
+        # collect and merge keyframes of splits in order of splits to get no_of_frames, features of
+        # keyframes computed while selecting keyframes of splits are reused
+        extracted_candidate_frames = functools.reduce(
+            operator.iconcat, [split_result["keyframes"] for split_result in split_results], []
+        )
+        frame_features = image_selector.__concatenate_frame_features__(
+            [split_result["frame_features"] for split_result in split_results]
+        )
 
         # top frames
         top_frames = image_selector.select_best_frames(
-            extracted_candidate_frames, no_of_frames
+            extracted_candidate_frames, no_of_frames, frame_features
         )
 
         return top_frames
 
+    @_shutdown_pool_after_call
     @FileDecorators.validate_file_path
     def extract_video_keyframes(self, no_of_frames, file_path, writer):
         """Returns a list of best key images/frames from a single video.
@@ -321,36 +1059,238 @@ class Video(object):
         writer.write(file_path, top_frames)
         print("Completed processing for : ", file_path)
 
-    def _split_large_video(self, file_path):
+    @_shutdown_pool_after_call
+    def extract_video_keyframes_from_stream(self, no_of_frames, video_stream, writer, file_path="video"):
+        """Returns best key images/frames from a video which is not a file, e.g. an uploaded video.
+        Video is decoded by ffmpeg from its stdin, so it is not written to disk. Video is read
+        once in this process, frames selection is done by the pool of worker processes.
+        mp4/mov videos must have their moov atom at the start of the file (ffmpeg -movflags +faststart)
+        to be read from a stream.
+
+        :param no_of_frames: Number of key frames to be extracted
+        :type no_of_frames: int, required
+        :param video_stream: video as bytes or a file-like object with read method, e.g. a pipe
+        :type video_stream: bytes or file object, required
+        :param writer: Writer object to process keyframe data
+        :type writer: Writer, required
+        :param file_path: name of the video passed to writer, defaults to "video"
+        :type file_path: str, optional
+        :raises Exception: raises Exception if video is invalid or corrupted
         """
-        Splits large video file into smaller videos (based on conf) so they don't take up memory
-        :param file_path: path of video file
+        print("Running for : ", file_path)
+        video_reader = FFmpegVideoReader(video_stream)
+        try:
+            if not video_reader.isOpened():
+                raise Exception("Invalid or corrupted video: " + file_path)
+            candidate_frames = FrameExtractor().extract_candidate_frames(video_reader)
+        finally:
+            video_reader.release()
+
+        top_frames = self._select_keyframes_from_candidate_frames(no_of_frames, [candidate_frames])
+
+        writer.write(file_path, top_frames)
+        print("Completed processing for : ", file_path)
+
+    @_shutdown_pool_after_call
+    @FileDecorators.validate_file_path
+    def extract_video_keyframes_iterator(self, no_of_frames, file_path):
+        """Generator function yielding keyframes of a single video as they are found. Video is
+        processed in frame ranges of config.Video.keyframes_iterator_chunk_duration_in_sec by
+        the pool of worker processes, as soon as a frame range is processed (in order of frame
+        ranges) best keyframes of the frame range are yielded as preliminary keyframes, once
+        all frame ranges are processed keyframes of the video are selected from candidate
+        frames of all the frame ranges and yielded as final keyframes. Only features and indexes
+        of candidate frames are kept, final keyframes are read again from the video by their index.
+        Candidate frames of frame ranges are same as candidate frames of the whole video, so final
+        keyframes are same as keyframes extracted with config.Video.split_video_with_ffmpeg set to False.
+
+        Each keyframe is yielded as a dictionary with keys "frame" (numpy.ndarray image),
+        "frame_index" (index of frame in video), "timestamp" (in seconds) and "is_final"
+        (False for preliminary keyframes of a frame range, True for final keyframes).
+
+        :param no_of_frames: Number of key frames to be extracted
+        :type no_of_frames: int, required
+        :param file_path: video file location
         :type file_path: str, required
-        :return: List of path of splitted video clips
-        :rtype: list
+        :raises Exception: raises Exception if video is invalid or corrupted
+        :return: generator of dictionaries with keyframe, its frame index and timestamp
+        :rtype: generator
         """
+        if not helper._check_if_valid_video(file_path):
+            raise Exception("Invalid or corrupted video: " + file_path)
 
-        break_duration_in_sec = config.Video.video_split_threshold_in_minutes * 60
+        frame_ranges = self._get_frame_ranges(
+            file_path, break_point_duration_in_sec=config.Video.keyframes_iterator_chunk_duration_in_sec
+        )
 
-        # get the size of the frame
-        video_info = helper.get_video_info(file_path)
-        frame_size_in_bytes = video_info[0]
-        fps = video_info[1]
+        pool = self._get_pool()
+        frame_extractor = FrameExtractor()
+        image_selector = ImageSelector(self.n_processes, pool=pool)
+
+        # Each worker seeks to its own frame range. Frame ranges are submitted as earlier frame
+        # ranges are consumed and candidate frames of a frame range are freed once its keyframes
+        # are yielded, so candidate frames of at most max_pending_chunks frame ranges are held at a
+        # time. Only features and indexes of candidate frames are kept for the whole video
+        max_pending_chunks = (self.n_processes or cpu_count()) * config.Video.max_pending_chunks_per_process
+        frame_ranges = iter(frame_ranges)
+        async_results = deque()
+
+        def submit_frame_ranges():
+            while len(async_results) < max_pending_chunks:
+                frame_range = next(frame_ranges, None)
+                if frame_range is None:
+                    return
+                async_results.append(
+                    pool.apply_async(
+                        _extract_candidate_frames_with_timestamps,
+                        (frame_extractor, file_path, frame_range[0], frame_range[1], config.Video.use_shared_memory),
+                    )
+                )
 
-        # get the available space
-        free_space_in_bytes = psutil.virtual_memory().available
+        frame_stores = []
+        frame_indexes = []
+        timestamps = []
+        frame_features = []
+        try:
+            submit_frame_ranges()
+            while len(async_results) > 0:
+                chunk_candidate_frames, chunk_frame_indexes, chunk_timestamps = async_results[0].get()
+                async_results.popleft()
+                submit_frame_ranges()
+                if isinstance(chunk_candidate_frames, SharedFrameStore):
+                    frame_stores.append(chunk_candidate_frames)
+                    chunk_candidate_frames = chunk_candidate_frames.get_frames()
+
+                # Features of candidate frames of the frame range are reused for selecting final keyframes
+                selected_indexes, chunk_frame_features = image_selector.__select_best_frames_indexes__(
+                    chunk_candidate_frames, no_of_frames
+                )
+                for i in sorted(selected_indexes):
+                    # Frames are copied out of frame store as it is freed once keyframes are selected
+                    yield {
+                        "frame": np.array(chunk_candidate_frames[i]),
+                        "frame_index": chunk_frame_indexes[i],
+                        "timestamp": chunk_timestamps[i],
+                        "is_final": False,
+                    }
+
+                frame_indexes.extend(chunk_frame_indexes)
+                timestamps.extend(chunk_timestamps)
+                frame_features.append(chunk_frame_features)
+                del chunk_candidate_frames
+                self._release_frame_stores(frame_stores)
+                frame_stores = []
+
+            # Keyframes are selected only with features of candidate frames, frames are not needed
+            selected_indexes, _ = image_selector.__select_best_frames_indexes__(
+                [None] * len(frame_indexes), no_of_frames, image_selector.__concatenate_frame_features__(frame_features)
+            )
+            selected_frame_indexes = [frame_indexes[i] for i in selected_indexes]
+            frames = frame_extractor.extract_frames(file_path, selected_frame_indexes)
+            if len(frames) != len(set(selected_frame_indexes)):
+                raise Exception("Could not read keyframes of video: " + file_path)
+            frames_by_index = dict(zip(sorted(set(selected_frame_indexes)), frames))
+            keyframes = [
+                {
+                    "frame": frames_by_index[frame_indexes[i]],
+                    "frame_index": frame_indexes[i],
+                    "timestamp": timestamps[i],
+                    "is_final": True,
+                }
+                for i in selected_indexes
+            ]
+        finally:
+            # If iteration is stopped early, wait for pending frame ranges and free their candidate frames
+            for async_result in async_results:
+                try:
+                    chunk_candidate_frames = async_result.get()[0]
+                except Exception:
+                    continue
+                if isinstance(chunk_candidate_frames, SharedFrameStore):
+                    frame_stores.append(chunk_candidate_frames)
+            self._release_frame_stores(frame_stores)
+
+        yield from keyframes
+
+    @_shutdown_pool_after_call
+    @FileDecorators.validate_file_path
+    def extract_video_scene_keyframes(self, file_path, writer=None):
+        """Detects scenes (shots) of a single video and returns them with sharpest frame of each
+        scene as its keyframe, see FrameExtractor.detect_scenes_iterator for keys of a scene. Frame
+        ranges of the video are processed in parallel by the pool of worker processes, each worker
+        keeps only sharpest frame of current scene in memory. A scene which continues over end of a
+        frame range is merged with its part in next frame range.
 
-        # based on config calculate available memory
-        available_memory = config.Video.memory_consumption_threshold * free_space_in_bytes
+        :param file_path: video file location
+        :type file_path: str, required
+        :param writer: Writer object to process keyframes of scenes, if None keyframes are only returned, defaults to None
+        :type writer: Writer, optional
+        :raises Exception: raises Exception if video is invalid or corrupted
+        :return: List of scenes as dictionaries in order of frame index
+        :rtype: list
+        """
+        if not helper._check_if_valid_video(file_path):
+            raise Exception("Invalid or corrupted video: " + file_path)
 
-        # seconds to reach threshold if all frames are collected, but not all are candidate frames
-        # so we can easily multiple this number with a constant
-        no_of_sec_to_reach_threshold = (available_memory / (fps * frame_size_in_bytes)) * config.Video.assumed_no_of_frames_per_candidate_frame
+        pool = self._get_pool()
+        frame_extractor = FrameExtractor()
+        async_results = [
+            pool.apply_async(frame_extractor.detect_scenes, (file_path, start_frame, end_frame, True))
+            for start_frame, end_frame in self._get_frame_ranges(file_path)
+        ]
+        scenes = self._merge_scenes([async_result.get() for async_result in async_results])
+
+        if writer is not None:
+            writer.write(file_path, [scene["keyframe"] for scene in scenes])
+            print("Completed processing for : ", file_path)
+        return scenes
+
+    def _merge_scenes(self, scenes_of_frame_ranges):
+        """Function to merge scenes of consecutive frame ranges of a video, first scene of a frame
+        range which does not start with a scene cut is merged with last scene of previous frame range
+
+        :param scenes_of_frame_ranges: list of lists of scenes of frame ranges in order of frame ranges
+        :type scenes_of_frame_ranges: list
+        :return: List of scenes of the video
+        :rtype: list
+        """
+        scenes = []
+        for scene in functools.reduce(operator.iconcat, scenes_of_frame_ranges, []):
+            if len(scenes) == 0 or scene["starts_with_cut"]:
+                scenes.append(scene)
+                continue
+
+            merged_scene = scenes[-1]
+            no_of_frame_differences = merged_scene["no_of_frame_differences"] + scene["no_of_frame_differences"]
+            if no_of_frame_differences > 0:
+                merged_scene["mean_frame_difference"] = (
+                    merged_scene["mean_frame_difference"] * merged_scene["no_of_frame_differences"]
+                    + scene["mean_frame_difference"] * scene["no_of_frame_differences"]
+                ) / no_of_frame_differences
+            merged_scene["no_of_frame_differences"] = no_of_frame_differences
+            merged_scene["max_frame_difference"] = max(
+                merged_scene["max_frame_difference"], scene["max_frame_difference"]
+            )
+            merged_scene["end_frame"] = scene["end_frame"]
+            merged_scene["end_time"] = scene["end_time"]
+            merged_scene["no_of_frames"] = merged_scene["end_frame"] - merged_scene["start_frame"]
+            if "keyframe" in scene and scene["keyframe_sharpness"] > merged_scene["keyframe_sharpness"]:
+                for key in ["keyframe", "keyframe_index", "keyframe_timestamp", "keyframe_sharpness"]:
+                    merged_scene[key] = scene[key]
+        return scenes
 
-        if break_duration_in_sec > no_of_sec_to_reach_threshold:
-            break_duration_in_sec = math.floor(no_of_sec_to_reach_threshold)
+    def _split_large_video(self, file_path):
+        """
+        Splits large video file into smaller videos (based on conf) so they don't take up memory
+        :param file_path: path of video file
+        :type file_path: str, required
+        :return: List of path of splitted video clips
+        :rtype: list
+        """
 
-        # print("Split duration for video (in min) is : ", break_duration_in_sec / 60)
+        # Only candidate frames are held in memory while video is being read, so
+        # splits are of fixed duration instead of being sized from available memory
+        break_duration_in_sec = config.Video.video_split_threshold_in_minutes * 60
 
         video_splits = self._split_with_ffmpeg(file_path,
                                                break_point_duration_in_sec=break_duration_in_sec)
@@ -594,6 +1534,61 @@ class Video(object):
             clip_start = clip_end
         return clipped_files
 
+    @FileDecorators.validate_file_path
+    def _get_frame_ranges(self, file_path, break_point_duration_in_sec=None, start_frame=0, end_frame=None):
+        """Function to get the frame ranges of a video to be processed in parallel,
+        frame ranges are computed with same break points as used by _split_with_ffmpeg
+        for splitting the video
+
+        :param file_path: path of video file
+        :type file_path: str, required
+        :param break_point_duration_in_sec: duration in sec for break point
+        :type break_point_duration_in_sec: int, optional
+        :param start_frame: index of first frame to be split in frame ranges, defaults to 0
+        :type start_frame: int, optional
+        :param end_frame: index of frame at which frame ranges end (excluded), if None frame ranges end at end of video, defaults to None
+        :type end_frame: int, optional
+        :return: List of (start frame, end frame) tuples, end frame of last frame range is end_frame
+        :rtype: list
+        """
+        frame_ranges = []
+        video_info = helper.get_video_info(file_path)
+        fps = video_info[1]
+        video_frames = video_info[2] if end_frame is None else end_frame
+        duration = round(((video_frames - start_frame) / fps), 2)
+
+        # Break point for the frame ranges is same as break point used for splitting the video
+        # in _split_with_ffmpeg
+        if break_point_duration_in_sec is None:
+            clip_start, break_point = (
+                0,
+                duration // cpu_count() if duration // cpu_count() > 15 else 25,
+            )
+        else:
+            clip_start, break_point = (
+                0,
+                break_point_duration_in_sec,
+            )
+
+        # Loop over the video duration to get the frame range start and end point
+        while clip_start < duration:
+
+            clip_end = clip_start + break_point
+
+            # Setting the end position of the particular frame range equals to the end of the video,
+            # if end position or end position added with the **min_video_duration** is greater than
+            # the end time of the video
+            if clip_end > duration or (clip_end + self._min_video_duration) > duration:
+                frame_ranges.append((start_frame + int(round(clip_start * fps)), end_frame))
+                break
+
+            frame_ranges.append(
+                (start_frame + int(round(clip_start * fps)), start_frame + int(round(clip_end * fps)))
+            )
+
+            clip_start = clip_end
+        return frame_ranges
+
     def _write_videofile(self, video_file_path, start, end, override_video_codec=False):
         """Function to clip the video for given start and end points and save the video
 
@@ -197,15 +197,55 @@ class  ImageCropDiskWriter(Writer):
         :type data: list
         """
         if len(data) > 0:
+            img = cv2.imread(filepath)
             for counter, crop in enumerate(data):
-                img = cv2.imread(filepath)
                 output_filename = self.generate_output_filename(filepath, crop_number=counter)
                 self.save_crop_to_disk(crop, img, file_name=output_filename)
         else:
             print("ERROR : No Perfect crop found for Image %s" %(filepath))
 
-    
 
-    
+class ImageResizeDiskWriter(Writer):
+    """DiskWriter for Image Resize
+
+    :param Writer: Base class for writer
+    :type Writer: [type]
+    """
+
+    def __init__(self, location, file_ext=".jpeg"):
+        """Initializes the location where the resized images needs to be saved.
 
-    
\ No newline at end of file
+        :param location: path to output directory
+        :type location: str
+        :param file_ext: file extension of output images, defaults to ".jpeg"
+        :type file_ext: str, optional
+        """
+
+        self.output_dir_path = location
+        self.file_ext = file_ext
+        self._create_dir(location)
+
+    def generate_output_filename(self, filepath):
+        """Generates the filename of output data file.
+
+        :param filepath: path of the file
+        :type filepath: str
+        :return: name of the output file 
+        :rtype: str
+        """
+
+        input_file_name = self._generate_filename_from_filepath(filepath)
+
+        return "_".join([input_file_name, "resized"])
+
+    def write(self, filepath, data):
+        """Write the resized image generated by Katna library for file @ filepath on to the disk.
+
+        :param filepath: path of the input file processed by Katna
+        :type filepath: str
+        :param data: resized image
+        :type data: numpy.ndarray
+        """
+        output_filename = self.generate_output_filename(filepath)
+        file_full_path = os.path.join(self.output_dir_path, output_filename + self.file_ext)
+        cv2.imwrite(file_full_path, data)
@@ -58,7 +58,6 @@ dep_groups = {
         imageio_ffmpeg>=0.2.0
         imutils
         requests
-        psutil
         ffmpy
 """
     )
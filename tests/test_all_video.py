@@ -197,6 +197,885 @@ def test_video_no_codec_video(video_object, writer_object):
     assert len(imgs) == 11
 
 
+def test_extract_keyframes_for_files_iterator(video_object):
+    """Test case for extracting keyframes of several videos together. Result must be
+    yielded for each file, with error for invalid file
+    """
+    small_video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+    invalid_video_file_path = os.path.join("tests", "data", "no_video.mp4")
+
+    results = {
+        data["filepath"]: data
+        for data in video_object._extract_keyframes_for_files_iterator(
+            12, [invalid_video_file_path, small_video_file_path]
+        )
+    }
+
+    assert len(results) == 2
+    assert results[invalid_video_file_path]["error"] is not None
+    assert results[small_video_file_path]["error"] is None
+    assert len(results[small_video_file_path]["keyframes"]) == 11
+
+
+def test_big_video_keyframes_from_splits(video_object, monkeypatch):
+    """Test case for keyframe extraction of big videos. Keyframes selected from keyframes
+    of splits using features carried forward must be same as keyframes selected again
+    from keyframes of each split
+    """
+    import Katna.config as katna_config
+    from image_selector import ImageSelector
+
+    monkeypatch.setattr(katna_config.Video, "video_split_threshold_in_minutes", 0.2)
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", False)
+    small_video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+
+    top_frames = video_object.extract_video_keyframes_big_video(5, small_video_file_path)
+
+    frame_ranges = video_object._get_frame_ranges(small_video_file_path, break_point_duration_in_sec=12)
+    assert len(frame_ranges) > 1
+    split_top_frames = []
+    for start_frame, end_frame in frame_ranges:
+        split_top_frames.extend(
+            video_object._extract_keyframes_from_video(5, small_video_file_path, start_frame, end_frame)
+        )
+    expected_top_frames = ImageSelector().select_best_frames(split_top_frames, 5)
+
+    assert len(top_frames) == len(expected_top_frames) == 5
+    for frame, expected_frame in zip(top_frames, expected_top_frames):
+        assert np.array_equal(frame, expected_frame)
+
+
+def test_keyframe_cache(tmpdir):
+    """Test case for keyframe cache. Cached data must be read back as saved and least
+    recently used entry must be removed when cache is too big
+    """
+    import time
+    from keyframe_cache import KeyFrameCache
+
+    video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+    candidate_frame_indexes = [3, 17, 42, 120, 250]
+    frame_features = {"brightness": np.arange(1024.0), "histogram": np.ones((1024, 256), dtype=np.float32)}
+    # Each entry is a bit more than 1 MB, so cache can hold only two entries
+    keyframe_cache = KeyFrameCache(str(tmpdir), max_size_in_mb=2.5)
+
+    video_keys = [keyframe_cache.get_video_key(video_file_path, start_frame, None) for start_frame in (0, 10, 20)]
+    assert len(set(video_keys)) == 3
+    selection_key = keyframe_cache.get_selection_key()
+
+    assert keyframe_cache.load_candidate_frame_indexes(video_keys[0]) is None
+    keyframe_cache.save_candidate_frame_indexes(video_keys[0], candidate_frame_indexes)
+    keyframe_cache.save_frame_features(video_keys[0], selection_key, frame_features)
+    keyframe_cache.save_selected_indexes(video_keys[0], selection_key, 3, [4, 2, 0])
+
+    assert keyframe_cache.load_candidate_frame_indexes(video_keys[0]) == candidate_frame_indexes
+    cached_frame_features = keyframe_cache.load_frame_features(video_keys[0], selection_key)
+    assert np.array_equal(cached_frame_features["brightness"], frame_features["brightness"])
+    assert np.array_equal(cached_frame_features["histogram"], frame_features["histogram"])
+    assert keyframe_cache.load_selected_indexes(video_keys[0], selection_key, 3) == [4, 2, 0]
+    assert keyframe_cache.load_selected_indexes(video_keys[0], selection_key, 4) is None
+
+    for video_key in video_keys[1:]:
+        time.sleep(0.01)
+        keyframe_cache.save_candidate_frame_indexes(video_key, candidate_frame_indexes)
+        keyframe_cache.save_frame_features(video_key, selection_key, frame_features)
+        time.sleep(0.01)
+        # Reading first entry makes second entry least recently used
+        keyframe_cache.load_candidate_frame_indexes(video_keys[0])
+
+    assert keyframe_cache.load_candidate_frame_indexes(video_keys[0]) is not None
+    assert keyframe_cache.load_candidate_frame_indexes(video_keys[1]) is None
+    assert keyframe_cache.load_candidate_frame_indexes(video_keys[2]) is not None
+
+
+def test_keyframe_cache_key(monkeypatch):
+    """Test case for key of keyframe cache entry of a video. Only settings which change
+    candidate frames must change the key
+    """
+    import Katna.config as katna_config
+    from keyframe_cache import KeyFrameCache
+
+    video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+    keyframe_cache = KeyFrameCache.__new__(KeyFrameCache)
+    video_key = keyframe_cache.get_video_key(video_file_path)
+
+    monkeypatch.setattr(katna_config.Video, "max_pending_chunks_per_process", 5)
+    monkeypatch.setattr(katna_config.FrameExtractor, "seek_margin_in_sec", 3.0)
+    assert keyframe_cache.get_video_key(video_file_path) == video_key
+    monkeypatch.setattr(katna_config.FrameExtractor, "len_window", 10)
+    assert keyframe_cache.get_video_key(video_file_path) != video_key
+
+
+def test_extract_keyframes_with_keyframe_cache(video_object, tmpdir, monkeypatch):
+    """Test case for keyframe extraction with keyframe cache. Keyframes selected from
+    cached candidate frame indexes must be same as keyframes extracted without cache,
+    and frame differences of the video must not be computed again
+    """
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+
+    small_video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+    # Videos are processed in frame ranges if cache is used
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", False)
+    expected_top_frames = {
+        no_of_frames: video_object._extract_keyframes_from_video(no_of_frames, small_video_file_path)
+        for no_of_frames in (8, 4)
+    }
+
+    cache_dir = tmpdir.mkdir("keyframe_cache")
+    monkeypatch.setattr(katna_config.Video, "keyframe_cache_dir", str(cache_dir))
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", True)
+    top_frames = video_object._extract_keyframes_from_video(8, small_video_file_path)
+    assert len(top_frames) == len(expected_top_frames[8])
+    for frame, expected_frame in zip(top_frames, expected_top_frames[8]):
+        assert np.array_equal(frame, expected_frame)
+
+    def no_frame_differences(*args, **kwargs):
+        raise AssertionError("Frame differences computed again")
+
+    # Only indexes of candidate frames are cached, frames are read again by their index
+    monkeypatch.setattr(FrameExtractor, "extract_candidate_frames", no_frame_differences)
+    for no_of_frames in (8, 4, 4):
+        top_frames = video_object._extract_keyframes_from_video(no_of_frames, small_video_file_path)
+        assert len(top_frames) == len(expected_top_frames[no_of_frames])
+        for frame, expected_frame in zip(top_frames, expected_top_frames[no_of_frames]):
+            assert np.array_equal(frame, expected_frame)
+
+    # Features are computed again from all the candidate frames for new image selector settings
+    monkeypatch.setattr(katna_config.ImageSelector, "use_shared_memory", False)
+    top_frames = video_object._extract_keyframes_from_video(8, small_video_file_path)
+    assert len(top_frames) == len(expected_top_frames[8])
+    for frame, expected_frame in zip(top_frames, expected_top_frames[8]):
+        assert np.array_equal(frame, expected_frame)
+    assert len(cache_dir.listdir()) == 1
+    assert sum(entry_file.size() for entry_file in cache_dir.listdir()[0].listdir()) < 64 * 1024
+
+
+def make_long_video(tmpdir):
+    """Writes a 1200 frames long video, longer than max_frames_in_chunk, to tmpdir
+
+    :param tmpdir: directory for the video
+    :type tmpdir: py.path.local
+    :return: video file path
+    :rtype: str
+    """
+    import subprocess
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    video_file_path = str(tmpdir.join("long_video.mp4"))
+    subprocess.run(
+        [get_ffmpeg_exe(), "-v", "error", "-stream_loop", "3", "-i", os.path.join("tests", "data", "codec_error_video.mp4"),
+         "-c:v", "libx264", video_file_path],
+        check=True,
+    )
+    return video_file_path
+
+
+def test_extract_video_keyframes_iterator(video_object, monkeypatch):
+    """Test case for keyframes yielded as they are found. Final keyframes must be same as
+    keyframes extracted in one go and each keyframe must be the frame at its frame index
+    """
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", False)
+    monkeypatch.setattr(katna_config.Video, "keyframes_iterator_chunk_duration_in_sec", 6)
+    # Frame ranges are submitted one at a time per worker process
+    monkeypatch.setattr(katna_config.Video, "max_pending_chunks_per_process", 1)
+    expected_top_frames = video_object._extract_keyframes_from_video(4, video_file_path)
+
+    keyframes = list(video_object.extract_video_keyframes_iterator(4, video_file_path))
+    final_keyframes = [keyframe for keyframe in keyframes if keyframe["is_final"]]
+    assert len(keyframes) > len(final_keyframes)
+    assert all(not keyframe["is_final"] for keyframe in keyframes[: len(keyframes) - len(final_keyframes)])
+
+    assert len(final_keyframes) == len(expected_top_frames)
+    for keyframe, expected_frame in zip(final_keyframes, expected_top_frames):
+        assert np.array_equal(keyframe["frame"], expected_frame)
+
+    frames = FrameExtractor().extract_frames(video_file_path, [keyframe["frame_index"] for keyframe in keyframes])
+    frames_by_index = dict(zip(sorted(set(keyframe["frame_index"] for keyframe in keyframes)), frames))
+    for keyframe in keyframes:
+        assert np.array_equal(keyframe["frame"], frames_by_index[keyframe["frame_index"]])
+
+    # Video has variable frame rate, timestamps are presentation timestamps of frames
+    timestamps = [keyframe["timestamp"] for keyframe in sorted(keyframes, key=lambda k: k["frame_index"])]
+    assert timestamps == sorted(timestamps)
+    assert 0 <= timestamps[0] and timestamps[-1] <= 16.5
+
+
+def test_extract_video_keyframes_iterator_of_long_video(video_object, tmpdir, monkeypatch):
+    """Test case for keyframes yielded as they are found for a video longer than
+    max_frames_in_chunk, frame ranges do not start at multiples of max_frames_in_chunk.
+    Final keyframes must be same as keyframes extracted in one go
+    """
+    import Katna.config as katna_config
+
+    video_file_path = make_long_video(tmpdir)
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", False)
+    # Frame ranges of 350 frames
+    monkeypatch.setattr(katna_config.Video, "keyframes_iterator_chunk_duration_in_sec", 35)
+    expected_top_frames = video_object._extract_keyframes_from_video(8, video_file_path)
+
+    keyframes = list(video_object.extract_video_keyframes_iterator(8, video_file_path))
+    final_keyframes = [keyframe for keyframe in keyframes if keyframe["is_final"]]
+    assert any(keyframe["frame_index"] > 1000 for keyframe in keyframes)
+    assert len(final_keyframes) == len(expected_top_frames)
+    for keyframe, expected_frame in zip(final_keyframes, expected_top_frames):
+        assert np.array_equal(keyframe["frame"], expected_frame)
+
+
+def test_extract_video_keyframes_from_stream(video_object, writer_object, tmpdir, monkeypatch):
+    """Test case for keyframe extraction from a video in memory and from a file object.
+    Keyframes must be same as keyframes extracted from the video file
+    """
+    import subprocess
+    import Katna.config as katna_config
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    # moov atom of the video is moved to the start of the file, so it can be read from a stream
+    video_file_path = str(tmpdir.join("faststart_video.mp4"))
+    subprocess.run(
+        [get_ffmpeg_exe(), "-v", "error", "-i", os.path.join("tests", "data", "codec_error_video.mp4"),
+         "-c", "copy", "-movflags", "+faststart", video_file_path],
+        check=True,
+    )
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", False)
+    expected_top_frames = video_object._extract_keyframes_from_video(8, video_file_path)
+
+    with open(video_file_path, "rb") as f:
+        video_data = f.read()
+    video_object.extract_video_keyframes_from_stream(8, video_data, writer_object, "uploaded_video")
+    top_frames_from_bytes = writer_object.get_data("uploaded_video")
+
+    with open(video_file_path, "rb") as f:
+        video_object.extract_video_keyframes_from_stream(8, f, writer_object, "uploaded_video")
+    top_frames_from_file_object = writer_object.get_data("uploaded_video")
+
+    for top_frames in (top_frames_from_bytes, top_frames_from_file_object):
+        assert len(top_frames) == len(expected_top_frames)
+        for frame, expected_frame in zip(top_frames, expected_top_frames):
+            assert np.array_equal(frame, expected_frame)
+
+    with pytest.raises(Exception):
+        video_object.extract_video_keyframes_from_stream(8, b"not a video", writer_object)
+
+
+def test_probe_video(tmpdir):
+    """Test case for probing video metadata. Metadata is memoized and read again
+    if video file changes
+    """
+    import shutil
+    import helper_functions as helper
+
+    video_file_path = str(tmpdir.join("video.mp4"))
+    shutil.copy(os.path.join("tests", "data", "codec_error_video.mp4"), video_file_path)
+
+    video_info = helper.probe_video(video_file_path)
+    assert video_info.is_valid
+    assert (video_info.width, video_info.height, video_info.frame_count) == (320, 240, 300)
+    assert video_info.duration == pytest.approx(30.0)
+    assert helper.probe_video(video_file_path) is video_info
+    assert helper.get_video_info(video_file_path) == (320 * 240 * 3, video_info.fps, 300)
+
+    with open(video_file_path, "wb") as f:
+        f.write(b"not a video")
+    assert not helper.probe_video(video_file_path).is_valid
+    assert not helper._check_if_valid_video(video_file_path)
+
+
+def test_extract_candidate_frames_in_frame_ranges():
+    """Test case for candidate frames extraction in frame ranges. Candidate frames
+    extracted from frame ranges must be same as candidate frames extracted from whole video
+    """
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    frame_extractor = FrameExtractor()
+
+    candidate_frames = frame_extractor.extract_candidate_frames(video_file_path)
+    candidate_frames_in_ranges = []
+    for start_frame, end_frame in [(0, 100), (100, 250), (250, None)]:
+        candidate_frames_in_ranges.extend(
+            frame_extractor.extract_candidate_frames(video_file_path, start_frame, end_frame)
+        )
+
+    assert len(candidate_frames_in_ranges) == len(candidate_frames)
+    for frame, frame_in_range in zip(candidate_frames, candidate_frames_in_ranges):
+        assert np.array_equal(frame, frame_in_range)
+
+
+def test_extract_candidate_frames_in_frame_ranges_of_long_video(tmpdir):
+    """Test case for candidate frames extraction in frame ranges of a video longer than
+    max_frames_in_chunk. Frame differences must be restarted at same frames as in one pass
+    over the whole video, so candidate frames of frame ranges are same as of whole video
+    """
+    from frame_extractor import FrameExtractor
+
+    video_file_path = make_long_video(tmpdir)
+    frame_extractor = FrameExtractor()
+    assert frame_extractor.max_frames_in_chunk == 500
+
+    for frame_sampling_step in (1, 3):
+        frame_extractor.frame_sampling_step = frame_sampling_step
+        candidate_frames = list(frame_extractor.extract_candidate_frames_iterator(video_file_path))
+        candidate_frames_in_ranges = []
+        for start_frame, end_frame in [(0, 300), (300, 700), (700, None)]:
+            candidate_frames_in_ranges.extend(
+                frame_extractor.extract_candidate_frames_iterator(video_file_path, start_frame, end_frame)
+            )
+
+        assert any(frame_index > 1000 for frame_index, _, _ in candidate_frames)
+        assert [frame_index for frame_index, _, _ in candidate_frames_in_ranges] == [
+            frame_index for frame_index, _, _ in candidate_frames
+        ]
+        for (_, _, frame), (_, _, frame_in_range) in zip(candidate_frames, candidate_frames_in_ranges):
+            assert np.array_equal(frame, frame_in_range)
+
+
+def test_extract_candidate_frames_in_frame_ranges_with_seeking(monkeypatch):
+    """Test case for seeking to frame ranges. Candidate frames of a frame range at the end
+    of a variable frame rate video must be same with and without seeking, and frames before
+    the frame range must not be decoded
+    """
+    from frame_extractor import FrameExtractor
+
+    no_of_decoded_frames = [0]
+    video_capture = cv2.VideoCapture
+
+    class CountingVideoCapture(object):
+        def __init__(self, *args):
+            self.cap = video_capture(*args)
+
+        def grab(self):
+            no_of_decoded_frames[0] += 1
+            return self.cap.grab()
+
+        def read(self):
+            no_of_decoded_frames[0] += 1
+            return self.cap.read()
+
+        def __getattr__(self, name):
+            return getattr(self.cap, name)
+
+    monkeypatch.setattr(cv2, "VideoCapture", CountingVideoCapture)
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+
+    frame_extractor = FrameExtractor()
+    candidate_frames = list(frame_extractor.extract_candidate_frames_iterator(video_file_path, 330, 370))
+    no_of_decoded_frames_with_seeking = no_of_decoded_frames[0]
+
+    # Margin longer than the video disables seeking
+    frame_extractor.seek_margin_in_sec = 1000
+    expected_candidate_frames = list(frame_extractor.extract_candidate_frames_iterator(video_file_path, 330, 370))
+
+    assert [frame_index for frame_index, _, _ in candidate_frames] == [
+        frame_index for frame_index, _, _ in expected_candidate_frames
+    ]
+    for (_, timestamp, frame), (_, expected_timestamp, expected_frame) in zip(
+        candidate_frames, expected_candidate_frames
+    ):
+        assert timestamp == pytest.approx(expected_timestamp)
+        assert np.array_equal(frame, expected_frame)
+    assert no_of_decoded_frames_with_seeking < 150
+
+
+def test_extract_frames(monkeypatch):
+    """Test case for reading frames at given indexes of a variable frame rate video with
+    seeking. Frames must be same as frames read sequentially, for both decoders
+    """
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    cap = cv2.VideoCapture(video_file_path)
+    expected_frames = []
+    ret, frame = cap.read()
+    while ret:
+        expected_frames.append(frame)
+        ret, frame = cap.read()
+    cap.release()
+
+    frame_indexes = [370, 5, 120, 121, 260]
+    for decoder_backend in ["opencv", "ffmpeg"]:
+        monkeypatch.setattr(katna_config.FrameExtractor, "decoder_backend", decoder_backend)
+        frames = FrameExtractor().extract_frames(video_file_path, frame_indexes)
+        assert len(frames) == len(frame_indexes)
+        for frame, frame_index in zip(frames, sorted(frame_indexes)):
+            assert np.array_equal(frame, expected_frames[frame_index])
+
+
+def test_frame_difference_signal(video_object, tmpdir, monkeypatch):
+    """Test case for frame difference signal saved while extracting keyframes. Candidate
+    frames detected again from the saved signal with same settings must be same as
+    candidate frames extracted from the video
+    """
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    monkeypatch.setattr(katna_config.Video, "split_video_with_ffmpeg", False)
+    monkeypatch.setattr(katna_config.FrameExtractor, "save_frame_difference_signal", True)
+    monkeypatch.setattr(katna_config.FrameExtractor, "frame_difference_signal_dir", str(tmpdir))
+
+    video_object._extract_keyframes_from_video(4, video_file_path)
+    frame_extractor = FrameExtractor()
+    frame_difference_signal = frame_extractor.load_frame_difference_signal(video_file_path)
+
+    candidate_frames = frame_extractor.extract_candidate_frames(video_file_path)
+    candidate_frame_indexes = frame_extractor.get_candidate_frame_indexes_from_signal(frame_difference_signal)
+    frames = frame_extractor.extract_frames(video_file_path, candidate_frame_indexes)
+    assert len(frames) == len(candidate_frames)
+    for frame, candidate_frame in zip(frames, candidate_frames):
+        assert np.array_equal(frame, candidate_frame)
+
+    # Shorter smoothing window finds more local maxima
+    assert len(frame_extractor.get_candidate_frame_indexes_from_signal(frame_difference_signal, len_window=5)) > len(
+        candidate_frame_indexes
+    )
+
+
+def test_extract_candidate_frames_with_ffmpeg_decoder(monkeypatch):
+    """Test case for candidate frames extraction with ffmpeg decoder. Candidate frames
+    must be same as candidate frames extracted with opencv decoder
+    """
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+    monkeypatch.setattr(katna_config.FrameExtractor, "frame_sampling_step", 2)
+    candidate_frames = FrameExtractor().extract_candidate_frames(video_file_path, 50, 200)
+
+    monkeypatch.setattr(katna_config.FrameExtractor, "decoder_backend", "ffmpeg")
+    candidate_frames_with_ffmpeg = FrameExtractor().extract_candidate_frames(video_file_path, 50, 200)
+
+    assert len(candidate_frames) > 0
+    assert len(candidate_frames_with_ffmpeg) == len(candidate_frames)
+    for frame, frame_with_ffmpeg in zip(candidate_frames, candidate_frames_with_ffmpeg):
+        assert np.array_equal(frame, frame_with_ffmpeg)
+
+
+def test_ffmpeg_video_reader_seeking(tmpdir, monkeypatch):
+    """Test case for ffmpeg decoder. Frames read from start_frame of a variable frame rate
+    video must be same as frames read with opencv, -vsync must be used for ffmpeg without
+    -fps_mode and a reader failing in __init__ must be released without error
+    """
+    from ffmpeg_reader import FFmpegVideoReader, _get_passthrough_args
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    cap = cv2.VideoCapture(video_file_path)
+    expected_frames = []
+    ret, frame = cap.read()
+    while ret:
+        expected_frames.append(frame)
+        ret, frame = cap.read()
+    cap.release()
+
+    video_reader = FFmpegVideoReader(video_file_path, start_frame=290, frame_step=3)
+    frames = []
+    for frame_index in range(len(expected_frames)):
+        if frame_index < 290 or frame_index % 3 != 0:
+            assert video_reader.grab()
+        else:
+            ret, frame = video_reader.read()
+            assert ret
+            frames.append(frame)
+    assert not video_reader.read()[0]
+    video_reader.release()
+
+    assert len(frames) == len(expected_frames[291::3])
+    for frame, expected_frame in zip(frames, expected_frames[291::3]):
+        assert np.array_equal(frame, expected_frame)
+
+    if os.name != "nt":
+        # ffmpeg 4.x lists only -vsync in its help
+        old_ffmpeg_path = tmpdir.join("old_ffmpeg")
+        old_ffmpeg_path.write("#!/bin/sh\necho '-vsync <>  set video sync method'\n")
+        old_ffmpeg_path.chmod(0o755)
+        assert _get_passthrough_args(str(old_ffmpeg_path)) == ["-vsync", "passthrough"]
+
+    def failing_read_stream_info(self):
+        raise RuntimeError("Could not read stream info")
+
+    monkeypatch.setattr(FFmpegVideoReader, "_read_stream_info", failing_read_stream_info)
+    video_reader = FFmpegVideoReader.__new__(FFmpegVideoReader)
+    with pytest.raises(RuntimeError):
+        video_reader.__init__(video_file_path)
+    video_reader.release()
+
+
+def test_extract_candidate_frames_from_keyframes(tmpdir, monkeypatch):
+    """Test case for candidate frames extraction decoding only key frames. Candidate
+    frames must be key frames of the video, or frames after them if they are refined,
+    and each candidate frame must be the frame at its frame index
+    """
+    import subprocess
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    # Video with a key frame every 10 frames
+    video_file_path = str(tmpdir.join("keyframes_video.mp4"))
+    subprocess.run(
+        [get_ffmpeg_exe(), "-v", "error", "-i", os.path.join("tests", "data", "codec_error_video.mp4"),
+         "-c:v", "libx264", "-g", "10", "-keyint_min", "10", "-sc_threshold", "0", video_file_path],
+        check=True,
+    )
+    monkeypatch.setattr(katna_config.FrameExtractor, "keyframes_only_scan", True)
+    candidate_frames = list(FrameExtractor().extract_candidate_frames_iterator(video_file_path))
+
+    monkeypatch.setattr(katna_config.FrameExtractor, "keyframe_scan_refine_window_in_sec", 1.0)
+    refined_candidate_frames = list(FrameExtractor().extract_candidate_frames_iterator(video_file_path))
+
+    assert len(candidate_frames) > 0
+    assert all(frame_index % 10 == 0 for frame_index, _, _ in candidate_frames)
+    for frame_index, timestamp, _ in candidate_frames:
+        assert timestamp == pytest.approx(frame_index / 10.0)
+
+    for frames in (candidate_frames, refined_candidate_frames):
+        expected_frames = FrameExtractor().extract_frames(video_file_path, [frame_index for frame_index, _, _ in frames])
+        assert len(expected_frames) == len(frames)
+        for (_, _, frame), expected_frame in zip(frames, expected_frames):
+            assert np.array_equal(frame, expected_frame)
+
+
+def test_extract_candidate_frames_from_keyframes_in_frame_ranges(tmpdir, monkeypatch):
+    """Test case for candidate frames extraction decoding only key frames in frame ranges.
+    Candidate frames of frame ranges must be same as of whole video, and frame indexes of
+    key frames of a variable frame rate video must be found from their timestamps
+    """
+    import subprocess
+    import Katna.config as katna_config
+    from frame_extractor import FrameExtractor
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    # Video with a key frame every 10 frames
+    video_file_path = str(tmpdir.join("keyframes_video.mp4"))
+    subprocess.run(
+        [get_ffmpeg_exe(), "-v", "error", "-i", os.path.join("tests", "data", "codec_error_video.mp4"),
+         "-c:v", "libx264", "-g", "10", "-keyint_min", "10", "-sc_threshold", "0", video_file_path],
+        check=True,
+    )
+    monkeypatch.setattr(katna_config.FrameExtractor, "keyframes_only_scan", True)
+    monkeypatch.setattr(katna_config.FrameExtractor, "keyframe_scan_len_window", 3)
+    frame_extractor = FrameExtractor()
+    # Frame differences of key frames are restarted every 12 key frames
+    frame_extractor.max_frames_in_chunk = 12
+    candidate_frames = list(frame_extractor.extract_candidate_frames_iterator(video_file_path))
+    candidate_frames_in_ranges = []
+    for start_frame, end_frame in [(0, 95), (95, 203), (203, None)]:
+        candidate_frames_in_ranges.extend(
+            frame_extractor.extract_candidate_frames_iterator(video_file_path, start_frame, end_frame)
+        )
+    assert len(candidate_frames) > 2
+    assert [frame_index for frame_index, _, _ in candidate_frames_in_ranges] == [
+        frame_index for frame_index, _, _ in candidate_frames
+    ]
+
+    # Video with a key frame every 10 frames, first 150 frames at 10 fps and rest at 20 fps
+    video_file_path = str(tmpdir.join("variable_frame_rate_video.mp4"))
+    subprocess.run(
+        [get_ffmpeg_exe(), "-v", "error", "-i", os.path.join("tests", "data", "codec_error_video.mp4"),
+         "-vf", "setpts='if(lt(N,150),N/10,15+(N-150)/20)/TB'", "-fps_mode", "passthrough",
+         "-c:v", "libx264", "-g", "10", "-keyint_min", "10", "-sc_threshold", "0", video_file_path],
+        check=True,
+    )
+    candidate_frames = list(frame_extractor.extract_candidate_frames_iterator(video_file_path))
+    expected_frames = frame_extractor.extract_frames(video_file_path, [frame_index for frame_index, _, _ in candidate_frames])
+    assert any(frame_index > 150 for frame_index, _, _ in candidate_frames)
+    assert all(frame_index % 10 == 0 for frame_index, _, _ in candidate_frames)
+    assert len(expected_frames) == len(candidate_frames)
+    for (_, _, frame), expected_frame in zip(candidate_frames, expected_frames):
+        assert np.array_equal(frame, expected_frame)
+
+
+def test_detect_scenes(video_object, tmpdir):
+    """Test case for scene detection. Cuts of a video made of three parts of a video must be
+    detected at frame indexes of the parts, scenes detected in frame ranges and from frame
+    difference signal must be same as scenes detected in one go
+    """
+    import subprocess
+    from frame_extractor import FrameExtractor
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    # 10 fps video with cuts at frames 50 and 100
+    video_file_path = str(tmpdir.join("scenes_video.mp4"))
+    parts = ["[0:v]trim=start_frame=%d:end_frame=%d,setpts=PTS-STARTPTS[v%d]" % (start, start + 50, i)
+             for i, start in enumerate([0, 150, 50])]
+    subprocess.run(
+        [get_ffmpeg_exe(), "-v", "error", "-i", os.path.join("tests", "data", "codec_error_video.mp4"),
+         "-filter_complex", ";".join(parts) + ";[v0][v1][v2]concat=n=3[v]",
+         "-map", "[v]", "-r", "10", "-c:v", "libx264", video_file_path],
+        check=True,
+    )
+    frame_extractor = FrameExtractor()
+    scenes = frame_extractor.detect_scenes(video_file_path, return_keyframes=True)
+
+    assert [(scene["start_frame"], scene["end_frame"]) for scene in scenes] == [(0, 50), (50, 100), (100, 150)]
+    assert all(scene["starts_with_cut"] for scene in scenes)
+    for scene in scenes:
+        assert scene["start_time"] == pytest.approx(scene["start_frame"] / 10.0)
+        assert scene["start_frame"] <= scene["keyframe_index"] < scene["end_frame"]
+        assert scene["max_frame_difference"] >= scene["mean_frame_difference"] > 0
+        expected_frame = frame_extractor.extract_frames(video_file_path, [scene["keyframe_index"]])[0]
+        assert np.array_equal(scene["keyframe"], expected_frame)
+
+    def scene_statistics(scenes):
+        return [
+            (scene["start_frame"], scene["end_frame"], scene["no_of_frame_differences"],
+             pytest.approx(scene["mean_frame_difference"]), pytest.approx(scene["max_frame_difference"]))
+            for scene in scenes
+        ]
+
+    merged_scenes = video_object._merge_scenes(
+        [frame_extractor.detect_scenes(video_file_path, start_frame, end_frame, True)
+         for start_frame, end_frame in [(0, 75), (75, None)]]
+    )
+    assert scene_statistics(merged_scenes) == scene_statistics(scenes)
+    assert [scene["keyframe_index"] for scene in merged_scenes] == [scene["keyframe_index"] for scene in scenes]
+
+    _, frame_difference_signal = frame_extractor.extract_candidate_frames(
+        video_file_path, return_frame_difference_signal=True
+    )
+    scenes_from_signal = frame_extractor.detect_scenes_from_signal(frame_difference_signal, video_file_path)
+    assert scene_statistics(scenes_from_signal) == scene_statistics(scenes)
+
+
+def test_extract_candidate_frames_with_frame_sampling():
+    """Test case for candidate frames extraction with frame sampling. All candidate
+    frames must be sampled frames of video
+    """
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    frame_extractor = FrameExtractor()
+    frame_extractor.frame_sampling_step = 4
+    candidate_frames = frame_extractor.extract_candidate_frames(video_file_path)
+
+    sampled_frames = []
+    cap = cv2.VideoCapture(video_file_path)
+    frame_index = 0
+    ret, frame = cap.read()
+    while ret:
+        if frame_index % 4 == 0:
+            sampled_frames.append(frame)
+        frame_index = frame_index + 1
+        ret, frame = cap.read()
+    cap.release()
+
+    assert len(candidate_frames) > 0
+    for candidate_frame in candidate_frames:
+        assert any(np.array_equal(candidate_frame, frame) for frame in sampled_frames)
+
+
+def test_extract_candidate_frames_with_analysis_frame_width():
+    """Test case for candidate frames extraction with frame differences computed on downscaled
+    frames. Candidate frames must be full resolution frames at their frame index, and their
+    indexes must be close to indexes of candidate frames found on full resolution frames
+    """
+    from frame_extractor import FrameExtractor
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    frame_extractor = FrameExtractor()
+    frame_indexes = [frame_index for frame_index, _, _ in frame_extractor.extract_candidate_frames_iterator(video_file_path)]
+
+    # Frames of video are 720x480
+    frame_extractor.analysis_frame_width = 160
+    candidate_frames = list(frame_extractor.extract_candidate_frames_iterator(video_file_path))
+    expected_frames = frame_extractor.extract_frames(video_file_path, [frame_index for frame_index, _, _ in candidate_frames])
+
+    assert len(candidate_frames) > 0
+    assert len(expected_frames) == len(candidate_frames)
+    for (_, _, frame), expected_frame in zip(candidate_frames, expected_frames):
+        assert frame.shape == (480, 720, 3)
+        assert np.array_equal(frame, expected_frame)
+
+    # Most candidate frames are within 3 frames of a candidate frame found on full resolution frames
+    no_of_close_frames = sum(
+        any(abs(frame_index - full_resolution_frame_index) <= 3 for full_resolution_frame_index in frame_indexes)
+        for frame_index, _, _ in candidate_frames
+    )
+    assert no_of_close_frames >= 0.8 * len(candidate_frames)
+    assert abs(len(candidate_frames) - len(frame_indexes)) <= 0.2 * len(frame_indexes)
+
+
+def test_local_maxima_detector():
+    """Test case for online local maxima detection. Local maxima must be same as
+    local maxima of frame differences smoothed in one go
+    """
+    from frame_extractor import FrameExtractor, LocalMaximaDetector
+    from scipy.signal import argrelextrema
+
+    frame_extractor = FrameExtractor()
+    smooth = frame_extractor.__smooth__
+    random_state = np.random.RandomState(0)
+
+    for n_frame_diffs in [0, 5, 20, 21, 22, 100, 500]:
+        frame_diffs = random_state.randint(0, 1000, n_frame_diffs)
+        for len_window in [3, 4, 20]:
+            local_maxima_detector = LocalMaximaDetector(smooth, len_window)
+            decisions = []
+            for frame_diff in frame_diffs:
+                decisions.extend(local_maxima_detector.add(frame_diff))
+            decisions.extend(local_maxima_detector.flush())
+
+            expected_local_maxima = []
+            if n_frame_diffs > 0:
+                expected_local_maxima = list(
+                    argrelextrema(smooth(frame_diffs, len_window), np.greater)[0]
+                )
+            assert [position for position, _ in decisions] == list(range(n_frame_diffs))
+            assert [position for position, is_local_maxima in decisions if is_local_maxima] == expected_local_maxima
+
+
+def test_fast_entropy_score_ranking():
+    """Test case for fast entropy engine. Candidate frames must be ranked alike
+    by fast entropy scores and skimage entropy scores
+    """
+    from frame_extractor import FrameExtractor
+    from image_selector import ImageSelector
+    from scipy.stats import spearmanr
+
+    video_file_path = os.path.join("tests", "data", "pos_video.mp4")
+    candidate_frames = FrameExtractor().extract_candidate_frames(video_file_path)
+
+    image_selector = ImageSelector()
+    image_selector.entropy_engine = "skimage"
+    entropy_scores = [image_selector.__get_entropy_score__(frame) for frame in candidate_frames]
+    image_selector.entropy_engine = "fast"
+    fast_entropy_scores = [image_selector.__get_entropy_score__(frame) for frame in candidate_frames]
+
+    assert spearmanr(entropy_scores, fast_entropy_scores).correlation > 0.9
+
+
+def test_clustering_engines():
+    """Test case for clustering engines of image selector. Each engine must form the
+    required number of clusters and best frame of each cluster must be selected
+    """
+    from image_selector import ImageSelector
+
+    # Images with pixels spread around 4 distinct gray levels, so each engine must find these 4 clusters
+    rng = np.random.RandomState(0)
+    images = [
+        (gray_level + rng.randint(-20, 20, (48, 64, 1)).repeat(3, axis=2)).astype(np.uint8)
+        for gray_level in (30, 90, 150, 210)
+        for _ in range(3)
+    ]
+    image_selector = ImageSelector()
+    image_selector.nb_clusters = 4
+    histograms = image_selector.__get_histograms__(images)
+
+    for clustering_engine in ("kmeans", "minibatch_kmeans", "kcenter"):
+        image_selector.clustering_engine = clustering_engine
+        labels = image_selector.__get_cluster_labels__(histograms)
+        assert len(set(labels)) == 4
+        for i in range(0, len(images), 3):
+            assert labels[i] == labels[i + 1] == labels[i + 2]
+
+
+def test_kcenter_clustering_of_repeated_histograms():
+    """Test case for k-center clustering of fewer distinct histograms than clusters. Every
+    cluster label used must have histograms and repeated histograms must share a label
+    """
+    from image_selector import ImageSelector
+
+    images = [np.full((48, 64, 3), gray_level, dtype=np.uint8) for gray_level in (40, 40, 120, 200, 200, 40)]
+    image_selector = ImageSelector()
+    image_selector.nb_clusters = 5
+    image_selector.clustering_engine = "kcenter"
+    histograms = image_selector.__get_histograms__(images)
+
+    labels = image_selector.__get_cluster_labels__(histograms)
+    assert sorted(set(labels)) == [0, 1, 2]
+    assert labels[0] == labels[1] == labels[5]
+    assert labels[3] == labels[4]
+
+
+def test_select_sharpest_frame_of_each_cluster():
+    """Test case for selection of best frame of each cluster. Least blurred frame
+    of each cluster must be selected
+    """
+    from image_selector import ImageSelector
+
+    rng = np.random.RandomState(0)
+    images = []
+    for gray_level, sharp_first in ((70, True), (170, False)):
+        sharp_image = (gray_level + rng.randint(-40, 40, (96, 128, 1)).repeat(3, axis=2)).astype(np.uint8)
+        blurred_image = cv2.GaussianBlur(sharp_image, (9, 9), 0)
+        images.extend([sharp_image, blurred_image] if sharp_first else [blurred_image, sharp_image])
+
+    selected_images = ImageSelector().select_best_frames(images, 2)
+
+    assert len(selected_images) == 2
+    for sharp_image in (images[0], images[3]):
+        assert any(np.array_equal(sharp_image, image) for image in selected_images)
+
+
+def test_shared_frame_store():
+    """Test case for shared memory frame store. Frames read from pickled store
+    must be same as stored frames
+    """
+    import pickle
+    from frame_store import SharedFrameStore, _is_shared_memory_available
+
+    if not _is_shared_memory_available():
+        pytest.skip("shared memory is not supported by this python version")
+
+    random_state = np.random.RandomState(0)
+    frames = [
+        random_state.randint(0, 256, (48, 64, 3)).astype(np.uint8),
+        random_state.randint(0, 256, (30, 20)).astype(np.uint8),
+        random_state.rand(5, 7),
+    ]
+    frame_store = SharedFrameStore(frames)
+    try:
+        unpickled_frame_store = pickle.loads(pickle.dumps(frame_store))
+        assert len(unpickled_frame_store) == len(frames)
+        for frame, stored_frame in zip(frames, unpickled_frame_store.get_frames()):
+            assert stored_frame.dtype == frame.dtype
+            assert np.array_equal(stored_frame, frame)
+        del stored_frame
+        unpickled_frame_store.close()
+    finally:
+        frame_store.unlink()
+        frame_store.close()
+
+
+def test_video_worker_pool_reuse():
+    """Test case for worker pool of video object. Pool must be reused across calls
+    and stopped on leaving context manager, without context manager pool must be
+    stopped at the end of each call and terminated if video object is garbage collected
+    """
+    import gc
+    import multiprocessing.pool
+    from video import Video
+
+    video_file_path = os.path.join("tests", "data", "codec_error_video.mp4")
+
+    with Video() as video:
+        pool = video._get_pool()
+        assert video._get_pool() is pool
+        assert pool.apply(sum, ([1, 2, 3],)) == 6
+        assert len(video.extract_video_scene_keyframes(file_path=video_file_path)) > 0
+        assert video._pool is pool
+
+    assert video._pool is None
+
+    video = Video()
+    assert len(video.extract_video_scene_keyframes(file_path=video_file_path)) > 0
+    assert video._pool is None
+    keyframes = video.extract_video_keyframes_iterator(2, video_file_path)
+    next(keyframes)
+    assert video._pool is not None
+    keyframes.close()
+    assert video._pool is None
+
+    pool = video._get_pool()
+    del video
+    gc.collect()
+    assert pool._state == multiprocessing.pool.TERMINATE
+
+
 @pytest.mark.skip(reason="no way of currently testing this")
 def test_extracted_frame_as_png(video_object):
     """
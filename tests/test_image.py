@@ -4,6 +4,9 @@ import pytest
 import cv2
 import numpy as np
 import inspect
+import shutil
+import itertools
+from multiprocessing import Pool
 
 LIBDIR = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.join(os.path.split(LIBDIR)[0], "Katna")
@@ -101,6 +104,38 @@ def writer_object():
     return TestWriterImage(location="selectedcrops")
 
 
+def copy_images_to_dir(dir_path):
+    """Copies test images to a directory tree along with a file which is not a valid image
+
+    :param dir_path: directory to copy images to
+    :type dir_path: str
+    :return: paths of valid images copied
+    :rtype: list
+    """
+    path = os.path.join("tests", "data")
+    os.makedirs(os.path.join(dir_path, "sub_dir"), exist_ok=True)
+    image_file_paths = [
+        os.path.join(dir_path, "23018877.jpg"),
+        os.path.join(dir_path, "sub_dir", "bird_img_for_crop.jpg"),
+    ]
+    for image_file_path in image_file_paths:
+        shutil.copy(os.path.join(path, os.path.basename(image_file_path)), image_file_path)
+    with open(os.path.join(dir_path, "invalid_image.jpg"), "w") as f:
+        f.write("not an image")
+    return image_file_paths
+
+
+class DictWriter(object):
+    """Writer which keeps data of every file in a dict rather than saving it to disk"""
+
+    def __init__(self):
+        # dict of format { filepath: data }
+        self.data = {}
+
+    def write(self, filepath, data):
+        self.data[filepath] = data
+
+
 @pytest.fixture(scope="module")
 def text_detector_object():
     """fixture for text detection object
@@ -217,6 +252,64 @@ def test_image(image_object):
 
 
 
+def test_crop_image_from_dir_in_parallel(tmpdir, image_object):
+    """Crops of images of a directory cropped in worker processes must be same as crops of
+    images cropped one by one, invalid image files must be skipped
+    """
+    dir_path = str(tmpdir.mkdir("images"))
+    image_file_paths = copy_images_to_dir(dir_path)
+
+    writers = {}
+    for n_processes in (1, 2):
+        writers[n_processes] = DictWriter()
+        image_object.crop_image_from_dir(
+            dir_path=dir_path,
+            crop_width=300,
+            crop_height=200,
+            num_of_crops=2,
+            writer=writers[n_processes],
+            n_processes=n_processes,
+        )
+
+    assert sorted(writers[2].data.keys()) == sorted(image_file_paths)
+    assert sorted(writers[1].data.keys()) == sorted(image_file_paths)
+    for image_file_path in image_file_paths:
+        assert len(writers[2].data[image_file_path]) == 2
+        assert [str(crop) for crop in writers[2].data[image_file_path]] == [
+            str(crop) for crop in writers[1].data[image_file_path]
+        ]
+
+
+def test_imap_unordered_bounded():
+    """Bounded imap must return result of every item and stop submitting items when
+    caller stops consuming results early
+    """
+    from Katna.helper_functions import _imap_unordered_bounded
+
+    max_in_flight = 2
+    submitted_items = []
+
+    def items():
+        for item in itertools.count():
+            submitted_items.append(item)
+            yield -item
+
+    with Pool(processes=2) as pool:
+        results = _imap_unordered_bounded(pool, abs, (-item for item in range(20)), max_in_flight)
+        assert sorted(results) == list(range(20))
+
+        results = _imap_unordered_bounded(pool, abs, items(), max_in_flight)
+        for no_of_results, _ in enumerate(itertools.islice(results, 5), 1):
+            # Item being submitted is taken from iterable before waiting for a free slot
+            assert len(submitted_items) <= no_of_results + max_in_flight + 1
+        results.close()
+
+        # Task handler thread of pool stops taking items from infinite iterable
+        pool.close()
+        pool.join()
+    assert len(submitted_items) <= 5 + max_in_flight + 1
+
+
 def test_image_resize(image_object):
     import os.path
     import cv2
@@ -252,6 +345,50 @@ def test_image_resize(image_object):
     assert resized_image1_height == target_height1
     assert resized_image1_width == target_width1
 
+
+def test_image_resize_from_dir(tmpdir, image_object):
+    """Images of a directory resized in worker processes must be same as images resized one by one,
+    resized images given to ImageResizeDiskWriter must be saved to disk
+    """
+    from writer import ImageResizeDiskWriter
+
+    # target dimensions
+    target_width = 300
+    target_height = 200
+
+    dir_path = str(tmpdir.mkdir("images"))
+    image_file_paths = copy_images_to_dir(dir_path)
+
+    resized_images = image_object.resize_image_from_dir(
+        dir_path=dir_path, target_width=target_width, target_height=target_height, n_processes=1
+    )
+    resized_images_in_parallel = image_object.resize_image_from_dir(
+        dir_path=dir_path, target_width=target_width, target_height=target_height, n_processes=2
+    )
+    assert sorted(resized_images.keys()) == sorted(image_file_paths)
+    assert sorted(resized_images_in_parallel.keys()) == sorted(image_file_paths)
+    for image_file_path in image_file_paths:
+        assert resized_images[image_file_path].shape == (target_height, target_width, 3)
+        assert np.array_equal(resized_images[image_file_path], resized_images_in_parallel[image_file_path])
+
+    output_dir_path = os.path.join(str(tmpdir), "resized_images")
+    writer = ImageResizeDiskWriter(location=output_dir_path)
+    assert image_object.resize_image_from_dir(
+        dir_path=dir_path,
+        target_width=target_width,
+        target_height=target_height,
+        writer=writer,
+        n_processes=2,
+    ) is None
+    assert sorted(os.listdir(output_dir_path)) == [
+        "23018877_resized.jpeg", "bird_img_for_crop_resized.jpeg"
+    ]
+    for image_file_path in image_file_paths:
+        output_file_path = os.path.join(
+            output_dir_path, writer.generate_output_filename(image_file_path) + ".jpeg"
+        )
+        assert cv2.imread(output_file_path).shape == (target_height, target_width, 3)
+
 def test_crop_quality(tmpdir_factory, image_object, image_similarity_object, writer_object):
     import os.path
     import cv2
@@ -346,3 +483,95 @@ def test_aspect_ratio(tmpdir_factory, image_object, writer_object):
         if value[:3] != ratio[:3]:
             assert False
     assert True
+
+
+def score_crop(crop_extractor, feature_maps_image, crop_rect):
+    """Reference scoring of a single crop rectangle, importance of every pixel of the image is
+    computed for the crop rectangle and combined with the feature maps
+
+    :param crop_extractor: crop extractor with scoring parameters
+    :type crop_extractor: CropExtractor
+    :param feature_maps_image: saliency, face and edge feature maps stacked as channels
+    :type feature_maps_image: numpy array
+    :param crop_rect: crop rectangle to score
+    :type crop_rect: CropRect
+    :return: score
+    :rtype: float
+    """
+    feature_maps_height, feature_maps_width = feature_maps_image.shape[:2]
+    importance_map = np.full(
+        (feature_maps_height, feature_maps_width), crop_extractor.outside_importance
+    )
+    importance = crop_extractor._importance(crop_rect, importance_map)
+
+    detail = feature_maps_image[:, :, 2] / 255
+    rect_score_detail = np.sum(detail * importance)
+    rect_score_face = np.sum(
+        (feature_maps_image[:, :, 1] / 255) * (detail + crop_extractor.face_bias) * importance
+    )
+    rect_score_saliency = np.sum(
+        (feature_maps_image[:, :, 0] / 255) * (detail + crop_extractor.saliency_bias) * importance
+    )
+    return (
+        rect_score_detail * crop_extractor.detail_weight
+        + rect_score_face * crop_extractor.face_weight
+        + rect_score_saliency * crop_extractor.saliency_weight
+    ) / (crop_rect.w * crop_rect.h)
+
+
+def test_crop_score_map():
+    """Crop scores from score map must match scores of per crop scoring."""
+    from Katna.crop_extractor import CropExtractor
+
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 255, (60, 80, 3), dtype=np.uint8)
+    feature_maps = [rng.randint(0, 255, (60, 80), dtype=np.uint8) for _ in range(3)]
+    crop_extractor = CropExtractor()
+    crops = crop_extractor._extract_and_score_crop_rects(
+        image, feature_maps, [], 30, 20
+    )
+    feature_maps_image = np.dstack(feature_maps)
+    for index in range(len(crops)):
+        crop = crops.get_crop_rect(index)
+        assert np.isclose(crop.score, score_crop(crop_extractor, feature_maps_image, crop))
+
+
+def test_coarse_to_fine_crop_search():
+    """Coarse to fine crop search must score a subset of exhaustive search windows with same scores."""
+    import Katna.config as config
+    from Katna.crop_extractor import CropExtractor
+
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+    feature_maps = [np.zeros((120, 160), dtype=np.uint8) for _ in range(3)]
+    # Single salient and detailed region
+    feature_maps[0][60:90, 100:140] = 255
+    feature_maps[2][60:90, 100:140] = 255
+
+    crop_extractor = CropExtractor()
+    exhaustive = crop_extractor._extract_and_score_crop_rects(
+        image, feature_maps, [], 40, 30
+    )
+    crop_extractor.search_mode = "coarse_to_fine"
+    coarse_to_fine = crop_extractor._extract_and_score_crop_rects(
+        image, feature_maps, [], 40, 30
+    )
+    assert config.CropScorer.search_mode == "exhaustive"
+    assert len(coarse_to_fine) < len(exhaustive)
+
+    exhaustive_scores = {
+        (x, y, w): score
+        for x, y, w, score in zip(
+            exhaustive.x, exhaustive.y, exhaustive.w, exhaustive.score
+        )
+    }
+    for x, y, w, score in zip(
+        coarse_to_fine.x, coarse_to_fine.y, coarse_to_fine.w, coarse_to_fine.score
+    ):
+        assert np.isclose(exhaustive_scores[(x, y, w)], score)
+
+    best_exhaustive = exhaustive.get_crop_rect(exhaustive.get_sorted_indices()[0])
+    best_coarse_to_fine = coarse_to_fine.get_crop_rect(
+        coarse_to_fine.get_sorted_indices()[0]
+    )
+    assert str(best_exhaustive) == str(best_coarse_to_fine)